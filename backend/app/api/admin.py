@@ -0,0 +1,67 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from ..services.metrics import llm_usage_report
+from ..services.prompts import TEMPLATES
+
+admin_router = APIRouter(prefix="/admin")
+
+@admin_router.get("/question-pools")
+async def question_pools(request: Request):
+    prewarmer = request.app.state.prewarmer
+    if prewarmer is None:
+        raise HTTPException(status_code=404, detail="Question bank pre-warming is disabled")
+    return await prewarmer.report()
+
+@admin_router.get("/caches")
+async def caches(request: Request):
+    report = {}
+    if request.app.state.eval_cache is not None:
+        report["evaluations"] = await asyncio.to_thread(request.app.state.eval_cache.stats)
+    if request.app.state.transcript_cache is not None:
+        report["transcripts"] = await asyncio.to_thread(request.app.state.transcript_cache.stats)
+    storage = request.app.state.storage.storage
+    if hasattr(storage, "stats"):
+        report["sessions"] = storage.stats()
+    return report
+
+@admin_router.post("/archive")
+async def archive(request: Request):
+    """Run an archive pass now: completed sessions go to segment files, abandoned ones are expired if SESSION_TTL is set."""
+    stats = await request.app.state.archiver.run_once()
+    storage = request.app.state.storage.storage
+    # CachedStorage wraps the Storage that owns the archive
+    archive = getattr(storage, "storage", storage).archive
+    return {**stats, **await asyncio.to_thread(archive.stats)}
+
+@admin_router.get("/runtime")
+async def runtime(request: Request):
+    """Concurrency snapshot for load tests: requests in flight, worker-thread saturation and LLM circuit breakers."""
+    loop = asyncio.get_running_loop()
+    # asyncio.to_thread runs on the loop's default executor, created lazily on first use
+    executor = getattr(loop, "_default_executor", None)
+    threadpool = None
+    if executor is not None:
+        threadpool = {
+            "max_workers": executor._max_workers,
+            "threads": len(executor._threads),
+            "queued": executor._work_queue.qsize(), # > 0 means every thread is busy
+        }
+    report = {
+        "in_flight": request.app.state.in_flight,
+        "background_tasks": len(request.app.state.orchestrator._background),
+        "answer_jobs_queued": request.app.state.answer_jobs._queue.qsize(),
+        "threadpool": threadpool,
+        "llm": request.app.state.llm_resilience.stats(),
+    }
+    if request.app.state.fake_llm is not None:
+        report["fake_llm"] = request.app.state.fake_llm.stats()
+    return report
+
+@admin_router.get("/llm-usage")
+async def llm_usage():
+    """Per prompt kind: token usage, prompt-cache hit ratio and time to first token (this worker only)."""
+    report = llm_usage_report()
+    for kind, stats in report.items():
+        template = TEMPLATES.get(kind)
+        stats["prompt_version"] = template.version if template is not None else None
+    return report
@@ -1,12 +1,26 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+import json
+from hashlib import sha1
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request, Response, Query, File, Form, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
 from uuid import UUID
-from ..logic.orchestrator import ExamOrchestrator
-from ..logic.storage import Storage
-from ..models import ExamSession
+from ..logic.answer_jobs import AnswerJobQueue, JobQueueFullError, answer_result
+from ..logic.orchestrator import GRADING_MODES, AsyncExamOrchestrator, QuestionNotReadyError
+from ..logic.storage import AsyncStorage, VersionConflictError
+from ..models import AnswerJob, ExamSession
 
 router = APIRouter()
-storage = Storage()
+
+# Shared instances are built once in main.py's lifespan and kept on app.state
+def get_orchestrator(request: Request) -> AsyncExamOrchestrator:
+    return request.app.state.orchestrator
+
+def get_storage(request: Request) -> AsyncStorage:
+    return request.app.state.storage
+
+def get_answer_jobs(request: Request) -> AnswerJobQueue:
+    return request.app.state.answer_jobs
 
 class StartRequest(BaseModel):
     candidate_name: str
@@ -16,6 +30,7 @@ class StartRequest(BaseModel):
     question_types: list[str]
     provider: str = "openai"
     start_immediately: bool = True
+    grading_mode: str = "immediate" # "deferred": answers are graded together when the exam completes
 
 class InteractRequest(BaseModel):
     user_input: str
@@ -24,46 +39,129 @@ class AnswerRequest(BaseModel):
     answer: str | None = None
     audio_data: str | None = None
 
+# Top-level session fields in the /current projection (plus the current question)
+CURRENT_VIEW_FIELDS = {
+    "id", "version", "status", "candidate_name", "topics", "current_score",
+    "total_questions_count", "current_question_index", "pending_question_count",
+    "grading_mode", "grading_pending",
+}
+
+def current_view(session: ExamSession) -> dict:
+    view = session.model_dump(mode="json", include=CURRENT_VIEW_FIELDS)
+    idx = session.current_question_index
+    view["question"] = session.questions[idx].model_dump(mode="json") if idx < len(session.questions) else None
+    return view
+
+def _etag(exam_id: UUID, version: int, variant: str) -> str:
+    # Every committed change bumps the version, so (id, version, projection) identifies the body
+    return f'"{exam_id}-{version}-{variant}"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+async def _conditional_view(request: Request, exam_id: UUID, variant: str, render, orch: AsyncExamOrchestrator, storage: AsyncStorage) -> Response:
+    """
+    Serve `render(session)` with an ETag. A matching If-None-Match is answered with 304
+    from the stored version alone, before the session is loaded or serialized.
+    """
+    headers = {"Cache-Control": "no-cache"}
+    version = await storage.get_version(exam_id)
+    if version is not None and _not_modified(request, _etag(exam_id, version, variant)):
+        return Response(status_code=304, headers={**headers, "ETag": _etag(exam_id, version, variant)})
+    try:
+        session = await orch.get_session(exam_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Session not found or corrupted")
+    headers["ETag"] = _etag(exam_id, session.version, variant)
+    if _not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=render(session), media_type="application/json", headers=headers)
+
 @router.post("/exams/start", response_model=ExamSession)
-def start_exam(req: StartRequest):
+async def start_exam(req: StartRequest, request: Request, orch: AsyncExamOrchestrator = Depends(get_orchestrator)):
     print(f"API: Received start_exam request for {req.candidate_name}")
-    orch = ExamOrchestrator(storage)
-    session = orch.create_session(
+    if req.grading_mode not in GRADING_MODES:
+        raise HTTPException(status_code=400, detail=f"grading_mode must be one of {', '.join(GRADING_MODES)}")
+    if request.app.state.prewarmer is not None:
+        request.app.state.prewarmer.record_request(req.difficulty, req.topics, req.question_types, req.provider)
+    session = await orch.create_session(
         candidate_name=req.candidate_name,
         difficulty=req.difficulty,
         topics=req.topics,
         total_questions_count=req.total_questions_count,
         question_types=req.question_types,
-        provider=req.provider
+        provider=req.provider,
+        grading_mode=req.grading_mode
     )
     print(f"API: Created session {session.id}")
     return session
 
 @router.get("/exams", response_model=list[dict])
-def list_exams():
-    return storage.list_sessions()
+async def list_exams(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    status: str | None = None,
+    candidate_name: str | None = None,
+    storage: AsyncStorage = Depends(get_storage)
+):
+    try:
+        sessions, next_cursor = await storage.list_session_page(limit, cursor, status, candidate_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # The body stays a plain list; the next page is advertised in a header
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return sessions
 
 @router.get("/exams/{exam_id}", response_model=ExamSession)
-def get_exam(exam_id: UUID):
-    orch = ExamOrchestrator(storage)
-    try:
-        return orch.get_session(exam_id)
-    except Exception as e:
-        raise HTTPException(status_code=404, detail="Session not found or corrupted")
+async def get_exam(
+    exam_id: UUID,
+    request: Request,
+    fields: str | None = Query(None, description="Comma-separated top-level fields to return"),
+    orch: AsyncExamOrchestrator = Depends(get_orchestrator),
+    storage: AsyncStorage = Depends(get_storage)
+):
+    if not fields:
+        return await _conditional_view(request, exam_id, "full", lambda s: s.model_dump_json(), orch, storage)
+
+    selected = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = selected - ExamSession.model_fields.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    variant = sha1(",".join(sorted(selected)).encode("utf-8")).hexdigest()[:12]
+    return await _conditional_view(request, exam_id, variant, lambda s: s.model_dump_json(include=selected), orch, storage)
+
+@router.get("/exams/{exam_id}/current")
+async def get_current(exam_id: UUID, request: Request, orch: AsyncExamOrchestrator = Depends(get_orchestrator), storage: AsyncStorage = Depends(get_storage)):
+    """What the exam page renders: progress, score and the current question only."""
+    return await _conditional_view(request, exam_id, "current", lambda s: json.dumps(current_view(s)), orch, storage)
 
 @router.post("/exams/{exam_id}/interact")
-def interact(exam_id: UUID, req: InteractRequest):
+async def interact(exam_id: UUID, req: InteractRequest, orch: AsyncExamOrchestrator = Depends(get_orchestrator)):
     # This might be deprecated in new batch flow, keeping for safety
-    orch = ExamOrchestrator(storage)
     try:
-        response = orch.handle_setup_interaction(exam_id, req.user_input)
+        response = await orch.handle_setup_interaction(exam_id, req.user_input)
         return {"message": response}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _job_accepted(exam_id: UUID, job) -> Response:
+    location = f"/exams/{exam_id}/jobs/{job.id}"
+    return JSONResponse({"job_id": str(job.id), "status": job.status.value}, status_code=202, headers={"Location": location})
+
 @router.post("/exams/{exam_id}/answer")
-def answer(exam_id: UUID, req: AnswerRequest):
-    orch = ExamOrchestrator(storage)
+async def answer(
+    exam_id: UUID,
+    req: AnswerRequest,
+    background: bool = Query(False, description="Queue the answer as a job and return 202 with its id"),
+    orch: AsyncExamOrchestrator = Depends(get_orchestrator),
+    jobs: AnswerJobQueue = Depends(get_answer_jobs)
+):
     try:
         if not req.answer and not req.audio_data:
              raise ValueError("Answer or Audio Data required")
@@ -72,22 +170,174 @@ def answer(exam_id: UUID, req: AnswerRequest):
         # The orchestrator will handle transcription and combination
         text_answer = req.answer if req.answer else ""
 
-        is_correct, explanation = orch.submit_answer(
+        if background:
+            return _job_accepted(exam_id, await jobs.submit(exam_id, text_answer, req.audio_data))
+
+        question = await orch.submit_answer(
             session_id=exam_id, 
             answer=text_answer, 
             audio_data=req.audio_data
         )
-        return {
-            "is_correct": is_correct,
-            "explanation": explanation
-        }
+        return answer_result(question)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except VersionConflictError as e:
+        # Kept losing the race against other writers; safe to resend
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Keep proxies (nginx and friends) from buffering the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/exams/{exam_id}/answer/stream")
+async def answer_stream(exam_id: UUID, req: AnswerRequest, orch: AsyncExamOrchestrator = Depends(get_orchestrator)):
+    """
+    /answer as server-sent events: `explanation` ({"text"}) fragments while the
+    evaluation is written, `grade` once the grade is known (at once for MCQs) and a
+    final `result` with the /answer body. Failures after the stream has started arrive
+    as an `error` event.
+    """
+    if not req.answer and not req.audio_data:
+        raise HTTPException(status_code=400, detail="Answer or Audio Data required")
+    try:
+        await orch.get_session(exam_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Session not found or corrupted")
+
+    async def events():
+        try:
+            async for event, value in orch.stream_submit_answer(exam_id, req.answer or "", req.audio_data):
+                yield _sse(event, {"text": value} if event == "explanation" else answer_result(value))
+        except Exception as e:
+            print(f"API: Answer stream for {exam_id} failed: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# Room for the `answer` form field and the part headers around the recording
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+def _limit_body(receive, max_bytes: int, audio_max_bytes: int):
+    received = 0
+    async def limited():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Audio exceeds {audio_max_bytes} bytes")
+        return message
+    return limited
+
+class AudioUploadRoute(APIRoute):
+    """
+    Enforces AUDIO_UPLOAD_MAX_BYTES before FastAPI spools the multipart body: requests
+    are refused on their Content-Length, and bodies sent without one are cut off with
+    413 as soon as they cross the cap.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            audio_max_bytes = request.app.state.settings.audio_upload_max_bytes
+            max_bytes = audio_max_bytes + MULTIPART_OVERHEAD_BYTES
+            length = request.headers.get("content-length")
+            if length and length.isdigit() and int(length) > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Audio exceeds {audio_max_bytes} bytes")
+            return await handler(Request(request.scope, _limit_body(request.receive, max_bytes, audio_max_bytes)))
+
+        return limited_handler
+
+async def answer_audio(
+    exam_id: UUID,
+    request: Request,
+    audio: UploadFile = File(...),
+    answer: str | None = Form(None),
+    background: bool = Query(False, description="Queue the answer as a job and return 202 with its id"),
+    orch: AsyncExamOrchestrator = Depends(get_orchestrator),
+    jobs: AnswerJobQueue = Depends(get_answer_jobs)
+):
+    """
+    Multipart variant of /answer for voice answers. The recording arrives as raw bytes
+    in a spooled temp file (memory first, disk beyond 1 MB) and that file is handed to
+    transcription directly, instead of base64 inside a JSON body. The size cap is
+    enforced while the body streams in (see AudioUploadRoute).
+    """
+    try:
+        max_bytes = request.app.state.settings.audio_upload_max_bytes
+        if audio.size is not None and audio.size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Audio exceeds {max_bytes} bytes")
+        if audio.content_type and not audio.content_type.startswith(("audio/", "application/octet-stream")):
+            raise HTTPException(status_code=415, detail=f"Unsupported audio type: {audio.content_type}")
+
+        if background:
+            return _job_accepted(exam_id, await jobs.submit(exam_id, answer or "", audio.file, audio.filename or "audio.wav"))
+
+        question = await orch.submit_answer(
+            session_id=exam_id,
+            answer=answer or "",
+            audio_data=audio.file,
+            audio_filename=audio.filename or "audio.wav"
+        )
+        return answer_result(question)
+    except HTTPException:
+        raise
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await audio.close()
+
+router.add_api_route("/exams/{exam_id}/answer/audio", answer_audio, methods=["POST"], route_class_override=AudioUploadRoute)
+
+@router.get("/exams/{exam_id}/jobs/{job_id}", response_model=AnswerJob, response_model_exclude={"audio_path"})
+async def get_answer_job(exam_id: UUID, job_id: UUID, jobs: AnswerJobQueue = Depends(get_answer_jobs)):
+    """Poll a background answer job; `result` is filled in once it is COMPLETED."""
+    job = await jobs.get(job_id)
+    if job is None or job.session_id != exam_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/exams/{exam_id}/questions/stream")
+async def questions_stream(exam_id: UUID, after: int = Query(0, ge=0, description="Only questions from this index on"), orch: AsyncExamOrchestrator = Depends(get_orchestrator)):
+    """
+    Server-sent `question` events ({"index", "question"}) as the exam's questions are
+    generated, then `done` with the final question count. Lets a client wait for the
+    next question instead of retrying /next on 409.
+    """
+    try:
+        await orch.get_session(exam_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Session not found or corrupted")
+
+    async def events():
+        count = after
+        try:
+            async for index, question in orch.watch_questions(exam_id, after):
+                count = index + 1
+                yield _sse("question", {"index": index, "question": question.model_dump(mode="json")})
+            yield _sse("done", {"count": count})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @router.post("/exams/{exam_id}/next", response_model=ExamSession)
-def next_question(exam_id: UUID):
-    orch = ExamOrchestrator(storage)
+async def next_question(exam_id: UUID, orch: AsyncExamOrchestrator = Depends(get_orchestrator)):
     try:
-        return orch.next_question_state(exam_id)
+        return await orch.next_question_state(exam_id)
+    except QuestionNotReadyError as e:
+        # Questions are still streaming in from background shards; the client should retry
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "2"})
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,183 @@
+import os
+from pydantic import BaseModel
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return value.strip().lower() in ("1", "true", "yes", "on") if value not in (None, "") else default
+
+
+class Settings(BaseModel):
+    # LLM HTTP connection pool (shared by every request in the process)
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
+    llm_connect_timeout: float = 10.0
+
+    # LLM call resilience
+    llm_call_timeout: float = 60.0 # Deadline per attempt, in seconds (also the HTTP read timeout)
+    llm_retry_attempts: int = 3 # Attempts per call for transient errors (timeouts, 429, 5xx)
+    llm_retry_base_delay: float = 0.5 # Backoff doubles per attempt (full jitter)
+    llm_retry_max_delay: float = 8.0
+    llm_breaker_threshold: int = 5 # Consecutive failures that open a provider's circuit
+    llm_breaker_reset: float = 30.0 # Seconds before an open circuit lets a trial call through
+    llm_hedge_enabled: bool = False # Race slow answer evaluations against the other provider
+    llm_hedge_percentile: float = 95.0 # Hedge once the primary is slower than this latency percentile
+    llm_hedge_delay: float = 5.0 # Seconds; used until enough latencies are observed
+    llm_routing_window: float = 300.0 # Seconds of per-provider latency/error history used by provider="auto"
+    llm_routing_max_error_rate: float = 0.5 # provider="auto" skips providers failing more often than this
+    llm_routing_explore_rate: float = 0.05 # Share of "auto" calls sent to a random healthy provider
+
+    # Question generation
+    generation_shard_size: int = 3 # Max questions per concurrent LLM call
+    question_wait_timeout: float = 10.0 # How long /next waits for a pending shard
+    generation_timeout: float = 300.0 # Pending questions older than this are given up on
+
+    # Question bank (reuse of generated questions across sessions)
+    question_bank_enabled: bool = True
+    question_bank_max_size: int = 5000 # LRU-evicted beyond this many questions
+    question_bank_max_age: float = 7 * 24 * 3600 # Seconds before a question expires
+    question_bank_max_uses: int = 20 # Per-question reuse cap
+
+    # Background pre-warming of the question bank for popular configurations
+    prewarm_enabled: bool = True
+    prewarm_interval: float = 30.0 # Seconds between refill passes
+    prewarm_target: int = 10 # Unused questions to keep ready per (difficulty, topic, type)
+    prewarm_top_configs: int = 5 # How many of the most requested configurations to keep warm
+    prewarm_concurrency: int = 2 # Max concurrent generation calls for pre-warming
+    prewarm_idle_threshold: int = 2 # Only refill while at most this many API requests are in flight
+
+    # Answer evaluation cache
+    eval_cache_enabled: bool = True
+    eval_cache_max_entries: int = 10000
+    eval_cache_ttl: float = 30 * 24 * 3600 # Seconds
+
+    # Transcript cache (keyed by a hash of the audio bytes)
+    transcript_cache_enabled: bool = True
+    transcript_cache_max_entries: int = 2000
+    transcript_cache_ttl: float = 7 * 24 * 3600 # Seconds
+
+    # Session storage
+    data_dir: str = "" # Root for sessions, caches, the question bank and traces ("" = data/ in the repo)
+    storage_mode: str = "snapshot" # "snapshot" rewrites the session file, "eventlog" appends deltas
+    storage_compact_every: int = 20 # Event-log mode: rewrite the snapshot after this many events
+    storage_format: str = "compact" # Snapshot encoding: "json" (indented), "compact", "gzip", "zstd", "msgpack"
+    storage_conflict_retries: int = 5 # Re-applies of a change after a version conflict with another writer
+
+    # Archival of finished sessions into segment files (data/sessions/archive)
+    archive_enabled: bool = True
+    archive_interval: float = 3600.0 # Seconds between archive passes
+    archive_min_age: float = 3600.0 # Completed sessions untouched for this many seconds are archived
+    archive_segment_max_bytes: int = 64 * 1024 * 1024 # A new segment file is started beyond this
+    session_ttl: float = 0.0 # Opt-in: unfinished sessions untouched for this many seconds are deleted (0 keeps them)
+
+    # In-memory session cache in front of storage (single-worker deployments)
+    session_cache_enabled: bool = True
+    session_cache_max_entries: int = 1000
+    session_cache_durability: str = "sync" # "sync", "interval" or "eviction"
+    session_cache_flush_interval_ms: int = 200 # "interval" durability only
+
+    # Audio answers
+    audio_upload_max_bytes: int = 25 * 1024 * 1024 # Whisper rejects larger files anyway
+
+    # Fake LLM provider for load testing (never enable in production)
+    fake_llm_enabled: bool = False
+    fake_llm_latency_ms: float = 800.0 # Median latency per call
+    fake_llm_latency_sigma: float = 0.5 # Log-normal shape; larger means a heavier tail
+    fake_llm_error_rate: float = 0.0
+    fake_llm_response_chars: int = 400 # Length of generated explanations
+
+    # Background answer jobs
+    answer_job_workers: int = 4
+    answer_job_max_pending: int = 100 # Queued jobs beyond this are refused with 503
+    answer_job_retention: float = 24 * 3600.0 # Finished job records are purged after this many seconds
+
+    # Deferred grading (sessions started with grading_mode="deferred")
+    deferred_grading_batch_size: int = 5 # Answers evaluated per LLM request
+    deferred_grading_concurrency: int = 4 # Batch requests in flight at once, across all exams
+
+    # Tracing (OTLP/JSON spans written to a local file)
+    tracing_enabled: bool = False
+    tracing_path: str = "" # Defaults to data/traces.jsonl
+    tracing_sample_rate: float = 1.0 # Fraction of requests whose trace is kept
+    tracing_max_bytes: int = 50 * 1024 * 1024 # The file is rotated to <path>.1 beyond this
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        # Read lazily so values from .env (loaded in main.py) are picked up
+        return cls(
+            llm_max_connections=_env_int("LLM_MAX_CONNECTIONS", 100),
+            llm_max_keepalive_connections=_env_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 20),
+            llm_keepalive_expiry=_env_float("LLM_KEEPALIVE_EXPIRY", 30.0),
+            llm_connect_timeout=_env_float("LLM_CONNECT_TIMEOUT", 10.0),
+            llm_call_timeout=_env_float("LLM_CALL_TIMEOUT", 60.0),
+            llm_retry_attempts=_env_int("LLM_RETRY_ATTEMPTS", 3),
+            llm_retry_base_delay=_env_float("LLM_RETRY_BASE_DELAY", 0.5),
+            llm_retry_max_delay=_env_float("LLM_RETRY_MAX_DELAY", 8.0),
+            llm_breaker_threshold=_env_int("LLM_BREAKER_THRESHOLD", 5),
+            llm_breaker_reset=_env_float("LLM_BREAKER_RESET", 30.0),
+            llm_hedge_enabled=_env_bool("LLM_HEDGE_ENABLED", False),
+            llm_hedge_percentile=_env_float("LLM_HEDGE_PERCENTILE", 95.0),
+            llm_hedge_delay=_env_float("LLM_HEDGE_DELAY", 5.0),
+            llm_routing_window=_env_float("LLM_ROUTING_WINDOW", 300.0),
+            llm_routing_max_error_rate=_env_float("LLM_ROUTING_MAX_ERROR_RATE", 0.5),
+            llm_routing_explore_rate=_env_float("LLM_ROUTING_EXPLORE_RATE", 0.05),
+            generation_shard_size=_env_int("GENERATION_SHARD_SIZE", 3),
+            question_wait_timeout=_env_float("QUESTION_WAIT_TIMEOUT", 10.0),
+            generation_timeout=_env_float("GENERATION_TIMEOUT", 300.0),
+            question_bank_enabled=_env_bool("QUESTION_BANK_ENABLED", True),
+            question_bank_max_size=_env_int("QUESTION_BANK_MAX_SIZE", 5000),
+            question_bank_max_age=_env_float("QUESTION_BANK_MAX_AGE", 7 * 24 * 3600),
+            question_bank_max_uses=_env_int("QUESTION_BANK_MAX_USES", 20),
+            prewarm_enabled=_env_bool("PREWARM_ENABLED", True),
+            prewarm_interval=_env_float("PREWARM_INTERVAL", 30.0),
+            prewarm_target=_env_int("PREWARM_TARGET", 10),
+            prewarm_top_configs=_env_int("PREWARM_TOP_CONFIGS", 5),
+            prewarm_concurrency=_env_int("PREWARM_CONCURRENCY", 2),
+            prewarm_idle_threshold=_env_int("PREWARM_IDLE_THRESHOLD", 2),
+            eval_cache_enabled=_env_bool("EVAL_CACHE_ENABLED", True),
+            eval_cache_max_entries=_env_int("EVAL_CACHE_MAX_ENTRIES", 10000),
+            eval_cache_ttl=_env_float("EVAL_CACHE_TTL", 30 * 24 * 3600),
+            transcript_cache_enabled=_env_bool("TRANSCRIPT_CACHE_ENABLED", True),
+            transcript_cache_max_entries=_env_int("TRANSCRIPT_CACHE_MAX_ENTRIES", 2000),
+            transcript_cache_ttl=_env_float("TRANSCRIPT_CACHE_TTL", 7 * 24 * 3600),
+            data_dir=os.getenv("DATA_DIR") or "",
+            storage_mode=os.getenv("STORAGE_MODE") or "snapshot",
+            storage_compact_every=_env_int("STORAGE_COMPACT_EVERY", 20),
+            storage_format=os.getenv("STORAGE_FORMAT") or "compact",
+            storage_conflict_retries=_env_int("STORAGE_CONFLICT_RETRIES", 5),
+            archive_enabled=_env_bool("ARCHIVE_ENABLED", True),
+            archive_interval=_env_float("ARCHIVE_INTERVAL", 3600.0),
+            archive_min_age=_env_float("ARCHIVE_MIN_AGE", 3600.0),
+            archive_segment_max_bytes=_env_int("ARCHIVE_SEGMENT_MAX_BYTES", 64 * 1024 * 1024),
+            session_ttl=_env_float("SESSION_TTL", 0.0),
+            session_cache_enabled=_env_bool("SESSION_CACHE_ENABLED", True),
+            session_cache_max_entries=_env_int("SESSION_CACHE_MAX_ENTRIES", 1000),
+            session_cache_durability=os.getenv("SESSION_CACHE_DURABILITY") or "sync",
+            session_cache_flush_interval_ms=_env_int("SESSION_CACHE_FLUSH_INTERVAL_MS", 200),
+            audio_upload_max_bytes=_env_int("AUDIO_UPLOAD_MAX_BYTES", 25 * 1024 * 1024),
+            fake_llm_enabled=_env_bool("FAKE_LLM_ENABLED", False),
+            fake_llm_latency_ms=_env_float("FAKE_LLM_LATENCY_MS", 800.0),
+            fake_llm_latency_sigma=_env_float("FAKE_LLM_LATENCY_SIGMA", 0.5),
+            fake_llm_error_rate=_env_float("FAKE_LLM_ERROR_RATE", 0.0),
+            fake_llm_response_chars=_env_int("FAKE_LLM_RESPONSE_CHARS", 400),
+            answer_job_workers=_env_int("ANSWER_JOB_WORKERS", 4),
+            answer_job_max_pending=_env_int("ANSWER_JOB_MAX_PENDING", 100),
+            answer_job_retention=_env_float("ANSWER_JOB_RETENTION", 24 * 3600.0),
+            deferred_grading_batch_size=_env_int("DEFERRED_GRADING_BATCH_SIZE", 5),
+            deferred_grading_concurrency=_env_int("DEFERRED_GRADING_CONCURRENCY", 4),
+            tracing_enabled=_env_bool("TRACING_ENABLED", False),
+            tracing_path=os.getenv("TRACING_PATH") or "",
+            tracing_sample_rate=_env_float("TRACING_SAMPLE_RATE", 1.0),
+            tracing_max_bytes=_env_int("TRACING_MAX_BYTES", 50 * 1024 * 1024),
+        )
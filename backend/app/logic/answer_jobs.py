@@ -0,0 +1,187 @@
+import asyncio
+import base64
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import BinaryIO, List, Optional, Union
+from uuid import UUID
+from ..config import Settings
+from ..models import AnswerJob, JobStatus, Question
+from ..services.tracing import current_request_id, request_context, span
+from .orchestrator import AsyncExamOrchestrator
+from .storage import DATA_DIR
+
+JOBS_DIR = os.path.join(DATA_DIR, "jobs")
+
+FINISHED = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+class JobQueueFullError(Exception):
+    pass
+
+def answer_result(question: Question) -> dict:
+    if question.is_correct is None:
+        # Deferred grading: the answer is recorded and graded when the exam completes
+        return {"is_correct": None, "explanation": None, "explanation_pending": False, "grading_pending": True}
+    return {
+        "is_correct": question.is_correct,
+        "explanation": question.explanation,
+        # MCQs are graded instantly; detailed feedback lands on the session later
+        "explanation_pending": question.explanation_pending
+    }
+
+class AnswerJobStore:
+    """One JSON file per job (plus the raw recording until it is transcribed) next to the sessions."""
+
+    def __init__(self, data_dir: str = JOBS_DIR):
+        self.data_dir = data_dir
+        os.makedirs(self.data_dir, exist_ok=True)
+
+    def _get_path(self, job_id: UUID) -> str:
+        return os.path.join(self.data_dir, f"{job_id}.json")
+
+    def save(self, job: AnswerJob):
+        job.updated_at = datetime.utcnow()
+        path = self._get_path(job.id)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(job.model_dump_json())
+        os.replace(temp_path, path)
+
+    def get(self, job_id: UUID) -> Optional[AnswerJob]:
+        try:
+            with open(self._get_path(job_id), "r", encoding="utf-8") as f:
+                return AnswerJob.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
+
+    def write_audio(self, job_id: UUID, audio: Union[str, BinaryIO]) -> str:
+        path = os.path.join(self.data_dir, f"{job_id}.audio")
+        with open(path, "wb") as f:
+            if isinstance(audio, str):
+                f.write(base64.b64decode(audio))
+            else:
+                audio.seek(0)
+                shutil.copyfileobj(audio, f)
+        return path
+
+    def delete_audio(self, job: AnswerJob):
+        if job.audio_path and os.path.exists(job.audio_path):
+            os.remove(job.audio_path)
+        job.audio_path = None
+
+    def all(self) -> List[AnswerJob]:
+        jobs = []
+        for filename in os.listdir(self.data_dir):
+            if filename.endswith(".json"):
+                try:
+                    jobs.append(self.get(filename[:-len(".json")]))
+                except Exception as e:
+                    print(f"JOBS: Skipping unreadable job {filename}: {e}")
+        return [job for job in jobs if job is not None]
+
+    def delete(self, job: AnswerJob):
+        self.delete_audio(job)
+        path = self._get_path(job.id)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class AnswerJobQueue:
+    """
+    Runs answer submissions as background jobs: transcribe -> combine -> evaluate -> persist.
+    A fixed pool of `answer_job_workers` tasks drains the queue. Each stage is saved to
+    the job file, so after a restart unfinished jobs are re-queued and pick up where they
+    stopped (a finished transcription is not repeated; grading an already graded question
+    is a no-op).
+    """
+
+    def __init__(self, orchestrator: AsyncExamOrchestrator, store: Optional[AnswerJobStore] = None, settings: Optional[Settings] = None):
+        self.orchestrator = orchestrator
+        self.store = store or AnswerJobStore()
+        self.settings = settings or Settings.from_env()
+        self._queue: "asyncio.Queue[UUID]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+
+    async def submit(self, session_id: UUID, answer: str, audio_data: Union[str, BinaryIO, None] = None, audio_filename: str = "audio.wav") -> AnswerJob:
+        if self._queue.qsize() >= self.settings.answer_job_max_pending:
+            raise JobQueueFullError("Too many answers are being processed, try again shortly")
+        session = await self.orchestrator.get_session(session_id)
+        current_q = session.questions[session.current_question_index]
+
+        job = AnswerJob(session_id=session_id, question_id=current_q.id, answer=answer, audio_filename=audio_filename, request_id=current_request_id())
+        if audio_data:
+            # Copy the upload now; the request's temp file is gone once we return
+            job.audio_path = await asyncio.to_thread(self.store.write_audio, job.id, audio_data)
+        await asyncio.to_thread(self.store.save, job)
+        self._queue.put_nowait(job.id)
+        print(f"JOBS: Queued answer job {job.id} for {session_id}")
+        return job
+
+    async def get(self, job_id: UUID) -> Optional[AnswerJob]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _save(self, job: AnswerJob, status: JobStatus):
+        job.status = status
+        await asyncio.to_thread(self.store.save, job)
+
+    async def _process(self, job: AnswerJob):
+        if job.audio_path and job.transcript is None:
+            await self._save(job, JobStatus.TRANSCRIBING)
+            with open(job.audio_path, "rb") as audio:
+                job.transcript = await self.orchestrator.transcribe(job.session_id, audio, job.audio_filename)
+            # Persist the transcript before the recording is dropped
+            await self._save(job, JobStatus.EVALUATING)
+            await asyncio.to_thread(self.store.delete_audio, job)
+
+        await self._save(job, JobStatus.EVALUATING)
+        final_answer = self.orchestrator._combine_answer(job.answer, job.transcript)
+        question = await self.orchestrator.grade_answer(job.session_id, final_answer, job.question_id)
+        job.result = answer_result(question)
+        await self._save(job, JobStatus.COMPLETED)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await self.get(job_id)
+                if job is None or job.status in FINISHED:
+                    continue
+                try:
+                    # Traced as its own trace, tagged with the request that queued it
+                    with request_context(job.request_id), span("jobs.answer", **{"job.id": str(job.id), "job.status": job.status.value}):
+                        await self._process(job)
+                    print(f"JOBS: Completed answer job {job.id}")
+                except asyncio.CancelledError:
+                    raise # Shutting down; the job is resumed on the next start
+                except Exception as e:
+                    print(f"JOBS: Answer job {job.id} failed: {e}")
+                    job.error = str(e)
+                    await self._save(job, JobStatus.FAILED)
+            finally:
+                self._queue.task_done()
+
+    def _recover(self) -> List[AnswerJob]:
+        """Purge expired finished jobs and return the unfinished ones, oldest first."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.settings.answer_job_retention)
+        unfinished = []
+        for job in self.store.all():
+            if job.status in FINISHED:
+                if job.updated_at < cutoff:
+                    self.store.delete(job)
+            else:
+                unfinished.append(job)
+        return sorted(unfinished, key=lambda job: job.created_at)
+
+    async def start(self):
+        if self._workers:
+            return
+        for job in await asyncio.to_thread(self._recover):
+            print(f"JOBS: Resuming answer job {job.id} ({job.status.value})")
+            self._queue.put_nowait(job.id)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(max(1, self.settings.answer_job_workers))]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Callable, Dict, Optional
+from ..config import Settings
+from .storage import AsyncStorage
+
+class SessionArchiver:
+    """
+    Periodically moves completed sessions into the storage's segment archive and, if
+    `session_ttl` is set, expires abandoned ones (see Storage.compact_archive). Passes are skipped while
+    the API is busy; several workers may run one each, the archive lock serialises them.
+    """
+
+    def __init__(self, storage: AsyncStorage, settings: Optional[Settings] = None, is_idle: Callable[[], bool] = lambda: True):
+        self.storage = storage
+        self.settings = settings or Settings.from_env()
+        self.is_idle = is_idle
+        self.last_pass: Optional[Dict[str, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> Dict[str, int]:
+        self.last_pass = await self.storage.compact_archive(self.settings.archive_min_age, self.settings.session_ttl)
+        return self.last_pass
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.settings.archive_interval)
+            if not self.is_idle():
+                continue
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"STORAGE ERROR: Archive pass failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,66 @@
+import re
+from typing import List, Optional, Set
+
+# "A", "a)", "(B)", "C.", "D:" style option labels
+_LABEL_RE = re.compile(r"^\(?([a-z])[\)\.:]?$")
+_LABEL_PREFIX_RE = re.compile(r"^\(?[a-z][\)\.:]\s+")
+
+def _normalize(text: str) -> str:
+    text = " ".join(text.strip().lower().split())
+    return text.strip(" .;")
+
+def _strip_label(text: str) -> str:
+    return _LABEL_PREFIX_RE.sub("", text)
+
+def _resolve_one(token: str, options: List[str]) -> Optional[int]:
+    """Map a single answer token (option letter or option text) to an option index."""
+    norm = _normalize(token)
+    if not norm:
+        return None
+    label = _LABEL_RE.match(norm)
+    if label:
+        index = ord(label.group(1)) - ord("a")
+        if index < len(options):
+            return index
+    for i, option in enumerate(options):
+        norm_option = _normalize(option)
+        if norm in (norm_option, _strip_label(norm_option)) or _strip_label(norm) in (norm_option, _strip_label(norm_option)):
+            return i
+    return None
+
+def resolve_options(answer: str, options: List[str]) -> Optional[Set[int]]:
+    """
+    Resolve an answer to the set of option indexes it selects.
+    Handles the comma separated multi-answer format, greedily re-joining pieces
+    because option text itself may contain commas. Returns None when any part
+    cannot be matched to an option.
+    """
+    if not answer or not options:
+        return None
+    pieces = answer.split(",")
+    selected: Set[int] = set()
+    i = 0
+    while i < len(pieces):
+        for j in range(len(pieces), i, -1):
+            index = _resolve_one(",".join(pieces[i:j]), options)
+            if index is not None:
+                selected.add(index)
+                i = j
+                break
+        else:
+            return None
+    return selected or None
+
+def grade_mcq(options: Optional[List[str]], correct_answer: Optional[str], user_answer: Optional[str]) -> Optional[bool]:
+    """
+    Grade an MCQ answer locally. Tolerates option letters, exact option text and
+    reordering of multi-answer selections. Returns None when the answer key or the
+    answer cannot be mapped onto the options, so the caller can fall back to the LLM.
+    """
+    if not options or not correct_answer or not user_answer:
+        return None
+    expected = resolve_options(correct_answer, options)
+    given = resolve_options(user_answer, options)
+    if expected is None or given is None:
+        return None
+    return expected == given
@@ -1,134 +1,623 @@
+import asyncio
+import random
+import weakref
+from datetime import datetime, timedelta
 from uuid import UUID
-from typing import Optional, List
-from ..models import ExamSession, Phase, Question, QuestionType
-from ..services.llm_service import LLMService
-from .storage import Storage
+from typing import Any, AsyncIterator, Optional, List, NamedTuple, Callable, Dict, Tuple, Union, BinaryIO
+from ..config import Settings
+from ..models import ExamSession, Phase, Question, QuestionType, BatchQuestions, AnswerEvaluation
+from ..services.llm_service import AsyncLLMService
+from ..services.tracing import span, traced
+from .grading import grade_mcq
+from .question_bank import AsyncQuestionBank
+from .storage import AsyncStorage, VersionConflictError, diff_session
 
-class ExamOrchestrator:
-    def __init__(self, storage: Storage):
+GRADING_MODES = ("immediate", "deferred")
+
+class QuestionNotReadyError(Exception):
+    """The next question is still being generated in the background."""
+
+class GenerationShard(NamedTuple):
+    topic: str
+    type: str
+    count: int
+
+def plan_question_mix(count: int, topics: List[str], types: List[str]) -> Dict[Tuple[str, str], int]:
+    """
+    Spread `count` questions over (topic, type) combinations.
+    Question i goes to topics[i % T] / types[(i // T) % Ty], so every combination is
+    covered before any repeats.
+    """
+    topics = topics or ["General"]
+    types = types or ["MCQ"]
+    mix: Dict[Tuple[str, str], int] = {}
+    for i in range(count):
+        combo = (topics[i % len(topics)], types[(i // len(topics)) % len(types)])
+        mix[combo] = mix.get(combo, 0) + 1
+    return mix
+
+def plan_generation_shards(mix: Dict[Tuple[str, str], int], shard_size: int) -> List[GenerationShard]:
+    """Split a question mix into (topic, type) shards of at most `shard_size` questions."""
+    shards = []
+    size = max(1, shard_size)
+    for (topic, q_type), n in mix.items():
+        while n > 0:
+            shards.append(GenerationShard(topic, q_type, min(size, n)))
+            n -= size
+    return shards
+
+class AsyncExamOrchestrator:
+    """The exam flow behind the API routes, awaiting LLM calls and storage I/O."""
+
+    def __init__(self, storage: AsyncStorage, llm: Optional[AsyncLLMService] = None, settings: Optional[Settings] = None, bank: Optional[AsyncQuestionBank] = None):
         self.storage = storage
-        self.llm = LLMService()
-        self.setup_questions = [
-            "What is the exam difficulty level? (Beginner, Intermediate, Advanced)",
-            "Which topics should be included? (e.g. SQL, PySpark, Kafka, AWS)",
-            "How many total questions do you want? (Numeric)",
-            "Which question types should be included? (MCQ, Coding, Architecture)",
-            "Do you want project-based questions? (Yes/No)"
-        ]
-
-    def create_session(self, candidate_name: str, difficulty: str = "Intermediate", topics: List[str] = [], total_questions_count: int = 5, question_types: List[str] = ["MCQ"], provider: str = "openai") -> ExamSession:
-        print(f"ORCH: Creating session for {candidate_name} with {provider}")
+        self.llm = llm or AsyncLLMService()
+        self.settings = settings or Settings.from_env()
+        self.bank = bank
+        # Per-session locks serialise read-modify-write against background appends
+        self._locks: "weakref.WeakValueDictionary[UUID, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # Signalled whenever a background shard lands for a session
+        self._arrivals: Dict[UUID, asyncio.Event] = {}
+        self._background: set = set()
+        # Deferred grading: sessions being graded by this process, and the process-wide
+        # cap on batch evaluation requests in flight
+        self._grading: set = set()
+        self._grading_slots = asyncio.Semaphore(max(1, self.settings.deferred_grading_concurrency))
+
+    def _new_session(self, candidate_name: str, difficulty: str, topics: List[str], total_questions_count: int, question_types: List[str], provider: str, grading_mode: str = "immediate") -> ExamSession:
         session = ExamSession(candidate_name=candidate_name)
-        
+
         # Apply Configuration
         session.difficulty = difficulty
         session.topics = topics
         session.total_questions_count = total_questions_count
         session.question_types = question_types
         session.provider = provider
-        session.setup_step = 5 
-
-        # BATCH GENERATION
-        print("ORCH: Generating Batch Questions...")
-        batch = self.llm.generate_batch_questions(
-            count=total_questions_count,
-            difficulty=difficulty,
-            topics=topics,
-            types=question_types,
-            provider=provider
-        )
-        
+        session.grading_mode = grading_mode
+        session.setup_step = 5
+        return session
+
+    def _to_questions(self, batch: BatchQuestions, topic: Optional[str] = None) -> List[Question]:
         # Convert to Internal Questions
-        for q_gen in batch.questions:
-            # Safe enum conversion
-            try:
-                q_type_str = q_gen.type.upper().replace(" ", "_")
-                q_type = QuestionType[q_type_str]
-            except:
-                q_type = QuestionType.MCQ
-
-            new_q = Question(
-                question_text=q_gen.question,
-                difficulty=q_gen.difficulty,
-                type=q_type,
-                options=q_gen.options,
-                correct_answer=q_gen.correct_answer,
-                explanation=q_gen.explanation,
-                concept=q_gen.concept,
-                constraints=q_gen.constraints
-            )
-            session.questions.append(new_q)
+        questions = []
+        with span("orchestrator.to_questions", **{"questions.count": len(batch.questions)}):
+            for q_gen in batch.questions:
+                # Safe enum conversion
+                try:
+                    q_type_str = q_gen.type.upper().replace(" ", "_")
+                    q_type = QuestionType[q_type_str]
+                except:
+                    q_type = QuestionType.MCQ
 
-        session.status = Phase.EXAM_LOOP
-        session.current_question_index = 0
-        
-        print(f"ORCH: Saving session {session.id} with {len(session.questions)} questions")
-        self.storage.save_session(session)
-        return session
-    
-    def get_session(self, session_id: UUID) -> ExamSession:
-        session = self.storage.get_session(session_id)
-        if not session:
-            raise ValueError("Session not found")
-        return session
+                questions.append(Question(
+                    question_text=q_gen.question,
+                    difficulty=q_gen.difficulty,
+                    type=q_type,
+                    options=q_gen.options,
+                    correct_answer=q_gen.correct_answer,
+                    explanation=q_gen.explanation,
+                    concept=q_gen.concept,
+                    topic=topic,
+                    constraints=q_gen.constraints
+                ))
+        return questions
 
-    def submit_answer(self, session_id: UUID, answer: str, audio_data: str = None):
-        session = self.get_session(session_id)
-        current_q = session.questions[session.current_question_index]
-        
-        # Handle Audio Transcription
+    def _combine_answer(self, answer: str, transcript: Optional[str]) -> str:
         final_answer = answer
-        if audio_data:
-            print(f"ORCH: Transcribing Audio for {session_id}")
-            transcript = self.llm.transcribe_audio(audio_data)
+        if transcript is not None:
             if final_answer:
                 final_answer += f"\n\n[Audio Transcript]: {transcript}"
             else:
                 final_answer = f"[Audio Transcript]: {transcript}"
-        
-        current_q.user_answer = final_answer
-        
-        # LLM EVALUATION
-        print(f"ORCH: Evaluating Answer for {current_q.id} using {session.provider}")
-        evaluation = self.llm.evaluate_answer(
-            question_text=current_q.question_text,
-            correct_ref=current_q.correct_answer or "Assessed by constraints",
+        return final_answer
+
+    def _evaluation_kwargs(self, session: ExamSession, question: Question, final_answer: str) -> dict:
+        return dict(
+            question_text=question.question_text,
+            correct_ref=question.correct_answer or "Assessed by constraints",
             user_answer=final_answer,
-            options=current_q.options, # Pass options for context
-            constraints=current_q.constraints, # Pass constraints for context
-            provider=session.provider
+            options=question.options, # Pass options for context
+            constraints=question.constraints, # Pass constraints for context
+            provider=session.provider,
+            question_type=question.type.value # Decides how the answer is normalised for the cache
         )
-        
-        current_q.is_correct = evaluation.is_correct
-        current_q.feedback = evaluation.reason
-        
+
+    def _format_explanation(self, evaluation: AnswerEvaluation) -> str:
         # Enriched explanation construction
         full_explanation = f"{evaluation.explanation}\n\nConfidence: {evaluation.confidence}"
-        
+
         if evaluation.code_snippet:
              full_explanation += f"\n\n#### 💻 Reference Code\n```python\n{evaluation.code_snippet}\n```"
-        
+
         if evaluation.related_topics:
              topics_list = ", ".join(evaluation.related_topics)
              full_explanation += f"\n\n#### 🧠 Related Concepts\n{topics_list}"
-             
+
         if evaluation.learning_resources:
              resources_str = "\n".join([f"- {r}" for r in evaluation.learning_resources])
              full_explanation += f"\n\n#### 🔗 Learning Resources\n{resources_str}"
-        
-        current_q.explanation = full_explanation
-        
-        if current_q.is_correct: 
+
+        return full_explanation
+
+    def _apply_evaluation(self, session: ExamSession, current_q: Question, evaluation: AnswerEvaluation):
+        current_q.is_correct = evaluation.is_correct
+        current_q.feedback = evaluation.reason
+        current_q.explanation = self._format_explanation(evaluation)
+
+        if current_q.is_correct:
+            session.current_score += 1
+
+    def _grade_locally(self, current_q: Question, final_answer: str) -> Optional[bool]:
+        # MCQs with a stored answer key are a set comparison; voice answers still go to the LLM
+        if current_q.type != QuestionType.MCQ or "[Audio Transcript]" in final_answer:
+            return None
+        return grade_mcq(current_q.options, current_q.correct_answer, final_answer)
+
+    def _apply_local_grade(self, session: ExamSession, current_q: Question, is_correct: bool):
+        current_q.is_correct = is_correct
+        current_q.feedback = f"Graded against the answer key: {current_q.correct_answer}"
+        # Show the answer-key explanation straight away; the detailed analysis follows later
+        if not (current_q.explanation or "").startswith("**Correct answer:**"):
+            current_q.explanation = f"**Correct answer:** {current_q.correct_answer}\n\n{current_q.explanation or ''}".strip()
+        current_q.explanation_pending = True
+
+        if current_q.is_correct:
             session.current_score += 1
-        
-        self.storage.save_session(session)
-        return evaluation.is_correct, current_q.explanation
-
-    def next_question_state(self, session_id: UUID):
-         session = self.get_session(session_id)
-         if session.current_question_index < len(session.questions) - 1:
-             session.current_question_index += 1
-         else:
-             session.status = Phase.COMPLETED
-         self.storage.save_session(session)
-         return session
+
+    def _apply_enrichment(self, current_q: Question, evaluation: Optional[AnswerEvaluation]):
+        # Only the feedback text changes; the local grade and score stay authoritative
+        if evaluation is not None:
+            current_q.explanation = f"**Correct answer:** {current_q.correct_answer}\n\n{self._format_explanation(evaluation)}"
+        current_q.explanation_pending = False
+
+    def _advance(self, session: ExamSession):
+        if session.current_question_index < len(session.questions) - 1:
+            session.current_question_index += 1
+        elif session.pending_question_count > 0:
+            raise QuestionNotReadyError("Next question is still being generated")
+        else:
+            session.status = Phase.COMPLETED
+
+    def _lock(self, session_id: UUID) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    def _spawn(self, coro) -> asyncio.Task:
+        # Keep a strong reference so the task is not garbage collected mid-flight
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def aclose(self):
+        for task in list(self._background):
+            task.cancel()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    @traced("orchestrator.mutate")
+    async def _mutate(self, session_id: UUID, change: Callable[[ExamSession], None]) -> ExamSession:
+        """
+        Load, apply `change` and commit with compare-and-swap on the session version.
+        The asyncio lock orders writers within this process; the version check catches
+        other workers. On a conflict only `change` is re-run against the fresh state,
+        so callers should keep expensive work (LLM calls) outside of it.
+        """
+        attempts = self.settings.storage_conflict_retries + 1
+        for attempt in range(attempts):
+            async with self._lock(session_id):
+                session = await self.get_session(session_id)
+                expected = session.version
+                before = session.model_dump(mode="json")
+                change(session)
+                session.version = expected + 1
+                try:
+                    # Only the delta is persisted when storage runs in event-log mode
+                    await self.storage.record(session, diff_session(before, session.model_dump(mode="json")), expected_version=expected)
+                    return session
+                except VersionConflictError:
+                    if attempt == attempts - 1:
+                        raise
+                    print(f"ORCH: Version conflict on {session_id}, retrying")
+            await asyncio.sleep(random.uniform(0, 0.01 * (attempt + 1)))
+
+    async def _generate_shard(self, index: int, shard: GenerationShard, difficulty: str, provider: str, generated: asyncio.Queue):
+        """
+        Stream one shard's questions onto `generated` as (index, [question]) the moment
+        each is complete, then (index, None) once the shard is finished or has failed.
+        """
+        fresh = []
+        try:
+            with span("orchestrator.generate_shard", **{"shard.topic": shard.topic, "shard.type": shard.type, "shard.count": shard.count}):
+                async for q_gen in self.llm.stream_batch_questions(
+                    count=shard.count,
+                    difficulty=difficulty,
+                    topics=[shard.topic],
+                    types=[shard.type],
+                    provider=provider
+                ):
+                    # Extras are read to the end of the stream but not served
+                    if len(fresh) < shard.count:
+                        fresh.append(q_gen)
+                        generated.put_nowait((index, self._to_questions(BatchQuestions(questions=[q_gen]), topic=shard.topic)))
+            # Simulated questions must never be served once real keys are configured
+            if fresh and self.bank is not None and not self.llm.is_simulated(provider):
+                # Bank everything we paid for; these count as served once (to this session)
+                try:
+                    await self.bank.add(difficulty, shard.topic, shard.type, fresh, used=True)
+                except Exception as e:
+                    print(f"ORCH: Could not bank questions: {e}")
+        except Exception as e:
+            print(f"ORCH: Shard {shard.topic}/{shard.type} failed: {e}")
+        finally:
+            generated.put_nowait((index, None))
+
+    def _append_questions(self, session: ExamSession, questions: List[Question]):
+        session.questions.extend(questions)
+        session.pending_question_count = max(0, session.pending_question_count - len(questions))
+
+    def _close_shard(self, session: ExamSession, shortfall: int):
+        # Shrink the exam if the shard came back short (or failed) so it can still complete
+        session.pending_question_count = max(0, session.pending_question_count - shortfall)
+        session.total_questions_count -= shortfall
+
+    @traced("orchestrator.create_session")
+    async def create_session(self, candidate_name: str, difficulty: str = "Intermediate", topics: List[str] = [], total_questions_count: int = 5, question_types: List[str] = ["MCQ"], provider: str = "openai", grading_mode: str = "immediate") -> ExamSession:
+        print(f"ORCH: Creating session for {candidate_name} with {provider}")
+        session = self._new_session(candidate_name, difficulty, topics, total_questions_count, question_types, provider, grading_mode)
+
+        mix = plan_question_mix(total_questions_count, topics, question_types)
+
+        # QUESTION BANK: serve what we can from previously generated questions
+        if self.bank is not None:
+            try:
+                banked = await self.bank.take_many(difficulty, mix)
+            except Exception as e:
+                print(f"ORCH: Question bank unavailable: {e}")
+                banked = {}
+            for (topic, q_type), found in banked.items():
+                session.questions.extend(self._to_questions(BatchQuestions(questions=found), topic=topic))
+                mix[(topic, q_type)] -= len(found)
+            print(f"ORCH: Served {len(session.questions)} questions from the bank")
+
+        # SHARDED GENERATION: fire the shortfall concurrently and stream the questions in,
+        # returning as soon as the first one is complete
+        shards = plan_generation_shards(mix, self.settings.generation_shard_size)
+        print(f"ORCH: Generating {sum(s.count for s in shards)} questions in {len(shards)} shards...")
+        generated: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._generate_shard(i, shard, difficulty, provider, generated)) for i, shard in enumerate(shards)]
+        delivered = [0] * len(shards)
+        unfinished = set(range(len(shards)))
+        session.pending_question_count = sum(shard.count for shard in shards)
+
+        while unfinished and not session.questions:
+            index, questions = await generated.get()
+            if questions is None:
+                unfinished.discard(index)
+                self._close_shard(session, shards[index].count - delivered[index])
+            else:
+                delivered[index] += len(questions)
+                self._append_questions(session, questions)
+
+        if not session.questions:
+            raise ValueError("Question generation failed")
+
+        session.status = Phase.EXAM_LOOP
+        session.current_question_index = 0
+
+        print(f"ORCH: Saving session {session.id} with {len(session.questions)} questions ({session.pending_question_count} pending)")
+        await self.storage.save_session(session)
+
+        if unfinished:
+            self._arrivals[session.id] = asyncio.Event()
+            self._spawn(self._collect_shards(session.id, tasks, shards, generated, delivered, unfinished))
+        return session
+
+    async def _collect_shards(self, session_id: UUID, tasks: List[asyncio.Task], shards: List[GenerationShard], generated: asyncio.Queue, delivered: List[int], unfinished: set):
+        """Append each question to the session as it streams in, until every shard has finished."""
+        try:
+            while unfinished:
+                index, questions = await generated.get()
+                # Bookkeeping stays outside the change: _mutate may re-run it on a conflict
+                if questions is None:
+                    unfinished.discard(index)
+                    shortfall = shards[index].count - delivered[index]
+                    if shortfall:
+                        await self._mutate(session_id, lambda s: self._close_shard(s, shortfall))
+                else:
+                    delivered[index] += len(questions)
+                    await self._mutate(session_id, lambda s: self._append_questions(s, questions))
+                    print(f"ORCH: Appended {len(questions)} questions to {session_id}")
+                self._arrivals[session_id].set()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Wake any waiter one last time so it sees the final state
+            self._arrivals.pop(session_id).set()
+
+    async def get_session(self, session_id: UUID) -> ExamSession:
+        session = await self.storage.get_session(session_id)
+        if not session:
+            raise ValueError("Session not found")
+        if session.grading_pending:
+            # Resumes grading that a restart (or another worker's crash) interrupted
+            self._start_grading(session.id)
+        return session
+
+    @traced("orchestrator.submit_answer")
+    async def submit_answer(self, session_id: UUID, answer: str, audio_data: Union[str, BinaryIO, None] = None, audio_filename: str = "audio.wav") -> Question:
+        transcript = await self.transcribe(session_id, audio_data, audio_filename)
+        return await self.grade_answer(session_id, self._combine_answer(answer, transcript))
+
+    @traced("orchestrator.transcribe")
+    async def transcribe(self, session_id: UUID, audio_data: Union[str, BinaryIO, None], audio_filename: str = "audio.wav") -> Optional[str]:
+        if not audio_data:
+            return None
+        print(f"ORCH: Transcribing Audio for {session_id}")
+        return await self.llm.transcribe_audio(audio_data, audio_filename)
+
+    @traced("orchestrator.grade_answer")
+    async def grade_answer(self, session_id: UUID, final_answer: str, question_id: Optional[UUID] = None) -> Question:
+        """Evaluate and record `final_answer` for `question_id` (default: the current question)."""
+        session = await self.get_session(session_id)
+        if question_id is None:
+            current_q = session.questions[session.current_question_index]
+        else:
+            current_q = next((q for q in session.questions if q.id == question_id), None)
+            if current_q is None:
+                raise ValueError("Question not found")
+        if current_q.is_correct is not None:
+            # Already graded (duplicate submit or a resumed job); nothing to pay for again
+            return current_q
+        if session.grading_mode == "deferred":
+            return await self._record_answer(session_id, current_q.id, final_answer)
+
+        local_grade = self._grade_locally(current_q, final_answer)
+        evaluation = None
+        if local_grade is None:
+            # LLM EVALUATION (outside the lock so background shards are not held up)
+            print(f"ORCH: Evaluating Answer for {current_q.id} using {session.provider}")
+            evaluation = await self.llm.evaluate_answer(**self._evaluation_kwargs(session, current_q, final_answer))
+        else:
+            print(f"ORCH: Graded MCQ {current_q.id} locally")
+
+        question, graded = await self._record_grade(session_id, current_q.id, final_answer, local_grade, evaluation)
+        if local_grade is not None and graded:
+            self._spawn(self._enrich_feedback(session_id, session, current_q, final_answer))
+        return question
+
+    async def _record_grade(self, session_id: UUID, question_id: UUID, final_answer: str, local_grade: Optional[bool], evaluation: Optional[AnswerEvaluation]) -> Tuple[Question, bool]:
+        """Store the answer with its grade; False if the question had been graded meanwhile."""
+        answered = {}
+        def record(s: ExamSession):
+            q = next(q for q in s.questions if q.id == question_id)
+            answered["question"] = q
+            if q.is_correct is not None:
+                # A concurrent submit (possibly on another worker) already graded it
+                return
+            answered["graded"] = True
+            q.user_answer = final_answer
+            if evaluation is not None:
+                self._apply_evaluation(s, q, evaluation)
+            else:
+                self._apply_local_grade(s, q, local_grade)
+
+        await self._mutate(session_id, record)
+        return answered["question"], answered.get("graded", False)
+
+    async def stream_submit_answer(self, session_id: UUID, answer: str, audio_data: Union[str, BinaryIO, None] = None, audio_filename: str = "audio.wav") -> AsyncIterator[Tuple[str, Any]]:
+        transcript = await self.transcribe(session_id, audio_data, audio_filename)
+        async for event in self.stream_grade_answer(session_id, self._combine_answer(answer, transcript)):
+            yield event
+
+    async def stream_grade_answer(self, session_id: UUID, final_answer: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        grade_answer() for the current question as a stream of events: ("explanation",
+        text) fragments while the LLM writes its analysis, ("grade", Question) once the
+        grade is known (straight away for MCQs) and finally ("result", Question).
+        """
+        session = await self.get_session(session_id)
+        current_q = session.questions[session.current_question_index]
+        if current_q.is_correct is not None or session.grading_mode == "deferred":
+            question = await self.grade_answer(session_id, final_answer, current_q.id)
+            yield "result", question
+            return
+
+        local_grade = self._grade_locally(current_q, final_answer)
+        if local_grade is not None:
+            print(f"ORCH: Graded MCQ {current_q.id} locally")
+            question, graded = await self._record_grade(session_id, current_q.id, final_answer, local_grade, None)
+            yield "grade", question
+            if not graded:
+                yield "result", question
+                return
+        else:
+            print(f"ORCH: Evaluating Answer for {current_q.id} using {session.provider} (streamed)")
+
+        evaluation = None
+        try:
+            async for event, value in self.llm.stream_evaluation(**self._evaluation_kwargs(session, current_q, final_answer)):
+                if event == "explanation":
+                    yield "explanation", value
+                else:
+                    evaluation = value
+        except Exception as e:
+            if local_grade is None:
+                raise
+            print(f"ORCH: Could not enrich feedback for {current_q.id}: {e}")
+        except BaseException:
+            # The client went away mid-analysis; finish the MCQ's feedback in the background
+            if local_grade is not None:
+                self._spawn(self._enrich_feedback(session_id, session, current_q, final_answer))
+            raise
+
+        if local_grade is not None:
+            question = await self._save_enrichment(session_id, current_q.id, evaluation)
+        else:
+            question, _ = await self._record_grade(session_id, current_q.id, final_answer, None, evaluation)
+            yield "grade", question
+        yield "result", question
+
+    async def watch_questions(self, session_id: UUID, after: int = 0) -> AsyncIterator[Tuple[int, Question]]:
+        """Yield (index, question) for questions past `after` as they are generated, until none are pending."""
+        while True:
+            arrival = self._arrivals.get(session_id)
+            if arrival is not None:
+                arrival.clear()
+            session = await self.get_session(session_id)
+            for index in range(after, len(session.questions)):
+                yield index, session.questions[index]
+            after = max(after, len(session.questions))
+            if session.pending_question_count == 0 or self._abandon_stale_generation(session):
+                return
+            if arrival is None:
+                # Shards running on another worker do not signal this one; re-read instead
+                await asyncio.sleep(1.0)
+                continue
+            try:
+                await asyncio.wait_for(arrival.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _record_answer(self, session_id: UUID, question_id: UUID, final_answer: str) -> Question:
+        """Deferred grading: store the answer only; it can be changed until the exam completes."""
+        recorded = {}
+        def record(s: ExamSession):
+            q = next(q for q in s.questions if q.id == question_id)
+            recorded["question"] = q
+            if s.status != Phase.COMPLETED:
+                q.user_answer = final_answer
+
+        await self._mutate(session_id, record)
+        print(f"ORCH: Recorded answer for {question_id} (deferred grading)")
+        return recorded["question"]
+
+    def _start_grading(self, session_id: UUID):
+        # Another worker may grade the same session after a restart; only ungraded
+        # questions are ever written, so the duplicate work cannot double-count
+        if session_id in self._grading:
+            return
+        self._grading.add(session_id)
+        task = self._spawn(self._grade_deferred(session_id))
+        task.add_done_callback(lambda _: self._grading.discard(session_id))
+
+    @traced("orchestrator.grade_batch")
+    async def _grade_batch(self, session: ExamSession, batch: List[Question]) -> Dict[UUID, AnswerEvaluation]:
+        """Evaluate `batch` with one LLM request, falling back to one request per answer it missed."""
+        answers = {}
+        for index, q in enumerate(batch, 1):
+            kwargs = self._evaluation_kwargs(session, q, q.user_answer)
+            del kwargs["provider"]
+            answers[str(index)] = kwargs # Short ids keep the prompt small
+
+        async with self._grading_slots:
+            try:
+                results = await self.llm.evaluate_answers(answers, session.provider)
+            except Exception as e:
+                print(f"ORCH: Batch grading failed for {session.id}: {e}")
+                results = {}
+            evaluations = {batch[int(answer_id) - 1].id: evaluation for answer_id, evaluation in results.items()}
+
+            for q in batch:
+                if q.id in evaluations:
+                    continue
+                try:
+                    evaluations[q.id] = await self.llm.evaluate_answer(**self._evaluation_kwargs(session, q, q.user_answer))
+                except Exception as e:
+                    print(f"ORCH: Could not grade {q.id}: {e}")
+        return evaluations
+
+    @traced("orchestrator.grade_deferred")
+    async def _grade_deferred(self, session_id: UUID):
+        """Grade every recorded answer of a completed deferred-grading exam."""
+        session = await self.get_session(session_id)
+        answered = [q for q in session.questions if q.is_correct is None and q.user_answer]
+        size = max(1, self.settings.deferred_grading_batch_size)
+        batches = [answered[i:i + size] for i in range(0, len(answered), size)]
+        print(f"ORCH: Grading {len(answered)} answers of {session_id} in {len(batches)} batches")
+        # MCQs are graded against the key below, but still go out for the detailed analysis
+        results = await asyncio.gather(*(self._grade_batch(session, batch) for batch in batches))
+        evaluations = {question_id: evaluation for result in results for question_id, evaluation in result.items()}
+
+        def apply(s: ExamSession):
+            for q in s.questions:
+                if q.is_correct is not None:
+                    continue
+                if not q.user_answer:
+                    q.is_correct = False
+                    q.feedback = "No answer was submitted."
+                    continue
+                evaluation = evaluations.get(q.id)
+                local_grade = self._grade_locally(q, q.user_answer)
+                if local_grade is not None:
+                    self._apply_local_grade(s, q, local_grade)
+                    self._apply_enrichment(q, evaluation)
+                elif evaluation is not None:
+                    self._apply_evaluation(s, q, evaluation)
+                else:
+                    q.feedback = "Automatic grading failed; this answer needs a manual review."
+            s.grading_pending = False
+
+        await self._mutate(session_id, apply)
+        print(f"ORCH: Finished grading {session_id}")
+
+    @traced("orchestrator.enrich_feedback")
+    async def _enrich_feedback(self, session_id: UUID, session: ExamSession, current_q: Question, final_answer: str):
+        """Produce the detailed LLM analysis for a locally graded answer in the background."""
+        try:
+            evaluation = await self.llm.evaluate_answer(**self._evaluation_kwargs(session, current_q, final_answer))
+        except Exception as e:
+            print(f"ORCH: Could not enrich feedback for {current_q.id}: {e}")
+            evaluation = None
+
+        await self._save_enrichment(session_id, current_q.id, evaluation)
+
+    async def _save_enrichment(self, session_id: UUID, question_id: UUID, evaluation: Optional[AnswerEvaluation]) -> Question:
+        enriched = {}
+        def enrich(s: ExamSession):
+            q = next(q for q in s.questions if q.id == question_id)
+            self._apply_enrichment(q, evaluation)
+            enriched["question"] = q
+
+        await self._mutate(session_id, enrich)
+        return enriched["question"]
+
+    def _abandon_stale_generation(self, session: ExamSession) -> bool:
+        # Generation state does not survive a restart; give up on questions nobody is producing
+        if session.id in self._arrivals or session.pending_question_count == 0:
+            return False
+        return datetime.utcnow() - session.created_at > timedelta(seconds=self.settings.generation_timeout)
+
+    @traced("orchestrator.next_question_state")
+    async def next_question_state(self, session_id: UUID):
+        deadline = asyncio.get_running_loop().time() + self.settings.question_wait_timeout
+        while True:
+            arrival = self._arrivals.get(session_id)
+            if arrival is not None:
+                arrival.clear()
+            try:
+                def advance(s: ExamSession):
+                    if self._abandon_stale_generation(s):
+                        s.total_questions_count -= s.pending_question_count
+                        s.pending_question_count = 0
+                    completed = s.status == Phase.COMPLETED
+                    self._advance(s)
+                    if s.grading_mode == "deferred" and s.status == Phase.COMPLETED and not completed:
+                        # Set in the same write that completes the exam, so a crash cannot lose it
+                        s.grading_pending = True
+                session = await self._mutate(session_id, advance)
+                if session.grading_pending:
+                    self._start_grading(session_id)
+                return session
+            except QuestionNotReadyError:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if arrival is None or remaining <= 0:
+                    raise
+                print(f"ORCH: Waiting for next question of {session_id}")
+                try:
+                    await asyncio.wait_for(arrival.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    raise QuestionNotReadyError("Next question is still being generated")
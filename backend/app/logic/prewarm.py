@@ -0,0 +1,128 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+from ..config import Settings
+from ..services.llm_service import AsyncLLMService
+from .question_bank import AsyncQuestionBank
+
+ConfigKey = Tuple[str, Tuple[str, ...], Tuple[str, ...]] # (difficulty, topics, question_types)
+PoolKey = Tuple[str, str, str] # (difficulty, topic, type)
+
+class QuestionPoolPrewarmer:
+    """
+    Keeps the question bank topped up for the most requested exam configurations.
+    Popularity decays every pass so yesterday's favourites stop being refilled.
+    Refills only run while the API is idle and never exceed `prewarm_concurrency` LLM calls.
+    """
+
+    DECAY = 0.9
+
+    def __init__(self, bank: AsyncQuestionBank, llm: AsyncLLMService, settings: Optional[Settings] = None, is_idle: Callable[[], bool] = lambda: True):
+        self.bank = bank
+        self.llm = llm
+        self.settings = settings or Settings.from_env()
+        self.is_idle = is_idle
+        self.popularity: Dict[ConfigKey, float] = {}
+        self.providers: Dict[ConfigKey, str] = {}
+        self.generated = 0
+        self._semaphore = asyncio.Semaphore(max(1, self.settings.prewarm_concurrency))
+        self._task: Optional[asyncio.Task] = None
+
+    def record_request(self, difficulty: str, topics: List[str], question_types: List[str], provider: str = "openai"):
+        key = (difficulty, tuple(topics or ["General"]), tuple(question_types or ["MCQ"]))
+        self.popularity[key] = self.popularity.get(key, 0.0) + 1.0
+        self.providers[key] = provider
+
+    def popular_configs(self) -> List[ConfigKey]:
+        ranked = sorted(self.popularity.items(), key=lambda item: item[1], reverse=True)
+        return [key for key, _ in ranked[:self.settings.prewarm_top_configs]]
+
+    def pool_targets(self) -> Dict[PoolKey, str]:
+        """Every (difficulty, topic, type) pool of a popular config, mapped to the provider to fill it with."""
+        targets: Dict[PoolKey, str] = {}
+        for key in self.popular_configs():
+            difficulty, topics, types = key
+            for topic in topics:
+                for q_type in types:
+                    targets.setdefault((difficulty, topic, q_type), self.providers.get(key, "openai"))
+        return targets
+
+    async def refill_once(self):
+        if not self.is_idle():
+            return
+        jobs = []
+        for (difficulty, topic, q_type), provider in self.pool_targets().items():
+            if self.llm.is_simulated(provider):
+                # Fake and mock questions must not end up in the bank
+                continue
+            deficit = self.settings.prewarm_target - await self.bank.depth(difficulty, topic, q_type)
+            size = max(1, self.settings.generation_shard_size)
+            while deficit > 0:
+                jobs.append(self._refill(difficulty, topic, q_type, min(size, deficit), provider))
+                deficit -= size
+        if jobs:
+            await asyncio.gather(*jobs)
+
+        for key in list(self.popularity):
+            self.popularity[key] *= self.DECAY
+            if self.popularity[key] < 0.05:
+                del self.popularity[key]
+                self.providers.pop(key, None)
+
+    async def _refill(self, difficulty: str, topic: str, q_type: str, count: int, provider: str):
+        async with self._semaphore:
+            # Re-check once we have a slot; live traffic takes priority over pre-warming
+            if not self.is_idle():
+                return
+            try:
+                batch = await self.llm.generate_batch_questions(count=count, difficulty=difficulty, topics=[topic], types=[q_type], provider=provider)
+                await self.bank.add(difficulty, topic, q_type, batch.questions[:count])
+                self.generated += len(batch.questions[:count])
+            except Exception as e:
+                print(f"PREWARM: Failed to refill {difficulty}/{topic}/{q_type}: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.settings.prewarm_interval)
+            try:
+                await self.refill_once()
+            except Exception as e:
+                print(f"PREWARM: Refill pass failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def report(self) -> dict:
+        pools = []
+        for (difficulty, topic, q_type) in self.pool_targets():
+            key_stats = self.bank.bank.stats_for(difficulty, topic, q_type)
+            served = key_stats["hits"] + key_stats["misses"]
+            pools.append({
+                "difficulty": difficulty,
+                "topic": topic,
+                "type": q_type,
+                "depth": await self.bank.depth(difficulty, topic, q_type),
+                "target": self.settings.prewarm_target,
+                "hits": key_stats["hits"],
+                "misses": key_stats["misses"],
+                "hit_rate": key_stats["hits"] / served if served else None,
+            })
+        total = self.bank.bank.hits + self.bank.bank.misses
+        return {
+            "bank_size": await self.bank.size(),
+            "hits": self.bank.bank.hits,
+            "misses": self.bank.bank.misses,
+            "hit_rate": self.bank.bank.hits / total if total else None,
+            "prewarmed_questions": self.generated,
+            "popular_configs": [
+                {"difficulty": d, "topics": list(t), "question_types": list(q), "score": round(self.popularity[(d, t, q)], 2)}
+                for (d, t, q) in self.popular_configs()
+            ],
+            "pools": pools,
+        }
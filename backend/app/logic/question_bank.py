@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from ..config import Settings
+from ..models import QuestionGenerated
+from ..services.metrics import observe_cache
+
+# current file: backend/app/logic/question_bank.py -> up 3 levels to root
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+BANK_PATH = os.path.join(BASE_DIR, "data", "question_bank.db")
+
+def _norm(value: Optional[str]) -> str:
+    return (value or "").strip().lower()
+
+def _fingerprint(question: QuestionGenerated) -> str:
+    text = " ".join(question.question.lower().split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class QuestionBank:
+    """
+    Persistent store of generated questions, indexed by (difficulty, topic, type, concept).
+    Questions expire after `max_age`, are retired after `max_uses` servings, and the
+    least recently used ones are evicted once the bank grows past `max_size`.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, path: str = BANK_PATH):
+        self.settings = settings or Settings.from_env()
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        # Per (difficulty, topic, type) serving stats for this process
+        self.key_stats: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS questions (
+                    fingerprint TEXT PRIMARY KEY,
+                    difficulty TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    concept TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    use_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_key ON questions (difficulty, topic, type, concept)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_lru ON questions (last_used_at)")
+
+    @contextmanager
+    def _connect(self):
+        # Short-lived connections keep this safe to call from worker threads and processes
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, difficulty: str, topic: str, q_type: str, questions: List[QuestionGenerated], used: bool = False):
+        """Store freshly generated questions. `used` counts them as served once already."""
+        now = time.time()
+        rows = [
+            (_fingerprint(q), _norm(difficulty), _norm(topic), _norm(q_type), _norm(q.concept),
+             q.model_dump_json(), now, now, 1 if used else 0)
+            for q in questions
+        ]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO questions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._evict(conn, now)
+
+    def take(self, difficulty: str, topic: str, q_type: str, count: int) -> List[QuestionGenerated]:
+        """Serve up to `count` questions for the key, least-used first and spread across concepts."""
+        if count <= 0:
+            return []
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                """
+                SELECT fingerprint, concept, payload FROM questions
+                WHERE difficulty = ? AND topic = ? AND type = ? AND use_count < ? AND created_at > ?
+                ORDER BY use_count, last_used_at
+                LIMIT ?
+                """,
+                (_norm(difficulty), _norm(topic), _norm(q_type), self.settings.question_bank_max_uses,
+                 now - self.settings.question_bank_max_age, count * 4),
+            ).fetchall()
+
+            # Prefer one question per concept before doubling up
+            picked, seen, rest = [], set(), []
+            for row in rows:
+                (rest if row[1] in seen else picked).append(row)
+                seen.add(row[1])
+            picked = (picked + rest)[:count]
+
+            conn.executemany(
+                "UPDATE questions SET use_count = use_count + 1, last_used_at = ? WHERE fingerprint = ?",
+                [(now, row[0]) for row in picked],
+            )
+
+        self.hits += len(picked)
+        self.misses += count - len(picked)
+        observe_cache("question_bank", True, len(picked))
+        observe_cache("question_bank", False, count - len(picked))
+        stats = self.key_stats.setdefault((_norm(difficulty), _norm(topic), _norm(q_type)), {"hits": 0, "misses": 0})
+        stats["hits"] += len(picked)
+        stats["misses"] += count - len(picked)
+        return [QuestionGenerated.model_validate_json(row[2]) for row in picked]
+
+    def stats_for(self, difficulty: str, topic: str, q_type: str) -> Dict[str, int]:
+        return dict(self.key_stats.get((_norm(difficulty), _norm(topic), _norm(q_type)), {"hits": 0, "misses": 0}))
+
+    def depth(self, difficulty: str, topic: str, q_type: str) -> int:
+        """Number of never-served, unexpired questions ready for the key."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM questions WHERE difficulty = ? AND topic = ? AND type = ? AND use_count = 0 AND created_at > ?",
+                (_norm(difficulty), _norm(topic), _norm(q_type), time.time() - self.settings.question_bank_max_age),
+            ).fetchone()
+        return row[0]
+
+    def size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute(
+            "DELETE FROM questions WHERE created_at <= ? OR use_count >= ?",
+            (now - self.settings.question_bank_max_age, self.settings.question_bank_max_uses),
+        )
+        conn.execute(
+            """
+            DELETE FROM questions WHERE fingerprint IN (
+                SELECT fingerprint FROM questions ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.settings.question_bank_max_size,),
+        )
+
+
+class AsyncQuestionBank:
+    """Awaitable facade over QuestionBank; SQLite work runs in a worker thread."""
+
+    def __init__(self, bank: Optional[QuestionBank] = None):
+        self.bank = bank or QuestionBank()
+
+    async def add(self, difficulty: str, topic: str, q_type: str, questions: List[QuestionGenerated], used: bool = False):
+        await asyncio.to_thread(self.bank.add, difficulty, topic, q_type, questions, used)
+
+    async def take(self, difficulty: str, topic: str, q_type: str, count: int) -> List[QuestionGenerated]:
+        return await asyncio.to_thread(self.bank.take, difficulty, topic, q_type, count)
+
+    async def depth(self, difficulty: str, topic: str, q_type: str) -> int:
+        return await asyncio.to_thread(self.bank.depth, difficulty, topic, q_type)
+
+    async def size(self) -> int:
+        return await asyncio.to_thread(self.bank.size)
+
+    async def take_many(self, difficulty: str, wanted: Dict[Tuple[str, str], int]) -> Dict[Tuple[str, str], List[QuestionGenerated]]:
+        return await asyncio.to_thread(
+            lambda: {(topic, q_type): self.bank.take(difficulty, topic, q_type, n) for (topic, q_type), n in wanted.items()}
+        )
@@ -0,0 +1,270 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from ..models import ExamSession
+from ..services.metrics import observe_cache
+from .storage import Storage, VersionConflictError
+
+SYNC = "sync" # write-through: every change hits disk before the request returns
+INTERVAL = "interval" # write-behind: dirty sessions are flushed every `flush_interval_ms`
+EVICTION = "eviction" # write-behind: dirty sessions are flushed only when evicted or on shutdown
+
+class _Dirty:
+    __slots__ = ("session", "events", "full")
+
+    def __init__(self, session: ExamSession):
+        self.session = session
+        self.events: List[Dict[str, Any]] = []
+        self.full = False # A full snapshot is required (e.g. new session)
+
+class CachedStorage:
+    """
+    Bounded LRU cache of hydrated ExamSession objects in front of Storage.
+    Hot sessions are served from memory without file I/O or pydantic validation;
+    writes go through immediately or are batched by a background flusher depending
+    on `durability`. Callers receive copies, so a mutation that fails half-way never
+    leaks into the cache.
+
+    The cache is per process. With several workers use `sync` durability: a hit is only
+    served after checking its version against the one on disk (a lock-file read, no
+    parsing), so an entry left stale by another worker's change is dropped and re-read,
+    and every write is a compare-and-swap against disk. The write-behind modes only check
+    versions in memory and assume a single worker owns the sessions.
+    """
+
+    def __init__(self, storage: Storage, max_entries: int = 1000, durability: str = SYNC, flush_interval_ms: int = 200):
+        if durability not in (SYNC, INTERVAL, EVICTION):
+            raise ValueError(f"Unknown session cache durability: {durability}")
+        self.storage = storage
+        self.max_entries = max_entries
+        self.durability = durability
+        self.flush_interval_ms = flush_interval_ms
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[UUID, ExamSession]" = OrderedDict()
+        self._dirty: Dict[UUID, _Dirty] = {}
+        self._flushing: Dict[UUID, _Dirty] = {} # taken off _dirty, write in progress
+        self._lock = threading.Lock() # guards _entries / _dirty / _write_locks
+        self._write_locks: Dict[UUID, List[Any]] = {} # session id -> [lock, holders]; see _writing
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if durability == INTERVAL:
+            self._flusher = threading.Thread(target=self._flush_loop, name="session-cache-flusher", daemon=True)
+            self._flusher.start()
+
+    # --- reads ---
+
+    def get_cached(self, session_id: UUID) -> Optional[ExamSession]:
+        """
+        Memory-only lookup; None on a miss. Always None with `sync` durability, where a
+        hit must first be checked against disk (see get_session).
+        """
+        if self.durability == SYNC:
+            return None
+        return self._lookup(session_id)
+
+    def _lookup(self, session_id: UUID) -> Optional[ExamSession]:
+        with self._lock:
+            session = self._entries.get(session_id)
+            if session is None:
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+        observe_cache("sessions", True)
+        return session.model_copy(deep=True)
+
+    def get_session(self, session_id: UUID) -> Optional[ExamSession]:
+        if self.durability == SYNC:
+            self._drop_if_stale(session_id)
+        cached = self._lookup(session_id)
+        if cached is not None:
+            return cached
+        observe_cache("sessions", False)
+        with self._lock:
+            self.misses += 1
+            # An evicted session may still be on its way to disk
+            pending = self._dirty.get(session_id) or self._flushing.get(session_id)
+        session = pending.session if pending is not None else self.storage.get_session(session_id)
+        if session is not None:
+            self._put(session)
+            return session.model_copy(deep=True)
+        return None
+
+    def _drop_if_stale(self, session_id: UUID):
+        with self._lock:
+            session = self._entries.get(session_id)
+        if session is None or self.storage.get_version(session_id) == session.version:
+            return
+        # Another worker committed since this copy was cached
+        with self._lock:
+            if self._entries.get(session_id) is session:
+                del self._entries[session_id]
+
+    def get_version(self, session_id: UUID) -> Optional[int]:
+        if self.durability != SYNC:
+            # Unflushed changes make memory newer than disk
+            with self._lock:
+                session = self._entries.get(session_id)
+                if session is None:
+                    pending = self._dirty.get(session_id) or self._flushing.get(session_id)
+                    session = pending.session if pending is not None else None
+            if session is not None:
+                return session.version
+        # Disk is authoritative in sync mode, including changes made by other workers
+        return self.storage.get_version(session_id)
+
+    # --- writes ---
+
+    def save_session(self, session: ExamSession, expected_version: Optional[int] = None):
+        self._write(session, None, expected_version)
+
+    def record(self, session: ExamSession, events: List[Dict[str, Any]], expected_version: Optional[int] = None):
+        self._write(session, events, expected_version)
+
+    def _write(self, session: ExamSession, events: Optional[List[Dict[str, Any]]], expected_version: Optional[int]):
+        if self.durability == SYNC:
+            # Storage locks the session file itself, so only writes to the same session wait
+            try:
+                if events is None:
+                    self.storage.save_session(session, expected_version)
+                else:
+                    self.storage.record(session, events, expected_version)
+            except VersionConflictError:
+                # Another worker got there first; make the retry read from disk
+                with self._lock:
+                    self._entries.pop(session.id, None)
+                raise
+            self._put(session)
+            return
+
+        with self._lock:
+            current = self._entries.get(session.id)
+            if expected_version is not None and current is not None and current.version != expected_version:
+                raise VersionConflictError(f"Session {session.id} is at version {current.version}, expected {expected_version}")
+            dirty = self._dirty.get(session.id) or _Dirty(session)
+            dirty.session = session
+            if events is None:
+                dirty.full = True
+                dirty.events = []
+            elif not dirty.full:
+                dirty.events.extend(events)
+            self._dirty[session.id] = dirty
+        self._put(session)
+
+    def _put(self, session: ExamSession):
+        evicted: List[UUID] = []
+        with self._lock:
+            self._entries[session.id] = session
+            self._entries.move_to_end(session.id)
+            while len(self._entries) > self.max_entries:
+                session_id, _ = self._entries.popitem(last=False)
+                if session_id in self._dirty:
+                    evicted.append(session_id)
+        for session_id in evicted:
+            self._flush_session(session_id)
+
+    # --- flushing ---
+
+    def _take_dirty(self, session_id: UUID) -> Optional[_Dirty]:
+        # Caller holds self._lock
+        dirty = self._dirty.pop(session_id, None)
+        if dirty is not None:
+            self._flushing[session_id] = dirty
+        return dirty
+
+    @contextmanager
+    def _writing(self, session_id: UUID):
+        """
+        Serialise flushes of one session so its changes reach disk in order; flushes of
+        other sessions run in parallel. Locks are dropped once nobody holds or waits on them.
+        """
+        with self._lock:
+            entry = self._write_locks.setdefault(session_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._write_locks[session_id]
+
+    def _flush_session(self, session_id: UUID):
+        with self._writing(session_id):
+            # Taken under the write lock, so a newer batch never overtakes an older one
+            with self._lock:
+                dirty = self._take_dirty(session_id)
+            if dirty is not None:
+                self._flush_one(dirty)
+
+    def _flush_one(self, dirty: _Dirty):
+        session_id = dirty.session.id
+        try:
+            if dirty.full:
+                self.storage.save_session(dirty.session)
+            else:
+                self.storage.record(dirty.session, dirty.events)
+        except Exception as e:
+            print(f"STORAGE ERROR: Write-behind flush failed for {session_id}: {e}")
+            with self._lock:
+                # Put it back (ahead of any newer changes) so the next flush retries
+                newer = self._dirty.get(session_id)
+                if newer is None:
+                    self._dirty[session_id] = dirty
+                elif not newer.full:
+                    newer.full = dirty.full
+                    newer.events = [] if dirty.full else dirty.events + newer.events
+        finally:
+            with self._lock:
+                if self._flushing.get(session_id) is dirty:
+                    del self._flushing[session_id]
+
+    def flush(self):
+        with self._lock:
+            pending = list(self._dirty)
+        for session_id in pending:
+            self._flush_session(session_id)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval_ms / 1000):
+            self.flush()
+
+    def close(self):
+        """Stop the flusher and write out everything still dirty."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    # --- pass-through ---
+
+    def list_sessions(self) -> List[dict]:
+        return self.storage.list_sessions()
+
+    def list_session_page(self, limit: Optional[int] = None, cursor: Optional[str] = None, status: Optional[str] = None, candidate_name: Optional[str] = None):
+        return self.storage.list_session_page(limit, cursor, status, candidate_name)
+
+    def compact_archive(self, min_age: float, ttl: float = 0) -> Dict[str, int]:
+        # Archived sessions are unchanged, so cached copies stay valid; expired ones must go
+        return self.storage.compact_archive(min_age, ttl, on_expired=self._forget)
+
+    def _forget(self, session_id: UUID):
+        with self._lock:
+            self._entries.pop(session_id, None)
+            self._dirty.pop(session_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "dirty": len(self._dirty),
+                "durability": self.durability,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else None,
+            }
@@ -0,0 +1,152 @@
+import base64
+import sqlite3
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+from ..models import ExamSession
+
+INDEX_FILENAME = "index.db"
+
+def encode_cursor(created_at: str, session_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{session_id}".encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, session_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, session_id
+
+def session_summary(session: ExamSession) -> dict:
+    return {
+        "id": str(session.id),
+        "candidate_name": session.candidate_name,
+        "status": session.status.value,
+        "created_at": session.created_at.isoformat(),
+        "score": session.current_score,
+        "total": session.total_questions_count,
+    }
+
+class SessionIndex:
+    """
+    SQLite table of session summaries, kept up to date incrementally by Storage so
+    that listing is a keyset-paginated index scan instead of loading every session file.
+    A second table maps archived sessions to their place in the archive segment files.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    candidate_name TEXT NOT NULL COLLATE NOCASE,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    total INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions (created_at DESC, id DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions (status, created_at DESC, id DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_candidate ON sessions (candidate_name, created_at DESC, id DESC)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive (
+                    id TEXT PRIMARY KEY,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    format TEXT NOT NULL,
+                    version INTEGER NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None
+
+    def upsert(self, summary: dict):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (:id, :candidate_name, :status, :created_at, :score, :total)",
+                summary,
+            )
+            # A session written again after archival lives in its own file from now on
+            conn.execute("DELETE FROM archive WHERE id = ?", (summary["id"],))
+
+    def upsert_many(self, summaries: List[dict]):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sessions VALUES (:id, :candidate_name, :status, :created_at, :score, :total)",
+                summaries,
+            )
+
+    def delete(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            conn.execute("DELETE FROM archive WHERE id = ?", (session_id,))
+
+    def add_archived(self, location: dict):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO archive VALUES (:id, :segment, :offset, :length, :format, :version)",
+                location,
+            )
+
+    def locate(self, session_id: str) -> Optional[dict]:
+        """Segment, offset, length, format and version of an archived session (None if not archived)."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM archive WHERE id = ?", (session_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def archive_candidates(self, expire_before: Optional[str] = None) -> List[str]:
+        """Unarchived sessions that are completed, or (with `expire_before`) were created before that time."""
+        sql = "SELECT s.id FROM sessions s LEFT JOIN archive a ON a.id = s.id WHERE a.id IS NULL AND (s.status = 'COMPLETED'"
+        params = []
+        if expire_before is not None:
+            sql += " OR s.created_at < ?"
+            params.append(expire_before)
+        with self._connect() as conn:
+            return [row["id"] for row in conn.execute(sql + ")", params).fetchall()]
+
+    def query(self, limit: Optional[int] = None, cursor: Optional[str] = None, status: Optional[str] = None, candidate_name: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Newest first. Returns one page and the cursor for the next page (None on the last page)."""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if candidate_name:
+            clauses.append("candidate_name = ?")
+            params.append(candidate_name)
+        if cursor:
+            created_at, session_id = decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([created_at, created_at, session_id])
+
+        sql = "SELECT id, candidate_name, status, created_at, score, total FROM sessions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+
+        with self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
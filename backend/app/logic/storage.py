@@ -1,67 +1,651 @@
+import asyncio
+import gzip
 import json
 import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
 from uuid import UUID
-from typing import Optional, List
-from ..models import ExamSession
+from typing import Optional, List, Dict, Any, Tuple, Callable
+from ..models import ExamSession, Phase
+from ..services.metrics import STORAGE_BYTES, STORAGE_DURATION
+from ..services.tracing import traced
+from .session_index import SessionIndex, INDEX_FILENAME, session_summary
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+# Optional snapshot formats (STORAGE_FORMAT=msgpack / zstd)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Define data dir relative to project root
 # current file: backend/app/logic/storage.py -> up 3 levels to root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 DATA_DIR = os.path.join(BASE_DIR, "data", "sessions")
 
+SNAPSHOT = "snapshot"
+EVENTLOG = "eventlog"
+
+# Session fields that appear in the listing index
+SUMMARY_FIELDS = {"candidate_name", "status", "current_score", "total_questions_count"}
+
+ARCHIVE_DIRNAME = "archive"
+ARCHIVE_FORMAT = "gzip" # Archived snapshots are always compressed, whatever STORAGE_FORMAT is
+
+class VersionConflictError(Exception):
+    """The session was changed by someone else since it was loaded."""
+
+class SessionSerializer:
+    """
+    On-disk encoding of session snapshots. Each format has its own file extension, so
+    files written in an earlier format are recognised and migrated on first access.
+    """
+    name = "json"
+    extension = ".json"
+
+    def dumps(self, session: ExamSession) -> bytes:
+        # The original format, kept readable for hand inspection
+        return session.model_dump_json(indent=2).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        return json.loads(raw)
+
+    def load_session(self, raw: bytes) -> ExamSession:
+        # Parsed and validated in one pass, without an intermediate dict
+        return ExamSession.model_validate_json(raw)
+
+class CompactJsonSerializer(SessionSerializer):
+    """JSON without indentation; same extension, so either JSON format reads the other."""
+    name = "compact"
+
+    def dumps(self, session: ExamSession) -> bytes:
+        return session.model_dump_json().encode("utf-8")
+
+class GzipSerializer(CompactJsonSerializer):
+    """Compact JSON, gzipped. Explanations repeat a lot of markdown and compress well."""
+    name = "gzip"
+    extension = ".json.gz"
+
+    def dumps(self, session: ExamSession) -> bytes:
+        # Level 6 costs several times level 1 for a few percent smaller files
+        return gzip.compress(super().dumps(session), compresslevel=1)
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        return super().loads(gzip.decompress(raw))
+
+    def load_session(self, raw: bytes) -> ExamSession:
+        return super().load_session(gzip.decompress(raw))
+
+class ZstdSerializer(CompactJsonSerializer):
+    """Compact JSON, zstd-compressed (needs the `zstandard` package)."""
+    name = "zstd"
+    extension = ".json.zst"
+
+    def dumps(self, session: ExamSession) -> bytes:
+        return zstandard.ZstdCompressor(level=3).compress(super().dumps(session))
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        return super().loads(zstandard.ZstdDecompressor().decompress(raw))
+
+    def load_session(self, raw: bytes) -> ExamSession:
+        return super().load_session(zstandard.ZstdDecompressor().decompress(raw))
+
+class MsgpackSerializer(SessionSerializer):
+    """MessagePack of the JSON-mode dump (needs the `msgpack` package)."""
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def dumps(self, session: ExamSession) -> bytes:
+        return msgpack.packb(session.model_dump(mode="json"))
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(raw)
+
+    def load_session(self, raw: bytes) -> ExamSession:
+        return ExamSession.model_validate(self.loads(raw))
+
+SERIALIZERS: Dict[str, SessionSerializer] = {
+    serializer.name: serializer
+    for serializer, available in (
+        (SessionSerializer(), True),
+        (CompactJsonSerializer(), True),
+        (GzipSerializer(), True),
+        (ZstdSerializer(), zstandard is not None),
+        (MsgpackSerializer(), msgpack is not None),
+    )
+    if available
+}
+
+def get_serializer(name: str) -> SessionSerializer:
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown or unavailable storage format: {name} (available: {', '.join(SERIALIZERS)})")
+    return SERIALIZERS[name]
+
+class SegmentArchive:
+    """
+    Append-only segment files (`segment-000001.seg`, ...) of concatenated session
+    snapshots. A record is addressed by (segment, offset, length), which the caller
+    keeps in the session index, so reading one back is a single seek. A new segment is
+    started once the current one reaches `segment_max_bytes`. Appends are not locked
+    here; the caller holds `lock_path` for the whole pass.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.lock_path = os.path.join(directory, "segments.lock")
+        os.makedirs(directory, exist_ok=True)
+
+    def _current_segment(self) -> str:
+        segments = sorted(name for name in os.listdir(self.directory) if name.endswith(".seg"))
+        if segments and os.path.getsize(os.path.join(self.directory, segments[-1])) < self.segment_max_bytes:
+            return segments[-1]
+        number = int(segments[-1][len("segment-"):-len(".seg")]) + 1 if segments else 1
+        return f"segment-{number:06d}.seg"
+
+    def append(self, payload: bytes) -> Tuple[str, int]:
+        """Durably append `payload`; returns its segment and offset."""
+        segment = self._current_segment()
+        with open(os.path.join(self.directory, segment), "ab") as f:
+            offset = f.tell()
+            f.write(payload)
+            f.flush()
+            # The live session files are deleted right after, so this copy must be on disk
+            os.fsync(f.fileno())
+        return segment, offset
+
+    def read(self, segment: str, offset: int, length: int) -> bytes:
+        with open(os.path.join(self.directory, segment), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def stats(self) -> dict:
+        sizes = [os.path.getsize(os.path.join(self.directory, name)) for name in os.listdir(self.directory) if name.endswith(".seg")]
+        return {"segments": len(sizes), "bytes": sum(sizes)}
+
+def diff_session(before: Dict[str, Any], after: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Describe the change between two `model_dump(mode="json")` views of a session as
+    small events: top-level field sets, per-question field sets and appended questions.
+    """
+    events = []
+    fields = {k: v for k, v in after.items() if k != "questions" and before.get(k) != v}
+    if fields:
+        events.append({"op": "set", "fields": fields})
+
+    old_questions, new_questions = before.get("questions", []), after.get("questions", [])
+    for index, (old_q, new_q) in enumerate(zip(old_questions, new_questions)):
+        changed = {k: v for k, v in new_q.items() if old_q.get(k) != v}
+        if changed:
+            events.append({"op": "question", "index": index, "fields": changed})
+    if len(new_questions) > len(old_questions):
+        events.append({"op": "append_questions", "questions": new_questions[len(old_questions):]})
+    return events
+
+def replay_events(data: Dict[str, Any], events: List[Dict[str, Any]]):
+    """
+    Apply logged events to a snapshot's data. Events stamped with a version the snapshot
+    already has are skipped: a crash between writing a snapshot and removing the log
+    leaves events behind that the snapshot already contains.
+    """
+    base = data.get("version") or 0
+    for event in events:
+        if event.get("version", base + 1) <= base:
+            continue
+        apply_event(data, event)
+
+def apply_event(data: Dict[str, Any], event: Dict[str, Any]):
+    op = event["op"]
+    if op == "set":
+        data.update(event["fields"])
+    elif op == "question":
+        data["questions"][event["index"]].update(event["fields"])
+    elif op == "append_questions":
+        data.setdefault("questions", []).extend(event["questions"])
+    else:
+        raise ValueError(f"Unknown session event: {op}")
+
 class Storage:
-    def __init__(self):
-        os.makedirs(DATA_DIR, exist_ok=True)
+    """
+    File-per-session storage.
+
+    In `snapshot` mode every change rewrites the session snapshot. In `eventlog` mode
+    changes are appended to `<id>.events.jsonl` as small events and the snapshot is
+    only rewritten (compacted) every `compact_every` events, so a click costs
+    O(change) bytes instead of O(session).
+
+    Snapshots are written with the `format` serializer. Snapshots in any other known
+    format are still read, and rewritten in the current one the first time they are.
+
+    compact_archive() moves finished sessions out of their own files into the segment
+    archive and deletes abandoned ones, so the directory only holds live sessions.
+    """
+
+    def __init__(self, mode: str = SNAPSHOT, compact_every: int = 20, data_dir: str = DATA_DIR, format: str = "compact", archive_segment_max_bytes: int = 64 * 1024 * 1024):
+        if mode not in (SNAPSHOT, EVENTLOG):
+            raise ValueError(f"Unknown storage mode: {mode}")
+        self.mode = mode
+        self.compact_every = compact_every
+        self.serializer = get_serializer(format)
+        self.data_dir = data_dir
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.index = SessionIndex(os.path.join(self.data_dir, INDEX_FILENAME))
+        self.archive = SegmentArchive(os.path.join(self.data_dir, ARCHIVE_DIRNAME), archive_segment_max_bytes)
+        if self.index.is_empty():
+            # One-off backfill for session files written before the index existed
+            self.index.upsert_many(self._scan_summaries())
+
+    def _get_path(self, session_id: UUID, serializer: Optional[SessionSerializer] = None) -> str:
+        return os.path.join(self.data_dir, f"{session_id}{(serializer or self.serializer).extension}")
+
+    def _find_snapshot(self, session_id: UUID) -> Optional[Tuple[str, SessionSerializer]]:
+        """Path and serializer of the session's snapshot, looking at the current format first."""
+        path = self._get_path(session_id)
+        if os.path.exists(path):
+            return path, self.serializer
+        for serializer in SERIALIZERS.values():
+            path = self._get_path(session_id, serializer)
+            if serializer.extension != self.serializer.extension and os.path.exists(path):
+                return path, serializer
+        return None
+
+    def _get_log_path(self, session_id: UUID) -> str:
+        return os.path.join(self.data_dir, f"{session_id}.events.jsonl")
+
+    def _get_lock_path(self, session_id: UUID) -> str:
+        return os.path.join(self.data_dir, f"{session_id}.lock")
+
+    def _locked(self, session_id: UUID, exclusive: bool):
+        """
+        Cross-process lock on `<id>.lock`, which also holds the session's committed
+        version. Readers share the lock so they never see a half-compacted snapshot/log.
+        """
+        return self._lock_file(self._get_lock_path(session_id), exclusive)
+
+    @contextmanager
+    def _lock_file(self, path: str, exclusive: bool):
+        with open(path, "a+", encoding="utf-8") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                # msvcrt has no shared locks; serialise everything on Windows
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield f
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
 
-    def _get_path(self, session_id: UUID) -> str:
-        return os.path.join(DATA_DIR, f"{session_id}.json")
+    def _read_version(self, lock_file) -> Optional[int]:
+        lock_file.seek(0)
+        raw = lock_file.read().strip()
+        return int(raw) if raw else None
 
-    def save_session(self, session: ExamSession):
+    def _write_version(self, lock_file, version: int):
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(version))
+        lock_file.flush()
+
+    def _check_version(self, lock_file, session: ExamSession, expected_version: Optional[int]):
+        if expected_version is None:
+            return
+        current = self._read_version(lock_file)
+        if current is not None and current != expected_version:
+            raise VersionConflictError(f"Session {session.id} is at version {current}, expected {expected_version}")
+
+    @traced("storage.save_session")
+    def save_session(self, session: ExamSession, expected_version: Optional[int] = None):
+        """
+        Write a full snapshot. With `expected_version`, the write only succeeds if nobody
+        else committed since the caller loaded the session (compare-and-swap).
+        """
+        with self._locked(session.id, exclusive=True) as lock_file:
+            self._check_version(lock_file, session, expected_version)
+            self._write_snapshot(session)
+            self._write_version(lock_file, session.version)
+
+    def _write_snapshot(self, session: ExamSession):
         path = self._get_path(session.id)
         temp_path = f"{path}.tmp"
         try:
-            with open(temp_path, "w", encoding="utf-8") as f:
-                f.write(session.model_dump_json(indent=2))
-            os.replace(temp_path, path)
+            with STORAGE_DURATION.time(op="snapshot"):
+                payload = self.serializer.dumps(session)
+                with open(temp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(temp_path, path)
+            STORAGE_BYTES.inc(len(payload), op="snapshot")
+            # The fresh snapshot already contains everything in the log, and supersedes
+            # snapshots in other formats
+            log_path = self._get_log_path(session.id)
+            if os.path.exists(log_path):
+                os.remove(log_path)
+            for serializer in SERIALIZERS.values():
+                stale_path = self._get_path(session.id, serializer)
+                if serializer.extension != self.serializer.extension and os.path.exists(stale_path):
+                    os.remove(stale_path)
+            self.index.upsert(session_summary(session))
         except Exception as e:
             if os.path.exists(temp_path):
                 os.remove(temp_path)
             print(f"STORAGE ERROR: Failed to save session {session.id}: {e}")
             raise
 
-    def get_session(self, session_id: UUID) -> Optional[ExamSession]:
-        path = self._get_path(session_id)
-        if not os.path.exists(path):
+    @traced("storage.record")
+    def record(self, session: ExamSession, events: List[Dict[str, Any]], expected_version: Optional[int] = None):
+        """Persist `session`, whose changes since it was loaded are described by `events`."""
+        with self._locked(session.id, exclusive=True) as lock_file:
+            self._check_version(lock_file, session, expected_version)
+            # A snapshot in another format is replaced by a full one rather than logged against
+            if self.mode == SNAPSHOT or not os.path.exists(self._get_path(session.id)):
+                self._write_snapshot(session)
+            elif events:
+                log_path = self._get_log_path(session.id)
+                if self._prepare_log(log_path) + len(events) >= self.compact_every:
+                    self._write_snapshot(session)
+                else:
+                    now = time.time()
+                    # The version lets replay skip events a snapshot already contains
+                    lines = "".join(json.dumps({**event, "ts": now, "version": session.version}, ensure_ascii=False) + "\n" for event in events)
+                    with STORAGE_DURATION.time(op="append"):
+                        with open(log_path, "a", encoding="utf-8") as f:
+                            f.write(lines)
+                    STORAGE_BYTES.inc(len(lines), op="append")
+                    if any(event["op"] == "set" and SUMMARY_FIELDS & event["fields"].keys() for event in events):
+                        self.index.upsert(session_summary(session))
+            self._write_version(lock_file, session.version)
+
+    def _prepare_log(self, log_path: str) -> int:
+        """
+        Number of events in the log, after cutting off a torn final line left by a crash
+        mid-append. Appending after it would otherwise hide every later event from replay.
+        """
+        # The log never grows past `compact_every` lines, so this stays cheap
+        if not os.path.exists(log_path):
+            return 0
+        with open(log_path, "rb") as f:
+            lines = f.read().splitlines(keepends=True)
+        good = len(lines)
+        if lines and (not lines[-1].endswith(b"\n") or not self._parses(lines[-1])):
+            good -= 1
+            with open(log_path, "r+b") as f:
+                f.truncate(sum(len(line) for line in lines[:good]))
+                f.flush()
+                os.fsync(f.fileno())
+            print(f"STORAGE: Dropped a torn event from {log_path}")
+        return good
+
+    def _parses(self, line: bytes) -> bool:
+        try:
+            json.loads(line)
+            return True
+        except ValueError:
+            return False
+
+    def _read_snapshot(self, session_id: UUID) -> Optional[Tuple[bytes, SessionSerializer]]:
+        found = self._find_snapshot(session_id)
+        if found is None:
+            return None
+        path, serializer = found
+        with open(path, "rb") as f:
+            raw = f.read()
+        STORAGE_BYTES.inc(len(raw), op="read")
+        return raw, serializer
+
+    def _read_events(self, session_id: UUID) -> Optional[List[Dict[str, Any]]]:
+        """Logged events not yet compacted into the snapshot (None without a log)."""
+        log_path = self._get_log_path(session_id)
+        if not os.path.exists(log_path):
+            return None
+        events = []
+        with open(log_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        for number, line in enumerate(lines, 1):
+            STORAGE_BYTES.inc(len(line), op="read")
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                if number < len(lines):
+                    # Appends repair a torn tail first, so a bad line can only ever be the last
+                    raise ValueError(f"Corrupt event log {log_path} at line {number}")
+                # Torn final write from a crash; everything before it is intact
+        return events
+
+    def _load_data(self, session_id: UUID) -> Optional[Dict[str, Any]]:
+        """Snapshot plus any logged events replayed on top."""
+        snapshot = self._read_snapshot(session_id)
+        if snapshot is None:
+            return None
+        raw, serializer = snapshot
+        data = serializer.loads(raw)
+        replay_events(data, self._read_events(session_id) or [])
+        return data
+
+    def _load_session(self, session_id: UUID) -> Optional[Tuple[ExamSession, SessionSerializer]]:
+        snapshot = self._read_snapshot(session_id)
+        if snapshot is None:
             return None
+        raw, serializer = snapshot
+        events = self._read_events(session_id)
+        if not events:
+            return serializer.load_session(raw), serializer
+        data = serializer.loads(raw)
+        replay_events(data, events)
+        return ExamSession.model_validate(data), serializer
+
+    def get_cached(self, session_id: UUID) -> Optional[ExamSession]:
+        # Plain storage keeps nothing in memory; see CachedStorage
+        return None
+
+    def close(self):
+        pass
+
+    @traced("storage.get_session")
+    def get_session(self, session_id: UUID) -> Optional[ExamSession]:
+        if self._find_snapshot(session_id) is None:
+            # Checked before locking so reads of archived sessions leave no lock file behind
+            return self._get_archived(session_id)
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return ExamSession(**data)
+            with STORAGE_DURATION.time(op="read"), self._locked(session_id, exclusive=False) as lock_file:
+                loaded = self._load_session(session_id)
+                version = self._read_version(lock_file)
+            if loaded is None:
+                return self._get_archived(session_id) # Archived since the check above
+            session, serializer = loaded
+            # The lock file holds the committed version used for compare-and-swap
+            if version is not None:
+                session.version = version
         except Exception as e:
             print(f"STORAGE ERROR: Could not load session {session_id}: {e}")
             return None
+        if serializer is not self.serializer:
+            self._migrate(session_id)
+        return session
 
-    def list_sessions(self) -> List[dict]:
-        sessions = []
-        if not os.path.exists(DATA_DIR): return []
-        
-        for filename in os.listdir(DATA_DIR):
-            if filename.endswith(".json"):
+    def _get_archived(self, session_id: UUID) -> Optional[ExamSession]:
+        try:
+            location = self.index.locate(str(session_id))
+            if location is None:
+                return None
+            with STORAGE_DURATION.time(op="archive_read"):
+                raw = self.archive.read(location["segment"], location["offset"], location["length"])
+                session = SERIALIZERS[location["format"]].load_session(raw)
+            STORAGE_BYTES.inc(len(raw), op="archive_read")
+            session.version = location["version"]
+            return session
+        except Exception as e:
+            print(f"STORAGE ERROR: Could not load archived session {session_id}: {e}")
+            return None
+
+    def _migrate(self, session_id: UUID):
+        """Rewrite a snapshot found in another format in the current one."""
+        try:
+            with self._locked(session_id, exclusive=True) as lock_file:
+                loaded = self._load_session(session_id)
+                if loaded is None or loaded[1] is self.serializer:
+                    return # Gone, or another request got here first
+                session = loaded[0]
+                version = self._read_version(lock_file)
+                if version is not None:
+                    session.version = version
+                self._write_snapshot(session)
+            print(f"STORAGE: Migrated session {session_id} from {loaded[1].name} to {self.serializer.name}")
+        except Exception as e:
+            # The old snapshot is still intact and readable; try again next time
+            print(f"STORAGE ERROR: Could not migrate session {session_id}: {e}")
+
+    def get_version(self, session_id: UUID) -> Optional[int]:
+        """Committed version without loading the session (None if unknown)."""
+        if not os.path.exists(self._get_lock_path(session_id)):
+            location = self.index.locate(str(session_id))
+            return location["version"] if location is not None else None
+        with self._locked(session_id, exclusive=False) as lock_file:
+            return self._read_version(lock_file)
+
+    @traced("storage.compact_archive")
+    def compact_archive(self, min_age: float, ttl: float = 0, on_expired: Optional[Callable[[UUID], None]] = None) -> Dict[str, int]:
+        """
+        Move completed sessions nobody has written to for `min_age` seconds into the
+        segment archive, and delete unfinished sessions untouched for `ttl` seconds
+        (0 keeps them). Sessions still being graded or enriched stay where they are.
+        """
+        now = time.time()
+        expire_before = datetime.utcfromtimestamp(now - ttl).isoformat() if ttl > 0 else None
+        stats = {"archived": 0, "expired": 0, "skipped": 0}
+        # One pass at a time across workers, so appends to a segment never interleave
+        with STORAGE_DURATION.time(op="archive"), self._lock_file(self.archive.lock_path, exclusive=True):
+            for session_id in self.index.archive_candidates(expire_before):
+                try:
+                    outcome = self._archive_one(session_id, now - min_age, now - ttl if ttl > 0 else None)
+                except Exception as e:
+                    print(f"STORAGE ERROR: Could not archive session {session_id}: {e}")
+                    outcome = "skipped"
+                stats[outcome] += 1
+                if outcome == "expired" and on_expired is not None:
+                    on_expired(UUID(session_id))
+        if stats["archived"] or stats["expired"]:
+            print(f"STORAGE: Archived {stats['archived']} and expired {stats['expired']} sessions")
+        return stats
+
+    def _archive_one(self, session_id: str, archive_before: float, expire_before: Optional[float]) -> str:
+        with self._locked(session_id, exclusive=True) as lock_file:
+            paths = [path for path in self._session_paths(session_id) if os.path.exists(path)]
+            loaded = self._load_session(session_id)
+            if not paths or loaded is None:
+                return "skipped"
+            session = loaded[0]
+            last_write = max(os.path.getmtime(path) for path in paths)
+            if session.status == Phase.COMPLETED:
+                busy = session.grading_pending or any(q.explanation_pending for q in session.questions)
+                if busy or last_write > archive_before:
+                    return "skipped"
+                version = self._read_version(lock_file)
+                if version is not None:
+                    session.version = version
+                payload = SERIALIZERS[ARCHIVE_FORMAT].dumps(session)
+                segment, offset = self.archive.append(payload)
+                STORAGE_BYTES.inc(len(payload), op="archive")
+                self.index.add_archived({
+                    "id": session_id, "segment": segment, "offset": offset, "length": len(payload),
+                    "format": ARCHIVE_FORMAT, "version": session.version,
+                })
+                outcome = "archived"
+            elif expire_before is not None and last_write <= expire_before:
+                self.index.delete(session_id)
+                outcome = "expired"
+            else:
+                return "skipped"
+            for path in paths:
+                os.remove(path)
+        # Removed once released; Windows cannot delete a file that is still open
+        try:
+            os.remove(self._get_lock_path(session_id))
+        except OSError:
+            pass
+        return outcome
+
+    def _session_paths(self, session_id: UUID) -> List[str]:
+        """Every file a live session can have, except its lock file."""
+        snapshots = dict.fromkeys(self._get_path(session_id, serializer) for serializer in SERIALIZERS.values())
+        return [*snapshots, self._get_log_path(session_id)]
+
+    def _scan_summaries(self) -> List[dict]:
+        summaries = []
+        extensions = {serializer.extension for serializer in SERIALIZERS.values()}
+        for filename in os.listdir(self.data_dir):
+            extension = next((e for e in extensions if filename.endswith(e)), None)
+            if extension is not None:
                 try:
-                    p = os.path.join(DATA_DIR, filename)
-                    with open(p, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                        sessions.append({
-                            "id": data.get("id"),
-                            "candidate_name": data.get("candidate_name"),
-                            "status": data.get("status"),
-                            "created_at": data.get("created_at"),
-                            "score": data.get("current_score", 0),
-                            "total": data.get("total_questions_count", 0)
-                        })
+                    data = self._load_data(filename[:-len(extension)])
+                    summaries.append({
+                        "id": data.get("id"),
+                        "candidate_name": data.get("candidate_name"),
+                        "status": data.get("status"),
+                        "created_at": data.get("created_at"),
+                        "score": data.get("current_score", 0),
+                        "total": data.get("total_questions_count", 0)
+                    })
                 except Exception:
                     continue # Skip bad files
-        
-        # Sort by date desc
-        sessions.sort(key=lambda x: x["created_at"], reverse=True)
+        return summaries
+
+    def list_session_page(self, limit: Optional[int] = None, cursor: Optional[str] = None, status: Optional[str] = None, candidate_name: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Newest-first page of session summaries plus the cursor for the next page."""
+        return self.index.query(limit=limit, cursor=cursor, status=status, candidate_name=candidate_name)
+
+    def list_sessions(self) -> List[dict]:
+        sessions, _ = self.list_session_page()
         return sessions
+
+
+class AsyncStorage:
+    """
+    Awaitable facade over Storage for the async request path.
+    File reads/writes run in a worker thread so the event loop never blocks on disk.
+    """
+
+    def __init__(self, storage: Optional[Storage] = None):
+        # Any Storage-compatible backend, e.g. CachedStorage wrapping a Storage
+        self.storage = storage or Storage()
+
+    async def save_session(self, session: ExamSession, expected_version: Optional[int] = None):
+        await asyncio.to_thread(self.storage.save_session, session, expected_version)
+
+    async def record(self, session: ExamSession, events: List[Dict[str, Any]], expected_version: Optional[int] = None):
+        await asyncio.to_thread(self.storage.record, session, events, expected_version)
+
+    async def get_session(self, session_id: UUID) -> Optional[ExamSession]:
+        # Cache hits are served inline without a thread hop
+        cached = self.storage.get_cached(session_id)
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.storage.get_session, session_id)
+
+    async def get_version(self, session_id: UUID) -> Optional[int]:
+        return await asyncio.to_thread(self.storage.get_version, session_id)
+
+    async def compact_archive(self, min_age: float, ttl: float = 0) -> Dict[str, int]:
+        return await asyncio.to_thread(self.storage.compact_archive, min_age, ttl)
+
+    async def close(self):
+        await asyncio.to_thread(self.storage.close)
+
+    async def list_sessions(self) -> List[dict]:
+        return await asyncio.to_thread(self.storage.list_sessions)
+
+    async def list_session_page(self, limit: Optional[int] = None, cursor: Optional[str] = None, status: Optional[str] = None, candidate_name: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        return await asyncio.to_thread(self.storage.list_session_page, limit, cursor, status, candidate_name)
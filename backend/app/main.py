@@ -1,15 +1,128 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from .api.routes import router
+from .api.admin import admin_router
+from .config import Settings
+from .logic.answer_jobs import AnswerJobQueue, AnswerJobStore
+from .logic.archive import SessionArchiver
+from .logic.orchestrator import AsyncExamOrchestrator
+from .logic.question_bank import QuestionBank, AsyncQuestionBank
+from .logic.prewarm import QuestionPoolPrewarmer
+from .logic.session_cache import CachedStorage
+from .logic.storage import Storage, AsyncStorage
+from .services.cache import PersistentCache
+from .services.clients import LLMClientRegistry
+from .services.fake_llm import FakeLLMProvider
+from .services.metrics import REGISTRY, HTTP_DURATION, HTTP_IN_FLIGHT
+from .services.llm_service import AsyncLLMService
+from .services.resilience import LLMResilience
+from .services import tracing
 from dotenv import load_dotenv
 import os
+import time
+import uuid
 
 # Calculate path to root .env file
 # current file is in backend/app/main.py -> go up 3 levels to root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv(os.path.join(BASE_DIR, ".env"))
 
-app = FastAPI(title="LLM Data Engineer Exam Simulator")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build provider clients once per process and share them across requests
+    settings = Settings.from_env()
+    clients = LLMClientRegistry(settings)
+    app.state.settings = settings
+    app.state.clients = clients
+    data_dir = settings.data_dir or os.path.join(BASE_DIR, "data")
+    if settings.tracing_enabled:
+        exporter = tracing.JsonlSpanExporter(settings.tracing_path or os.path.join(data_dir, "traces.jsonl"), settings.tracing_max_bytes)
+        tracing.configure(exporter, settings.tracing_sample_rate)
+    storage = Storage(
+        settings.storage_mode, settings.storage_compact_every, os.path.join(data_dir, "sessions"),
+        format=settings.storage_format, archive_segment_max_bytes=settings.archive_segment_max_bytes
+    )
+    if settings.session_cache_enabled:
+        storage = CachedStorage(
+            storage, settings.session_cache_max_entries,
+            settings.session_cache_durability, settings.session_cache_flush_interval_ms
+        )
+    app.state.storage = AsyncStorage(storage)
+    app.state.question_bank = AsyncQuestionBank(QuestionBank(settings, os.path.join(data_dir, "question_bank.db"))) if settings.question_bank_enabled else None
+    app.state.eval_cache = None
+    if settings.eval_cache_enabled:
+        app.state.eval_cache = PersistentCache("evaluations", settings.eval_cache_max_entries, settings.eval_cache_ttl, os.path.join(data_dir, "cache.db"))
+    app.state.transcript_cache = None
+    if settings.transcript_cache_enabled:
+        app.state.transcript_cache = PersistentCache("transcripts", settings.transcript_cache_max_entries, settings.transcript_cache_ttl, os.path.join(data_dir, "cache.db"))
+    app.state.fake_llm = None
+    if settings.fake_llm_enabled:
+        print("WARNING: FAKE_LLM_ENABLED is set; all LLM calls are simulated")
+        app.state.fake_llm = FakeLLMProvider.from_settings(settings)
+    app.state.llm_resilience = LLMResilience(settings)
+    llm = AsyncLLMService(
+        clients, eval_cache=app.state.eval_cache, transcript_cache=app.state.transcript_cache,
+        fake=app.state.fake_llm, resilience=app.state.llm_resilience
+    )
+    app.state.orchestrator = AsyncExamOrchestrator(app.state.storage, llm, settings, app.state.question_bank)
+    # Re-queues jobs left unfinished by a previous run
+    app.state.answer_jobs = AnswerJobQueue(app.state.orchestrator, AnswerJobStore(os.path.join(data_dir, "sessions", "jobs")), settings)
+    await app.state.answer_jobs.start()
+    app.state.prewarmer = None
+    if app.state.question_bank is not None and settings.prewarm_enabled:
+        app.state.prewarmer = QuestionPoolPrewarmer(
+            app.state.question_bank, llm, settings,
+            is_idle=lambda: app.state.in_flight <= settings.prewarm_idle_threshold
+        )
+        app.state.prewarmer.start()
+    app.state.archiver = SessionArchiver(
+        app.state.storage, settings,
+        is_idle=lambda: app.state.in_flight <= settings.prewarm_idle_threshold
+    )
+    if settings.archive_enabled:
+        app.state.archiver.start()
+    try:
+        yield
+    finally:
+        if app.state.prewarmer is not None:
+            await app.state.prewarmer.stop()
+        await app.state.archiver.stop()
+        await app.state.answer_jobs.stop()
+        await app.state.orchestrator.aclose()
+        # Write out anything the session cache is still holding
+        await app.state.storage.close()
+        await clients.aclose()
+        tracing.shutdown()
+
+app = FastAPI(title="LLM Data Engineer Exam Simulator", lifespan=lifespan)
+app.state.in_flight = 0
+
+@app.middleware("http")
+async def track_in_flight(request: Request, call_next):
+    # Background work (e.g. question pre-warming) backs off while requests are in flight
+    request.app.state.in_flight += 1
+    HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    # Reuse the client's request id so frontend logs and backend traces line up
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    with tracing.request_context(request_id), tracing.span(f"HTTP {request.method}", **{"http.method": request.method}) as root:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            response.headers["X-Request-ID"] = request_id
+            return response
+        finally:
+            request.app.state.in_flight -= 1
+            HTTP_IN_FLIGHT.dec()
+            # Label by route template, not the raw path, to keep cardinality bounded
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            root.set_attributes({"http.route": route, "http.status_code": status})
+            HTTP_DURATION.observe(
+                time.perf_counter() - start,
+                method=request.method, route=route, status=str(status)
+            )
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,10 +130,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Location", "X-Request-ID"],
 )
 
 app.include_router(router)
+app.include_router(admin_router)
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Data Engineer Exam Simulator API (JSON Mode)"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Prometheus text exposition format
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4")
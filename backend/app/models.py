@@ -33,6 +33,7 @@ class Question(BaseModel):
     correct_answer: Optional[str] = None # For MCQs/Short Answer
     explanation: Optional[str] = None
     concept: Optional[str] = None
+    topic: Optional[str] = None
     
     # Coding/Project specific
     problem_statement: Optional[str] = None
@@ -42,15 +43,17 @@ class Question(BaseModel):
     user_answer: Optional[str] = None
     is_correct: Optional[bool] = None
     feedback: Optional[str] = None
+    explanation_pending: bool = False # Detailed LLM feedback is still being generated
 
 class ExamSession(BaseModel):
     id: UUID = Field(default_factory=uuid4)
+    version: int = 0 # Bumped on every committed change (optimistic concurrency)
     status: Phase = Phase.SETUP
     candidate_name: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Setup Data (Phase 1)
-    provider: str = "openai" # openai or gemini
+    provider: str = "openai" # openai, gemini, or auto (fastest healthy provider per call)
     setup_step: int = 1 # 1 to 5
     difficulty: Optional[str] = None
     topics: List[str] = []
@@ -63,10 +66,35 @@ class ExamSession(BaseModel):
     current_question_index: int = 0
     questions_asked_ids: List[str] = [] # Legacy field to keep compatible
     current_score: float = 0.0
+    pending_question_count: int = 0 # Questions still being generated in the background
+    grading_mode: str = "immediate" # "immediate", or "deferred": answers are only recorded and graded together at the end
+    grading_pending: bool = False # Deferred mode: the exam is complete but grading is still running
     
     # Chat History (for context)
     chat_history: List[Dict[str, str]] = []
 
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    TRANSCRIBING = "TRANSCRIBING"
+    EVALUATING = "EVALUATING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+class AnswerJob(BaseModel):
+    id: UUID = Field(default_factory=uuid4)
+    session_id: UUID
+    question_id: UUID # Pinned at submit time so a later /next cannot redirect the answer
+    status: JobStatus = JobStatus.QUEUED
+    answer: str = ""
+    audio_path: Optional[str] = None # Raw recording on disk until transcribed
+    audio_filename: str = "audio.wav"
+    transcript: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None # Same shape as the synchronous /answer response
+    error: Optional[str] = None
+    request_id: Optional[str] = None # X-Request-ID of the submitting request, for tracing
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
 # LLM interaction models
 class AnswerEvaluation(BaseModel):
     is_correct: bool
@@ -77,6 +105,12 @@ class AnswerEvaluation(BaseModel):
     related_topics: Optional[List[str]] = None
     learning_resources: Optional[List[str]] = None
 
+class BatchAnswerEvaluation(AnswerEvaluation):
+    id: str # Echoes the id the answer was sent with
+
+class BatchEvaluations(BaseModel):
+    evaluations: List[BatchAnswerEvaluation]
+
 # LLM interaction models
 class SetupPrompt(BaseModel):
     difficulty: Optional[str] = None
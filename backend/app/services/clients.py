@@ -0,0 +1,53 @@
+import os
+import httpx
+import google.generativeai as genai
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from typing import Optional
+from ..config import Settings
+
+
+class LLMClientRegistry:
+    """
+    Process-wide provider clients.
+    Built once at app startup so every request reuses the same HTTP
+    connection pool (keep-alive + TLS sessions) instead of reconnecting.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, openai_api_key: Optional[str] = None, gemini_api_key: Optional[str] = None):
+        self.settings = settings or Settings.from_env()
+        self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
+        self.gemini_api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+
+        # OpenAI Init
+        if not self.openai_api_key:
+            print("Warning: OPENAI_API_KEY not set.")
+            self.async_openai = None
+        else:
+            self._async_http_client = DefaultAsyncHttpxClient(limits=self._limits(), timeout=self._timeout())
+            # LLMResilience owns retries; SDK retries would multiply its attempts and hide failures from the breaker
+            self.async_openai = AsyncOpenAI(api_key=self.openai_api_key, http_client=self._async_http_client, max_retries=0)
+
+        # Gemini Init (genai.configure is global, so only do it once per process)
+        if self.gemini_api_key:
+            genai.configure(api_key=self.gemini_api_key)
+            self.gemini_model = genai.GenerativeModel("gemini-pro")
+        else:
+            print("Warning: GEMINI_API_KEY not set.")
+            self.gemini_model = None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.settings.llm_max_connections,
+            max_keepalive_connections=self.settings.llm_max_keepalive_connections,
+            keepalive_expiry=self.settings.llm_keepalive_expiry,
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        # No transport timeout outlives an attempt's deadline (LLMResilience)
+        return httpx.Timeout(self.settings.llm_call_timeout, connect=self.settings.llm_connect_timeout)
+
+    async def aclose(self):
+        if self._async_http_client is not None:
+            await self._async_http_client.aclose()
+            self._async_http_client = None
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import AsyncIterator, Dict, Optional
+from ..config import Settings
+
+class FakeLLMError(Exception):
+    """Injected provider failure."""
+
+class FakeLLMProvider:
+    """
+    Local stand-in for OpenAI/Gemini used for load testing.
+
+    Responses have the same shape as the real ones for every prompt the service sends
+    (batch/next question generation, single and batch evaluation, setup extraction, clarification) and
+    Whisper transcription. Latency is log-normal around `latency_ms` with shape
+    `latency_sigma`, a fraction `error_rate` of calls fail, and `response_chars`
+    pads explanations so payload sizes can be dialled up.
+    """
+
+    def __init__(self, latency_ms: float = 800.0, latency_sigma: float = 0.5, error_rate: float = 0.0, response_chars: int = 400, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.response_chars = response_chars
+        self._random = random.Random(seed)
+        self._lock = threading.Lock() # random.Random is shared by worker threads
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "FakeLLMProvider":
+        return cls(settings.fake_llm_latency_ms, settings.fake_llm_latency_sigma, settings.fake_llm_error_rate, settings.fake_llm_response_chars)
+
+    def _draw(self):
+        """Latency in seconds for the next call, and whether it should fail."""
+        with self._lock:
+            self.calls += 1
+            latency = self._random.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000 if self.latency_ms > 0 else 0.0
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return latency, fail
+
+    def _padding(self) -> str:
+        return ("Lorem ipsum dolor sit amet. " * (self.response_chars // 28 + 1))[:self.response_chars]
+
+    def respond(self, system: str, user: str, kind: str = "other") -> Dict:
+        # `kind` is the prompt template's kind (see prompts.py); values come from the user message
+        if kind == "batch_questions":
+            count = int(re.search(r"Generate (\d+)", user).group(1))
+            difficulty = re.search(r"Difficulty: (.*)", user).group(1).strip()
+            q_type = re.search(r"Types: (.*)", user).group(1).split(",")[0].strip() or "MCQ"
+            return {"questions": [self._question(i, difficulty, q_type) for i in range(count)]}
+        if kind == "question":
+            return self._question(0, "Intermediate", "MCQ")
+        if kind == "evaluation":
+            return self._evaluation()
+        if kind == "batch_evaluation":
+            ids = re.findall(r"^### Answer (\S+)$", user, re.MULTILINE)
+            return {"evaluations": [{"id": answer_id, **self._evaluation()} for answer_id in ids]}
+        if kind == "clarification":
+            return {"clarifying_question": "Which topics would you like to focus on?"}
+        if kind == "setup_extraction":
+            return {"difficulty": "Intermediate", "topics": ["SQL"]}
+        return {}
+
+    def _evaluation(self) -> Dict:
+        return {
+            "is_correct": self._random.random() < 0.5,
+            "confidence": 0.8,
+            "reason": "Synthetic evaluation",
+            "explanation": self._padding(),
+        }
+
+    def _question(self, index: int, difficulty: str, q_type: str) -> Dict:
+        uid = f"{time.time_ns()}-{index}"
+        question = {
+            "question": f"Synthetic question {uid}",
+            "concept": f"Concept {index}",
+            "difficulty": difficulty,
+            "type": q_type,
+            "explanation": self._padding(),
+        }
+        if q_type.upper() == "MCQ":
+            question["options"] = ["A", "B", "C", "D"]
+            question["correct_answer"] = "A"
+        else:
+            question["correct_answer"] = "Reference answer"
+            question["constraints"] = "None"
+        return question
+
+    async def astream(self, system: str, user: str, kind: str = "other", chunk_chars: int = 32) -> AsyncIterator[str]:
+        """respond() as a token stream: a fifth of the latency passes before the first chunk, the rest is spread over the others."""
+        latency, fail = self._draw()
+        await asyncio.sleep(latency * 0.2)
+        if fail:
+            raise FakeLLMError("Injected LLM failure")
+        text = json.dumps(self.respond(system, user, kind))
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        for chunk in chunks:
+            yield chunk
+            await asyncio.sleep(latency * 0.8 / len(chunks))
+
+    async def atranscribe(self) -> str:
+        latency, fail = self._draw()
+        await asyncio.sleep(latency)
+        if fail:
+            raise FakeLLMError("Injected transcription failure")
+        return "Synthetic transcript of a spoken answer."
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": self.latency_ms,
+            "latency_sigma": self.latency_sigma,
+            "error_rate": self.error_rate,
+        }
@@ -0,0 +1,126 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+WHITESPACE = " \t\r\n"
+
+
+class JsonStreamParser:
+    """
+    Incremental scanner for a JSON object that arrives in chunks (a streamed LLM response).
+
+    feed() returns events as soon as the text received so far allows:
+    - ("item", value) for each element of the top-level array field `items_field`, when
+      the element closes;
+    - ("text", fragment) for the newly received part of the top-level string field
+      `text_field`, already unescaped.
+    Text before the opening "{" (e.g. a ```json fence) and after the closing "}" is
+    ignored. result() parses the complete document once the stream has ended.
+    """
+
+    def __init__(self, items_field: Optional[str] = None, text_field: Optional[str] = None):
+        self.items_field = items_field
+        self.text_field = text_field
+        self._buffer = ""
+        self._pos = 0 # Next character of the buffer to scan
+        self._stack: List[str] = [] # Open containers, "{" or "["
+        self._doc_start: Optional[int] = None
+        self._doc_end: Optional[int] = None
+        self._key: Optional[str] = None # Last key seen in the top-level object
+        self._expect_key = False
+        self._in_string = False
+        self._string_start = 0
+        self._string_is_key = False
+        self._escape_start: Optional[int] = None # Offset of an unfinished backslash escape
+        self._item_start: Optional[int] = None
+        self._text_start: Optional[int] = None # Start of the text_field value not yet emitted
+
+    def _in_items(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "[" and self._key == self.items_field
+
+    def _item(self, end: int) -> Tuple[str, Any]:
+        value = json.loads(self._buffer[self._item_start:end])
+        self._item_start = None
+        return ("item", value)
+
+    def _text(self, end: int) -> Optional[Tuple[str, str]]:
+        raw = self._buffer[self._text_start:end]
+        fragment = json.loads(f'"{raw}"', strict=False)
+        # Hold back the first half of a surrogate pair until its second half arrives
+        if fragment and "\ud800" <= fragment[-1] <= "\udbff":
+            end -= 6
+            fragment = fragment[:-1]
+        self._text_start = end
+        return ("text", fragment) if fragment else None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self._buffer += chunk
+        events: List[Tuple[str, Any]] = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+            if self._doc_end is not None:
+                break
+            if self._doc_start is None:
+                if c == "{":
+                    self._doc_start = i
+                    self._stack.append("{")
+                    self._expect_key = True
+                continue
+
+            if self._in_string:
+                if self._escape_start is not None:
+                    # \uXXXX is complete after 4 hex digits, every other escape after one character
+                    if i == self._escape_start + 1 and c != "u" or i == self._escape_start + 5:
+                        self._escape_start = None
+                elif c == "\\":
+                    self._escape_start = i
+                elif c == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        if len(self._stack) == 1:
+                            self._key = json.loads(buffer[self._string_start:i + 1])
+                    elif self._text_start is not None:
+                        event = self._text(i)
+                        if event is not None:
+                            events.append(event)
+                        self._text_start = None
+                continue
+
+            if self._in_items() and self._item_start is None and c not in WHITESPACE + ",]":
+                self._item_start = i
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                self._string_is_key = self._stack[-1] == "{" and self._expect_key
+                if not self._string_is_key and len(self._stack) == 1 and self.text_field is not None and self._key == self.text_field:
+                    self._text_start = i + 1
+            elif c in "{[":
+                self._stack.append(c)
+                self._expect_key = c == "{"
+            elif c in "}]":
+                if c == "]" and self._in_items() and self._item_start is not None:
+                    events.append(self._item(i)) # A trailing scalar element
+                self._stack.pop()
+                if not self._stack:
+                    self._doc_end = i
+                elif self._in_items() and self._item_start is not None:
+                    events.append(self._item(i + 1))
+            elif c == ":":
+                self._expect_key = False
+            elif c == ",":
+                if self._in_items() and self._item_start is not None:
+                    events.append(self._item(i))
+                self._expect_key = self._stack[-1] == "{"
+        self._pos = len(buffer)
+
+        if self._in_string and self._text_start is not None:
+            event = self._text(self._escape_start if self._escape_start is not None else len(buffer))
+            if event is not None:
+                events.append(event)
+        return events
+
+    def result(self) -> Any:
+        if self._doc_end is None:
+            raise ValueError("Incomplete JSON document")
+        return json.loads(self._buffer[self._doc_start:self._doc_end + 1])
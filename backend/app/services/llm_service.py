@@ -1,188 +1,244 @@
-import os
+import asyncio
 import json
 import base64
+import hashlib
 import io
-import google.generativeai as genai
-from openai import OpenAI
-from typing import Any, Dict
-from ..models import SetupPrompt, QuestionGenerated, BatchQuestions, AnswerEvaluation
-from .prompts import SETUP_SYSTEM_PROMPT, QUESTION_GENERATION_PROMPT, CLARIFICATION_PROMPT, BATCH_QUESTION_GENERATION_PROMPT, ANSWER_EVALUATION_PROMPT
-
-class LLMService:
-    def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.gemini_key = os.getenv("GEMINI_API_KEY")
-        
-        # OpenAI Init
-        if not self.api_key:
-            print("Warning: OPENAI_API_KEY not set.")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=self.api_key)
-            
-        # Gemini Init
-        if self.gemini_key:
-            genai.configure(api_key=self.gemini_key)
-            self.gemini_model = genai.GenerativeModel("gemini-pro")
-        else:
-            print("Warning: GEMINI_API_KEY not set.")
-            self.gemini_model = None
+import re
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
+from ..models import SetupPrompt, QuestionGenerated, BatchQuestions, AnswerEvaluation, BatchEvaluations, QuestionType
+from .cache import PersistentCache, cache_key
+from .clients import LLMClientRegistry
+from .fake_llm import FakeLLMProvider
+from .json_stream import JsonStreamParser
+from .metrics import track_llm_call
+from .resilience import LLMResilience
+from .tracing import span, traced
+from .prompts import SETUP_SYSTEM_PROMPT, QUESTION_GENERATION, CLARIFICATION, SETUP_EXTRACTION, BATCH_QUESTION_GENERATION, ANSWER_EVALUATION, BATCH_ANSWER_EVALUATION, BATCH_ANSWER_ITEM
 
-    def _call_llm(self, system_prompt: str, user_prompt: str, response_model: Any = None, provider: str = "openai") -> Dict:
-        if provider == "gemini":
-            return self._call_gemini(system_prompt, user_prompt)
+# Answers where case and indentation carry meaning; only outer whitespace is ignored
+CODE_QUESTION_TYPES = {QuestionType.CODING.value, QuestionType.SQL.value, QuestionType.DEBUGGING.value}
 
-        if not self.client or self.api_key == "sk-placeholder":
-            print("LLM: Using Mock Response")
-            return self._mock_response(system_prompt, user_prompt)
-        
+def normalize_answer(answer: Optional[str], question_type: Optional[str] = None) -> str:
+    """Canonical form of an answer for the evaluation cache key."""
+    answer = (answer or "").strip()
+    if question_type is None or question_type in CODE_QUESTION_TYPES:
+        return answer
+    return " ".join(answer.lower().split())
+
+class AsyncLLMService:
+    """
+    LLM calls made by the API routes.
+    Provider calls are awaited on the event loop (AsyncOpenAI / generate_content_async),
+    so a single worker can hold many in-flight LLM calls without tying up threads.
+    """
+
+    def __init__(self, clients: Optional[LLMClientRegistry] = None, eval_cache: Optional[PersistentCache] = None, transcript_cache: Optional[PersistentCache] = None, fake: Optional[FakeLLMProvider] = None, resilience: Optional[LLMResilience] = None):
+        # Reuse the process-wide registry when given; otherwise build a private one
+        self.clients = clients or LLMClientRegistry()
+        # Timeouts, retries and circuit breakers (shared across the process when given)
+        self.resilience = resilience or LLMResilience(self.clients.settings)
+        self.eval_cache = eval_cache
+        self.transcript_cache = transcript_cache
+        # Load testing: every provider call goes to the latency-injecting stand-in instead
+        self.fake = fake
+        self.api_key = self.clients.openai_api_key
+        self.gemini_key = self.clients.gemini_api_key
+        self.async_client = self.clients.async_openai
+        self.gemini_model = self.clients.gemini_model
+
+    def _use_mock(self) -> bool:
+        return not self.async_client or self.api_key == "sk-placeholder"
+
+    def _openai_params(self, system_prompt: str, user_prompt: str, response_model: Any = None) -> Dict:
         params = {
             "model": "gpt-4o",
             "temperature": 0.2,
         }
 
         if response_model:
-             # strict json mode compatible invocation if needed
+             # JSON mode; every template's static system prompt mentions JSON as the API requires
              params["response_format"] = {"type": "json_object"}
-             if "json" not in system_prompt.lower():
-                 system_prompt += " You must output JSON."
 
-        # For structured JSON outputs
+        # Static system prompt first, per-call values last, so the provider can cache the prefix
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
         params["messages"] = messages
+        return params
 
-        try:
-            response = self.client.chat.completions.create(**params)
-            content = response.choices[0].message.content
-            
+    def _parse_openai_content(self, content: str) -> Dict:
+        with span("llm.parse", **{"llm.response_chars": len(content)}):
             # Simple sanitization
             if content.startswith("```json"):
                 content = content.replace("```json", "").replace("```", "")
-                
             return json.loads(content)
-        except Exception as e:
-            print(f"LLM Call Error: {e}")
-            raise
 
-    def _call_gemini(self, system_prompt: str, user_prompt: str) -> Dict:
-        if not self.gemini_model:
-             raise ValueError("Gemini API Key not configured.")
-        
-        try:
-            # Gemini doesn't have system prompts in the same way, usually prepended
-            full_prompt = f"System: {system_prompt}\n\nUser: {user_prompt}"
-            
-            response = self.gemini_model.generate_content(full_prompt)
-            content = response.text
-            
+    def _gemini_prompt(self, system_prompt: str, user_prompt: str) -> str:
+        # Gemini doesn't have system prompts in the same way, usually prepended
+        return f"System: {system_prompt}\n\nUser: {user_prompt}"
+
+    def _parse_gemini_content(self, content: str) -> Dict:
+        with span("llm.parse", **{"llm.response_chars": len(content)}):
             # Clean JSON
             clean_content = content.replace("```json", "").replace("```", "").strip()
             return json.loads(clean_content)
-        except Exception as e:
-             print(f"Gemini Call Error: {e}")
-             raise
+
+    def _openai_usage(self, response: Any) -> Dict[str, int]:
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return {}
+        details = getattr(usage, "prompt_tokens_details", None)
+        return {
+            "prompt_tokens": usage.prompt_tokens or 0,
+            "completion_tokens": usage.completion_tokens or 0,
+            "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+        }
+
+    def _gemini_usage(self, response: Any) -> Dict[str, int]:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return {}
+        return {
+            "prompt_tokens": usage.prompt_token_count or 0,
+            "completion_tokens": usage.candidates_token_count or 0,
+            "cached_tokens": getattr(usage, "cached_content_token_count", 0) or 0,
+        }
+
+    def _openai_stream_params(self, params: Dict) -> Dict:
+        # Streamed so time-to-first-token can be measured; the final chunk carries usage
+        return {**params, "stream": True, "stream_options": {"include_usage": True}}
+
+    def _gemini_model_name(self) -> str:
+        # e.g. "models/gemini-pro" -> "gemini-pro"
+        return getattr(self.gemini_model, "model_name", "gemini").split("/")[-1]
+
+    def _available_providers(self) -> List[str]:
+        if self.fake is not None:
+            return ["openai", "gemini"]
+        providers = []
+        if not self._use_mock():
+            providers.append("openai")
+        if self.gemini_model:
+            providers.append("gemini")
+        return providers
+
+    def _use_mock_for(self, provider: str) -> bool:
+        if provider == "auto":
+            return not self._available_providers()
+        return self.fake is None and provider != "gemini" and self._use_mock()
+
+    def _route(self, provider: str, kind: str) -> str:
+        """Resolve provider="auto" to the fastest healthy configured provider for this call."""
+        if provider != "auto":
+            return provider
+        candidates = self._available_providers()
+        if not candidates:
+            return "openai" # Nothing configured: mock responses
+        return self.resilience.choose_provider(kind, candidates)
 
     def get_setup_prompt(self) -> str:
         return SETUP_SYSTEM_PROMPT
-    
-    def generate_question(self, session_context: dict) -> QuestionGenerated:
-        system = self.get_setup_prompt()
-        
+
+    def _question_prompts(self, session_context: dict) -> Tuple[str, str]:
         # Prepare context strings
         diff = session_context.get('difficulty', 'Intermediate')
         tops = ", ".join(session_context.get('topics', []))
         typs = ", ".join(session_context.get('types', []))
-        
-        user = QUESTION_GENERATION_PROMPT.format(
+
+        return QUESTION_GENERATION.render(
             context=str(session_context),
             difficulty=diff,
             topics=tops,
             types=typs
         )
-        
-        # Ensure json keyword for API
-        if "json" not in system.lower(): system += " Output must be JSON."
-        
-        res = self._call_llm(system, user, response_model=True)
-        return QuestionGenerated(**res)
-
-    def get_setup_question(self, current_info: str) -> str:
-        prompt = CLARIFICATION_PROMPT.format(current_info=current_info)
-        res = self._call_llm("You are an exam coordinator.", prompt, response_model=True)
-        return res.get("clarifying_question", "Could you provide more details?")
 
-    def extract_setup_info(self, user_input: str) -> Dict[str, Any]:
-        system = "You are a helper extracting structured data from user text."
-        user = f"""
-        User said: "{user_input}"
-        Extract 'difficulty' (Junior, Intermediate, Senior) and 'topics' (list of strings) if present.
-        If not present, use null.
-        Format:
-        {{
-            "difficulty": "extracted_difficulty_or_null",
-            "topics": ["topic1", "topic2"] or null
-        }}
-        """
-        return self._call_llm(system, user, response_model=True)
+    def _extract_setup_prompts(self, user_input: str) -> Tuple[str, str]:
+        return SETUP_EXTRACTION.render(user_input=user_input)
 
-    def generate_batch_questions(self, count: int, difficulty: str, topics: list[str], types: list[str], provider: str = "openai") -> BatchQuestions:
-        system = self.get_setup_prompt()
-        if "json" not in system.lower(): system += " Output must be JSON."
-        
-        user_prompt = BATCH_QUESTION_GENERATION_PROMPT.format(
+    def _batch_prompts(self, count: int, difficulty: str, topics: list[str], types: list[str]) -> Tuple[str, str]:
+        return BATCH_QUESTION_GENERATION.render(
             count=count,
             difficulty=difficulty,
             topics=", ".join(topics),
             types=", ".join(types)
         )
-        
-        res = self._call_llm(system, user_prompt, response_model=True, provider=provider)
-        return BatchQuestions(**res)
 
-    def evaluate_answer(self, question_text: str, correct_ref: str, user_answer: str, options: list[str] = None, constraints: str = None, provider: str = "openai") -> AnswerEvaluation:
-        system = "You are a fair Data Engineering Interviewer. Evaluate the answer. Output JSON."
+    def _evaluation_prompts(self, question_text: str, correct_ref: str, user_answer: str, options: list[str] = None, constraints: str = None) -> Tuple[str, str]:
         options_str = ", ".join(options) if options else "N/A"
         constraints_str = constraints if constraints else "None"
-        
-        user_prompt = ANSWER_EVALUATION_PROMPT.format(
+
+        return ANSWER_EVALUATION.render(
             question=question_text,
             options=options_str,
             constraints=constraints_str,
             correct_answer_ref=correct_ref,
             user_answer=user_answer
         )
-        
-        res = self._call_llm(system, user_prompt, response_model=True, provider=provider)
-        return AnswerEvaluation(**res)
 
-    def transcribe_audio(self, audio_b64: str) -> str:
-        if not self.client or self.api_key == "sk-placeholder":
-            print("LLM: Mocking Transcription")
-            return "This is a mock transcription of the user's voice answer."
+    def is_simulated(self, provider: str) -> bool:
+        """True when calls for `provider` are answered by the fake or mock provider."""
+        return self.fake is not None or self._use_mock_for(provider)
 
-        try:
-            # Decode base64
-            audio_bytes = base64.b64decode(audio_b64)
-            # Create file-like object
-            audio_file = io.BytesIO(audio_bytes)
-            audio_file.name = "audio.wav" # Important for OpenAI API to detect format
+    def _evaluation_cache_key(self, question_text: str, correct_ref: str, user_answer: str, options: list[str], constraints: str, provider: str, question_type: Optional[str] = None) -> Optional[str]:
+        # Mock and fake evaluations must never be served once real keys are configured
+        if self.eval_cache is None or self.is_simulated(provider):
+            return None
+        normalized_answer = normalize_answer(user_answer, question_type)
+        # No provider in the key: "auto" routing and hedging decide who answers only after
+        # the lookup, and the inputs plus the prompt version already identify the evaluation
+        return cache_key(question_text, correct_ref, normalized_answer, options, constraints, ANSWER_EVALUATION.version)
 
-            print("LLM: sending audio to Whisper...")
-            transcript = self.client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="en" 
-            )
-            return transcript.text
-        except Exception as e:
-            print(f"Transcription Error: {e}")
-            return "[Error: Could not transcribe audio]"
+    def _batch_evaluation_prompts(self, answers: Dict[str, dict]) -> Tuple[str, str]:
+        items = []
+        for answer_id, answer in answers.items():
+            items.append(BATCH_ANSWER_ITEM.format(
+                id=answer_id,
+                question=answer["question_text"],
+                options=", ".join(answer.get("options") or []) or "N/A",
+                constraints=answer.get("constraints") or "None",
+                correct_answer_ref=answer["correct_ref"],
+                user_answer=answer["user_answer"]
+            ))
+        return BATCH_ANSWER_EVALUATION.render(count=len(items), answers="\n".join(items))
+
+    def _batch_evaluation_keys(self, answers: Dict[str, dict], provider: str) -> Dict[str, Optional[str]]:
+        return {
+            answer_id: self._evaluation_cache_key(answer["question_text"], answer["correct_ref"], answer["user_answer"], answer.get("options"), answer.get("constraints"), provider, answer.get("question_type"))
+            for answer_id, answer in answers.items()
+        }
+
+    def _parse_batch_evaluations(self, res: Dict, answer_ids) -> Dict[str, AnswerEvaluation]:
+        with span("llm.validate"):
+            batch = BatchEvaluations(**res)
+        # Ids the model invented or repeated are dropped; missing ones are the caller's to retry
+        return {e.id: AnswerEvaluation(**e.model_dump(exclude={"id"})) for e in batch.evaluations if e.id in answer_ids}
 
-    def _mock_response(self, system: str, user: str) -> Dict:
+    def _audio_file(self, audio: Union[str, BinaryIO], filename: str = "audio.wav") -> Tuple[str, BinaryIO]:
+        # The filename extension is how the OpenAI API detects the format
+        if isinstance(audio, str):
+            # Legacy JSON clients send the recording base64-encoded
+            return filename, io.BytesIO(base64.b64decode(audio))
+        # Uploaded files are streamed to the API as they are, without copying
+        audio.seek(0)
+        return filename, audio
+
+    def _transcript_cache_key(self, audio_file: BinaryIO) -> Optional[str]:
+        # Hash the decoded bytes in chunks so large uploads are never held in memory twice
+        if self.transcript_cache is None:
+            return None
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: audio_file.read(64 * 1024), b""):
+            digest.update(chunk)
+        audio_file.seek(0)
+        return cache_key(digest.hexdigest(), "whisper-1", "en")
+
+    def _mock_response(self, system: str, user: str, kind: str = "other") -> Dict:
         # Mock logic
+        if kind == "batch_evaluation":
+            ids = re.findall(r"^### Answer (\S+)$", user, re.MULTILINE)
+            return {"evaluations": [{"id": answer_id, "is_correct": True, "confidence": 0.9, "reason": "Matches mock", "explanation": "This is a mock evaluation."} for answer_id in ids]}
+
         if "Generate" in user:
             return {
                 "questions": [
@@ -197,7 +253,7 @@ class LLMService:
                     }
                 ]
             }
-        
+
         if "Evaluate" in user:
              return {
                  "is_correct": True,
@@ -205,5 +261,241 @@ class LLMService:
                  "reason": "Matches mock",
                  "explanation": "This is a mock evaluation."
              }
-             
+
         return {}
+
+    async def _call_llm(self, system_prompt: str, user_prompt: str, response_model: Any = None, provider: str = "openai", kind: str = "other") -> Dict:
+        provider = self._route(provider, kind)
+        if self._use_mock_for(provider):
+            print("LLM: Using Mock Response")
+            return self._mock_response(system_prompt, user_prompt, kind)
+
+        # The deadline is enforced by cancelling the attempt
+        return await self.resilience.acall(provider, kind, lambda: self._call_provider(system_prompt, user_prompt, response_model, provider, kind))
+
+    async def _stream_llm(self, system_prompt: str, user_prompt: str, response_model: Any = None, provider: str = "openai", kind: str = "other") -> AsyncIterator[str]:
+        """Like _call_llm(), but yields the raw response text as the provider produces it."""
+        provider = self._route(provider, kind)
+        if self._use_mock_for(provider):
+            print("LLM: Using Mock Response")
+            yield json.dumps(self._mock_response(system_prompt, user_prompt, kind))
+            return
+
+        async for text in self.resilience.astream(provider, kind, lambda: self._stream_provider(system_prompt, user_prompt, response_model, provider, kind)):
+            yield text
+
+    async def _call_provider(self, system_prompt: str, user_prompt: str, response_model: Any, provider: str, kind: str) -> Dict:
+        content = [text async for text in self._stream_provider(system_prompt, user_prompt, response_model, provider, kind)]
+        if provider == "gemini" and self.fake is None:
+            return self._parse_gemini_content("".join(content))
+        return self._parse_openai_content("".join(content))
+
+    async def _stream_provider(self, system_prompt: str, user_prompt: str, response_model: Any, provider: str, kind: str) -> AsyncIterator[str]:
+        """A single streamed attempt, yielding response text as it arrives."""
+        if self.fake is not None:
+            with track_llm_call("fake", "fake", kind) as call:
+                async for text in self.fake.astream(system_prompt, user_prompt, kind):
+                    call.first_token()
+                    yield text
+            return
+
+        if provider == "gemini":
+            async for text in self._stream_gemini(system_prompt, user_prompt, kind):
+                yield text
+            return
+
+        params = self._openai_params(system_prompt, user_prompt, response_model)
+
+        try:
+            with track_llm_call("openai", params["model"], kind) as call:
+                async for chunk in await self.async_client.chat.completions.create(**self._openai_stream_params(params)):
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        call.first_token()
+                        yield chunk.choices[0].delta.content
+                    if chunk.usage is not None:
+                        call.update(self._openai_usage(chunk))
+        except Exception as e:
+            print(f"LLM Call Error: {e}")
+            raise
+
+    async def _stream_gemini(self, system_prompt: str, user_prompt: str, kind: str = "other") -> AsyncIterator[str]:
+        if not self.gemini_model:
+             raise ValueError("Gemini API Key not configured.")
+
+        try:
+            with track_llm_call("gemini", self._gemini_model_name(), kind) as call:
+                response = await self.gemini_model.generate_content_async(self._gemini_prompt(system_prompt, user_prompt), stream=True)
+                async for chunk in response:
+                    call.first_token()
+                    yield chunk.text
+                call.update(self._gemini_usage(response))
+        except Exception as e:
+             print(f"Gemini Call Error: {e}")
+             raise
+
+    def _hedge_provider(self, provider: str) -> Optional[str]:
+        """The provider to hedge `provider` calls with, if hedging is on and it is usable."""
+        if not self.clients.settings.llm_hedge_enabled or self._use_mock_for(provider):
+            return None
+        other = "openai" if provider == "gemini" else "gemini"
+        if self.fake is not None or (other == "gemini" and self.gemini_model) or (other == "openai" and not self._use_mock()):
+            return other
+        return None
+
+    @traced("llm.generate_question")
+    async def generate_question(self, session_context: dict) -> QuestionGenerated:
+        system, user = self._question_prompts(session_context)
+        res = await self._call_llm(system, user, response_model=True, kind="question")
+        with span("llm.validate"):
+            return QuestionGenerated(**res)
+
+    @traced("llm.get_setup_question")
+    async def get_setup_question(self, current_info: str) -> str:
+        system, user = CLARIFICATION.render(current_info=current_info)
+        res = await self._call_llm(system, user, response_model=True, kind="clarification")
+        return res.get("clarifying_question", "Could you provide more details?")
+
+    @traced("llm.extract_setup_info")
+    async def extract_setup_info(self, user_input: str) -> Dict[str, Any]:
+        system, user = self._extract_setup_prompts(user_input)
+        return await self._call_llm(system, user, response_model=True, kind="setup_extraction")
+
+    @traced("llm.generate_batch_questions")
+    async def generate_batch_questions(self, count: int, difficulty: str, topics: list[str], types: list[str], provider: str = "openai") -> BatchQuestions:
+        system, user_prompt = self._batch_prompts(count, difficulty, topics, types)
+        res = await self._call_llm(system, user_prompt, response_model=True, provider=provider, kind="batch_questions")
+        with span("llm.validate"):
+            return BatchQuestions(**res)
+
+    async def stream_batch_questions(self, count: int, difficulty: str, topics: list[str], types: list[str], provider: str = "openai") -> AsyncIterator[QuestionGenerated]:
+        """generate_batch_questions() yielding each question as soon as the model has finished writing it."""
+        system, user_prompt = self._batch_prompts(count, difficulty, topics, types)
+        parser = JsonStreamParser(items_field="questions")
+        async for text in self._stream_llm(system, user_prompt, response_model=True, provider=provider, kind="batch_questions"):
+            for _, item in parser.feed(text):
+                try:
+                    question = QuestionGenerated(**item)
+                except (TypeError, ValueError) as e:
+                    # One malformed question should not cost the ones already streamed
+                    print(f"LLM: Skipping malformed question: {e}")
+                    continue
+                yield question
+
+    @traced("llm.evaluate_answer")
+    async def evaluate_answer(self, question_text: str, correct_ref: str, user_answer: str, options: list[str] = None, constraints: str = None, provider: str = "openai", question_type: Optional[str] = None) -> AnswerEvaluation:
+        key = self._evaluation_cache_key(question_text, correct_ref, user_answer, options, constraints, provider, question_type)
+        if key is not None:
+            cached = await asyncio.to_thread(self.eval_cache.get, key)
+            if cached is not None:
+                print("LLM: Evaluation cache hit")
+                return AnswerEvaluation(**cached)
+
+        system, user_prompt = self._evaluation_prompts(question_text, correct_ref, user_answer, options, constraints)
+
+        async def evaluate(p: str) -> AnswerEvaluation:
+            res = await self._call_llm(system, user_prompt, response_model=True, provider=p, kind="evaluation")
+            with span("llm.validate"):
+                return AnswerEvaluation(**res)
+
+        # Tail latency: race a slow evaluation against the other provider, first valid answer wins
+        provider = self._route(provider, "evaluation")
+        other = self._hedge_provider(provider)
+        if other is not None:
+            evaluation = await self.resilience.hedge("evaluation", provider, other, evaluate)
+        else:
+            evaluation = await evaluate(provider)
+        if key is not None:
+            await asyncio.to_thread(self.eval_cache.set, key, evaluation.model_dump())
+        return evaluation
+
+    async def stream_evaluation(self, question_text: str, correct_ref: str, user_answer: str, options: list[str] = None, constraints: str = None, provider: str = "openai", question_type: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        evaluate_answer() as ("explanation", text) fragments while the model writes the
+        explanation, ending with ("evaluation", AnswerEvaluation). Not hedged: a second
+        stream cannot take over halfway through the first.
+        """
+        key = self._evaluation_cache_key(question_text, correct_ref, user_answer, options, constraints, provider, question_type)
+        if key is not None:
+            cached = await asyncio.to_thread(self.eval_cache.get, key)
+            if cached is not None:
+                print("LLM: Evaluation cache hit")
+                evaluation = AnswerEvaluation(**cached)
+                yield "explanation", evaluation.explanation
+                yield "evaluation", evaluation
+                return
+
+        system, user_prompt = self._evaluation_prompts(question_text, correct_ref, user_answer, options, constraints)
+        parser = JsonStreamParser(text_field="explanation")
+        async for text in self._stream_llm(system, user_prompt, response_model=True, provider=provider, kind="evaluation"):
+            for _, fragment in parser.feed(text):
+                yield "explanation", fragment
+        with span("llm.validate"):
+            evaluation = AnswerEvaluation(**parser.result())
+        if key is not None:
+            await asyncio.to_thread(self.eval_cache.set, key, evaluation.model_dump())
+        yield "evaluation", evaluation
+
+    @traced("llm.evaluate_answers")
+    async def evaluate_answers(self, answers: Dict[str, dict], provider: str = "openai") -> Dict[str, AnswerEvaluation]:
+        """
+        Evaluate several answers with one request. `answers` maps an id to the keyword
+        arguments of evaluate_answer() (without provider); answers the model skipped are
+        missing from the result.
+        """
+        keys = self._batch_evaluation_keys(answers, provider)
+        results: Dict[str, AnswerEvaluation] = {}
+        for answer_id, key in keys.items():
+            cached = await asyncio.to_thread(self.eval_cache.get, key) if key is not None else None
+            if cached is not None:
+                results[answer_id] = AnswerEvaluation(**cached)
+        misses = {answer_id: answer for answer_id, answer in answers.items() if answer_id not in results}
+        if not misses:
+            return results
+
+        system, user_prompt = self._batch_evaluation_prompts(misses)
+        res = await self._call_llm(system, user_prompt, response_model=True, provider=provider, kind="batch_evaluation")
+        for answer_id, evaluation in self._parse_batch_evaluations(res, misses).items():
+            results[answer_id] = evaluation
+            if keys[answer_id] is not None:
+                await asyncio.to_thread(self.eval_cache.set, keys[answer_id], evaluation.model_dump())
+        return results
+
+    async def _transcribe_attempt(self, audio_file: Optional[Tuple[str, BinaryIO]]) -> str:
+        if self.fake is not None:
+            with track_llm_call("fake", "fake", "transcription"):
+                return await self.fake.atranscribe()
+        audio_file[1].seek(0)
+        with track_llm_call("openai", "whisper-1", "transcription"):
+            transcript = await self.async_client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file,
+                language="en"
+            )
+        return transcript.text
+
+    @traced("llm.transcribe_audio")
+    async def transcribe_audio(self, audio: Union[str, BinaryIO], filename: str = "audio.wav") -> str:
+        """`audio` is a base64 string or a binary file object (e.g. a spooled upload)."""
+        if self._use_mock() and self.fake is None:
+            print("LLM: Mocking Transcription")
+            return "This is a mock transcription of the user's voice answer."
+
+        try:
+            if self.fake is not None:
+                return await self.resilience.acall("openai", "transcription", lambda: self._transcribe_attempt(None))
+            audio_file = self._audio_file(audio, filename)
+            key = await asyncio.to_thread(self._transcript_cache_key, audio_file[1])
+            if key is not None:
+                cached = await asyncio.to_thread(self.transcript_cache.get, key)
+                if cached is not None:
+                    print("LLM: Transcript cache hit")
+                    return cached
+
+            print("LLM: sending audio to Whisper...")
+            transcript = await self.resilience.acall("openai", "transcription", lambda: self._transcribe_attempt(audio_file))
+            if key is not None:
+                await asyncio.to_thread(self.transcript_cache.set, key, transcript)
+            return transcript
+        except Exception as e:
+            print(f"Transcription Error: {e}")
+            return "[Error: Could not transcribe audio]"
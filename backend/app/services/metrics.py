@@ -0,0 +1,271 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from .tracing import span
+
+# Seconds; spans a cache hit through a slow LLM completion
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Estimated USD per million (prompt, completion, cached prompt) tokens, for the cost counter only
+MODEL_PRICES_PER_MTOK = {
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gemini-pro": (0.50, 1.50, 0.50),
+}
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: List["_Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric"):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), registry: MetricsRegistry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[Tuple[str, ...], List[float]] = {} # per-bucket counts, then sum
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, [0.0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-1] += value
+
+    def values(self) -> Dict[Tuple[str, ...], List[float]]:
+        with self._lock:
+            return {key: list(counts) for key, counts in self._values.items()}
+
+    def quantile(self, counts: List[float], q: float) -> Optional[float]:
+        """Estimate the q-quantile from bucket `counts` (as in values()), interpolating within a bucket."""
+        total = sum(counts[:-1])
+        if not total:
+            return None
+        rank = q * total
+        cumulative, lower = 0.0, 0.0
+        for bound, count in zip(self.buckets, counts):
+            if count and cumulative + count >= rank:
+                if math.isinf(bound):
+                    return lower # Beyond the largest finite bucket
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        return lower
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(counts)) for key, counts in self._values.items())
+        lines = []
+        for key, counts in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {_format_value(cumulative)}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+# --- Application metrics ---
+
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"])
+
+LLM_DURATION = Histogram("llm_call_duration_seconds", "Latency of LLM and transcription calls", ["provider", "model", "kind", "outcome"])
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the provider (\"cached\" is the part of \"prompt\" served from the prompt cache)", ["provider", "model", "kind", "type"])
+LLM_TTFT = Histogram("llm_time_to_first_token_seconds", "Time from sending an LLM request to its first streamed token", ["provider", "model", "kind"])
+LLM_COST = Counter("llm_estimated_cost_usd_total", "Estimated spend from token usage and list prices", ["provider", "model", "kind"])
+LLM_RETRIES = Counter("llm_retries_total", "LLM attempts retried after a transient error", ["provider", "kind"])
+LLM_HEDGES = Counter("llm_hedged_requests_total", "Hedged LLM requests by which call answered first", ["kind", "winner"])
+LLM_ROUTED = Counter("llm_routed_calls_total", "provider=\"auto\" calls by the provider they were routed to", ["kind", "provider"])
+LLM_BREAKER_OPEN = Gauge("llm_circuit_open", "1 while the provider's circuit breaker is open", ["provider"])
+
+STORAGE_DURATION = Histogram("storage_operation_duration_seconds", "Session storage latency", ["op"])
+STORAGE_BYTES = Counter("storage_bytes_total", "Session bytes read or written", ["op"])
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by outcome", ["cache", "result"])
+
+
+def observe_llm_call(provider: str, model: str, kind: str, started: float, outcome: str = "ok", prompt_tokens: int = 0, completion_tokens: int = 0, cached_tokens: int = 0, ttft: Optional[float] = None):
+    """Record one provider call that began at `started` (time.perf_counter())."""
+    LLM_DURATION.observe(time.perf_counter() - started, provider=provider, model=model, kind=kind, outcome=outcome)
+    if ttft is not None:
+        LLM_TTFT.observe(ttft, provider=provider, model=model, kind=kind)
+    if prompt_tokens or completion_tokens:
+        LLM_TOKENS.inc(prompt_tokens, provider=provider, model=model, kind=kind, type="prompt")
+        LLM_TOKENS.inc(cached_tokens, provider=provider, model=model, kind=kind, type="cached")
+        LLM_TOKENS.inc(completion_tokens, provider=provider, model=model, kind=kind, type="completion")
+        prices = MODEL_PRICES_PER_MTOK.get(model)
+        if prices is not None:
+            cost = ((prompt_tokens - cached_tokens) * prices[0] + cached_tokens * prices[2] + completion_tokens * prices[1]) / 1_000_000
+            LLM_COST.inc(cost, provider=provider, model=model, kind=kind)
+
+
+class LLMCall:
+    """Usage of one provider call, filled in by the caller inside track_llm_call()."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.ttft: Optional[float] = None
+
+    def update(self, usage: Dict[str, int]):
+        for name, value in usage.items():
+            setattr(self, name, value)
+
+    def first_token(self):
+        """Mark the arrival of the first streamed token (later calls are ignored)."""
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+
+
+@contextmanager
+def track_llm_call(provider: str, model: str, kind: str):
+    """Time the enclosed provider call (metrics and a trace span) and record the usage set on the yielded LLMCall."""
+    call = LLMCall()
+    with span("llm.request", **{"llm.provider": provider, "llm.model": model, "llm.kind": kind}) as current:
+        try:
+            yield call
+        except BaseException:
+            observe_llm_call(provider, model, kind, call.started, outcome="error")
+            raise
+        finally:
+            current.set_attributes({
+                "llm.prompt_tokens": call.prompt_tokens,
+                "llm.cached_tokens": call.cached_tokens,
+                "llm.completion_tokens": call.completion_tokens,
+                "llm.ttft_ms": round(call.ttft * 1000, 1) if call.ttft is not None else None,
+            })
+    observe_llm_call(provider, model, kind, call.started, "ok", call.prompt_tokens, call.completion_tokens, call.cached_tokens, call.ttft)
+
+def llm_usage_report() -> Dict[str, dict]:
+    """Per call kind: calls, tokens, prompt-cache hit ratio and time-to-first-token quantiles (this process)."""
+    report: Dict[str, dict] = {}
+
+    def row(kind: str) -> dict:
+        return report.setdefault(kind, {"calls": 0, "errors": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0})
+
+    for (provider, model, kind, outcome), counts in LLM_DURATION.values().items():
+        calls = int(sum(counts[:-1]))
+        row(kind)["calls"] += calls
+        if outcome == "error":
+            row(kind)["errors"] += calls
+    for (provider, model, kind, token_type), value in LLM_TOKENS.values().items():
+        row(kind)[f"{token_type}_tokens"] += int(value)
+    ttft: Dict[str, List[float]] = {}
+    for (provider, model, kind), counts in LLM_TTFT.values().items():
+        merged = ttft.setdefault(kind, [0.0] * len(counts))
+        ttft[kind] = [a + b for a, b in zip(merged, counts)]
+
+    for kind, stats in report.items():
+        stats["cache_hit_ratio"] = round(stats["cached_tokens"] / stats["prompt_tokens"], 3) if stats["prompt_tokens"] else None
+        for name, q in (("ttft_p50_s", 0.5), ("ttft_p95_s", 0.95)):
+            value = LLM_TTFT.quantile(ttft[kind], q) if kind in ttft else None
+            stats[name] = round(value, 3) if value is not None else None
+    return report
+
+def observe_cache(cache: str, hit: bool, count: int = 1):
+    if count:
+        CACHE_REQUESTS.inc(count, cache=cache, result="hit" if hit else "miss")
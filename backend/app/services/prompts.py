@@ -1,4 +1,25 @@
 # System Prompts for Data Engineer Exam Simulator
+#
+# Every LLM prompt is a PromptTemplate: a static system message that is byte-identical
+# on every call, followed by a short user message holding the per-call values. Providers
+# cache prompt prefixes (OpenAI does so automatically past ~1K tokens), so keeping all
+# instructions and schemas in the static part means repeat calls only pay full
+# input-token latency for the dynamic suffix.
+#
+# Bump a template's version whenever its text changes; evaluation cache keys and the
+# usage report include it.
+from typing import Dict, NamedTuple, Tuple
+
+
+class PromptTemplate(NamedTuple):
+    kind: str # Matches the LLM call kind used in metrics
+    version: str
+    system: str # Static prefix, never formatted
+    user: str # Dynamic suffix, a str.format template
+
+    def render(self, **values) -> Tuple[str, str]:
+        return self.system, self.user.format(**values)
+
 
 SETUP_SYSTEM_PROMPT = """You are an expert Data Engineering interviewer.
 Your task is to conduct a REALISTIC, INTERVIEW-GRADE Data Engineer assessment.
@@ -17,81 +38,120 @@ Ask these ONE BY ONE:
 5. Project Questions (Yes/No)
 """
 
-QUESTION_GENERATION_PROMPT = """
-        Generate the NEXT question for this candidate.
-        Context: {context}
-        Rules:
-        - Question difficulty must match {difficulty}
-        - Topic must be from {topics}
-        - Type must be one of {types}
-        - Output STRICT JSON.
-        
-        Format:
-        {{
-            "question": "text",
-            "options": ["A", "B"],
-            "correct_answer": "answer text",
-            "concept": "concept tested",
-            "difficulty": "level",
-            "type": "MCQ/CODING/etc",
-            "explanation": "concise deep explanation"
-        }}
-"""
+QUESTION_GENERATION = PromptTemplate(
+    kind="question",
+    version="2",
+    system=SETUP_SYSTEM_PROMPT + """
+You generate the NEXT question for a candidate, given the exam context in the request.
+Rules:
+- Question difficulty must match the requested Difficulty.
+- Topic must be one of the requested Topics.
+- Type must be one of the requested Types.
+- Output STRICT JSON.
 
-PROJECT_GENERATION_PROMPT = """
-    Generate a Project-Based Question for a Data Engineer.
-    Scenario: {scenario_type} (Small/Medium/Large)
-    Context: {topics}
-    
-    Output JSON:
-    {{
-        "title": "Project Title",
-        "scenario": "Business context and data volume details",
-        "task": "Specific deliverables (e.g. Design schema, Write PySpark job)",
-        "constraints": "Latency, Cost, Tech Stack constraints",
-        "evaluation_rubric": ["Criterion 1", "Criterion 2"]
-    }}
-"""
+Format:
+{
+    "question": "text",
+    "options": ["A", "B"],
+    "correct_answer": "answer text",
+    "concept": "concept tested",
+    "difficulty": "level",
+    "type": "MCQ/CODING/etc",
+    "explanation": "concise deep explanation"
+}
+""",
+    user="""Generate the NEXT question for this candidate.
+Context: {context}
+Difficulty: {difficulty}
+Topics: {topics}
+Types: {types}
+""",
+)
 
-CLARIFICATION_PROMPT = """
-        Ask a single, polite, professional question to gather missing information for a Data Engineer Interview.
-        Missing Info or Context: {current_info}
-        Do not invent information. just ask.
-        Return strictly JSON: {{"clarifying_question": "..."}}
-"""
+PROJECT_GENERATION = PromptTemplate(
+    kind="project",
+    version="2",
+    system="""You generate Project-Based Questions for a Data Engineer.
+The request gives the scenario size (Small/Medium/Large) and the topics.
 
-BATCH_QUESTION_GENERATION_PROMPT = """
-    Generate {count} interview questions for a Data Engineer.
-    
-    Context:
-    - Difficulty: {difficulty}
-    - Topics: {topics}
-    - Types: {types}
-    
-    Output STRICT JSON with this schema:
-    {{
-        "questions": [
-            {{
-                "question": "Question text...",
-                "options": ["A", "B", "C", "D"], // Only for MCQ. MUST have 4 options.
-                "correct_answer": "Exact correct answer string (or comma separated if multiple)",
-                "concept": "Concept tested",
-                "difficulty": "{difficulty}",
-                "type": "ONE_OF_TYPES",
-                "explanation": "Detailed explanation of the answer",
-                "constraints": "Constraints if coding/project"
-            }}
-        ]
-    }}
-    
-    RULES:
-    1. For MCQs, there can be ONE or MULTIPLE correct answers. 
-    2. If multiple are correct, "correct_answer" should be comma-separated concepts (e.g. "Scalability, Fault Tolerance").
-    3. Ensure options are plausible distractors.
-"""
+Output JSON:
+{
+    "title": "Project Title",
+    "scenario": "Business context and data volume details",
+    "task": "Specific deliverables (e.g. Design schema, Write PySpark job)",
+    "constraints": "Latency, Cost, Tech Stack constraints",
+    "evaluation_rubric": ["Criterion 1", "Criterion 2"]
+}
+""",
+    user="""Scenario: {scenario_type}
+Context: {topics}
+""",
+)
+
+CLARIFICATION = PromptTemplate(
+    kind="clarification",
+    version="2",
+    system="""You are an exam coordinator.
+Ask a single, polite, professional question to gather missing information for a Data Engineer Interview.
+Do not invent information. just ask.
+Return strictly JSON: {"clarifying_question": "..."}
+""",
+    user="""Missing Info or Context: {current_info}
+""",
+)
+
+SETUP_EXTRACTION = PromptTemplate(
+    kind="setup_extraction",
+    version="2",
+    system="""You are a helper extracting structured data from user text.
+Extract 'difficulty' (Junior, Intermediate, Senior) and 'topics' (list of strings) if present.
+If not present, use null.
+Format (JSON):
+{
+    "difficulty": "extracted_difficulty_or_null",
+    "topics": ["topic1", "topic2"] or null
+}
+""",
+    user="""User said: "{user_input}"
+""",
+)
+
+BATCH_QUESTION_GENERATION = PromptTemplate(
+    kind="batch_questions",
+    version="2",
+    system=SETUP_SYSTEM_PROMPT + """
+You generate batches of interview questions for a Data Engineer. The request gives the
+number of questions, the difficulty, the topics and the allowed types.
 
-ANSWER_EVALUATION_PROMPT = """
-You are a senior Data Engineering interviewer and evaluator.
+Output STRICT JSON with this schema:
+{
+    "questions": [
+        {
+            "question": "Question text...",
+            "options": ["A", "B", "C", "D"], // Only for MCQ. MUST have 4 options.
+            "correct_answer": "Exact correct answer string (or comma separated if multiple)",
+            "concept": "Concept tested",
+            "difficulty": "The requested difficulty",
+            "type": "ONE_OF_TYPES",
+            "explanation": "Detailed explanation of the answer",
+            "constraints": "Constraints if coding/project"
+        }
+    ]
+}
+
+RULES:
+1. For MCQs, there can be ONE or MULTIPLE correct answers.
+2. If multiple are correct, "correct_answer" should be comma-separated concepts (e.g. "Scalability, Fault Tolerance").
+3. Ensure options are plausible distractors.
+""",
+    user="""Generate {count} interview questions for a Data Engineer.
+Difficulty: {difficulty}
+Topics: {topics}
+Types: {types}
+""",
+)
+
+_EVALUATOR_RULES = """You are a senior Data Engineering interviewer and evaluator.
 
 Your task is to evaluate the candidate's answer STRICTLY and FAIRLY based on
 production-grade Data Engineering knowledge.
@@ -104,7 +164,49 @@ IMPORTANT RULES:
 - Explanations must be concise, structured, and useful for revision.
 - Avoid unnecessary verbosity.
 
+"""
+
+_EVALUATION_QUALITY_BAR = """–––––––––––––––––––––––––––––
+QUALITY BAR (MANDATORY)
+–––––––––––––––––––––––––––––
+
+- Revision notes must be exam-focused, not tutorial-style.
+- Code snippets must be minimal and directly relevant.
+- If the question is theoretical, code_snippet MUST be null.
+- Avoid generic advice.
+- Think like a real interviewer explaining after the answer.
+
+"""
+
+ANSWER_EVALUATION = PromptTemplate(
+    kind="evaluation",
+    version="2",
+    system=_EVALUATOR_RULES + """–––––––––––––––––––––––––––––
+OUTPUT REQUIREMENTS (STRICT)
 –––––––––––––––––––––––––––––
+
+Return ONLY valid JSON in the exact structure below.
+Do NOT add extra keys.
+Do NOT add commentary outside JSON.
+
+JSON SCHEMA:
+{
+  "is_correct": true | false,
+  "confidence": number between 0.0 and 1.0,
+  "reason": "Detailed justification for correctness or incorrectness of each options",
+  "explanation": "Markdown formatted string with the following structure:\\n\\n**✅ Analysis**\\nBriefly explain (3–5 lines max) why the correct answer is correct in real-world Data Engineering scenarios.\\n\\n**❌ Common Mistakes / Distractor Analysis**\\nExplain ONLY the most relevant wrong options or misconceptions (2–3 bullets max).\\n\\n**📖 Key Revision Notes**\\nProvide 3–5 short bullet points (max 1 line each) summarizing the core concepts needed to answer this question correctly.",
+  "code_snippet": "Provide ONE short, relevant code example (5–12 lines max) in Python or SQL ONLY if it materially helps understanding. If not applicable, return null.",
+  "related_topics": [
+    "2–4 closely related Data Engineering topics (no duplicates)"
+  ],
+  "learning_resources": [
+    "Official documentation name or well-known concept (no URLs, 2–3 items max)"
+  ]
+}
+
+""" + _EVALUATION_QUALITY_BAR + """The question and the candidate's answer follow in the user message.
+""",
+    user="""–––––––––––––––––––––––––––––
 INPUT
 –––––––––––––––––––––––––––––
 
@@ -123,38 +225,67 @@ Correct Answer Reference (authoritative):
 Candidate Answer:
 {user_answer}
 
+Evaluate now.
+""",
+)
+
+BATCH_ANSWER_EVALUATION = PromptTemplate(
+    kind="batch_evaluation",
+    version="1",
+    system=_EVALUATOR_RULES + """The request contains several answers, each under a "### Answer <id>" heading.
+Evaluate every answer on its own; do not let one answer influence another.
+
 –––––––––––––––––––––––––––––
 OUTPUT REQUIREMENTS (STRICT)
 –––––––––––––––––––––––––––––
 
-Return ONLY valid JSON in the exact structure below.
+Return ONLY valid JSON in the exact structure below, with one entry per answer.
 Do NOT add extra keys.
 Do NOT add commentary outside JSON.
 
 JSON SCHEMA:
-{{
-  "is_correct": true | false,
-  "confidence": number between 0.0 and 1.0,
-  "reason": "Detailed justification for correctness or incorrectness of each options",
-  "explanation": "Markdown formatted string with the following structure:\\n\\n**✅ Analysis**\\nBriefly explain (3–5 lines max) why the correct answer is correct in real-world Data Engineering scenarios.\\n\\n**❌ Common Mistakes / Distractor Analysis**\\nExplain ONLY the most relevant wrong options or misconceptions (2–3 bullets max).\\n\\n**📖 Key Revision Notes**\\nProvide 3–5 short bullet points (max 1 line each) summarizing the core concepts needed to answer this question correctly.",
-  "code_snippet": "Provide ONE short, relevant code example (5–12 lines max) in Python or SQL ONLY if it materially helps understanding. If not applicable, return null.",
-  "related_topics": [
-    "2–4 closely related Data Engineering topics (no duplicates)"
-  ],
-  "learning_resources": [
-    "Official documentation name or well-known concept (no URLs, 2–3 items max)"
+{
+  "evaluations": [
+    {
+      "id": "The <id> of the answer, exactly as given",
+      "is_correct": true | false,
+      "confidence": number between 0.0 and 1.0,
+      "reason": "Detailed justification for correctness or incorrectness of each options",
+      "explanation": "Markdown formatted string with the following structure:\n\n**✅ Analysis**\nBriefly explain (3–5 lines max) why the correct answer is correct in real-world Data Engineering scenarios.\n\n**❌ Common Mistakes / Distractor Analysis**\nExplain ONLY the most relevant wrong options or misconceptions (2–3 bullets max).\n\n**📖 Key Revision Notes**\nProvide 3–5 short bullet points (max 1 line each) summarizing the core concepts needed to answer this question correctly.",
+      "code_snippet": "ONE short, relevant code example (5–12 lines max) in Python or SQL ONLY if it materially helps understanding, else null.",
+      "related_topics": ["2–4 closely related Data Engineering topics (no duplicates)"],
+      "learning_resources": ["Official documentation name or well-known concept (no URLs, 2–3 items max)"]
+    }
   ]
-}}
+}
 
-–––––––––––––––––––––––––––––
-QUALITY BAR (MANDATORY)
-–––––––––––––––––––––––––––––
+""" + _EVALUATION_QUALITY_BAR + """The answers to evaluate follow in the user message.
+""",
+    user="""Evaluate each of the {count} answers below.
 
-- Revision notes must be exam-focused, not tutorial-style.
-- Code snippets must be minimal and directly relevant.
-- If the question is theoretical, code_snippet MUST be null.
-- Avoid generic advice.
-- Think like a real interviewer explaining after the answer.
+{answers}
+""",
+)
 
-Evaluate now.
+# One entry of BATCH_ANSWER_EVALUATION's {answers}
+BATCH_ANSWER_ITEM = """### Answer {id}
+Question:
+{question}
+
+Options (if applicable):
+{options}
+
+Constraints (if applicable):
+{constraints}
+
+Correct Answer Reference (authoritative):
+{correct_answer_ref}
+
+Candidate Answer:
+{user_answer}
 """
+
+TEMPLATES: Dict[str, PromptTemplate] = {
+    template.kind: template
+    for template in (QUESTION_GENERATION, PROJECT_GENERATION, CLARIFICATION, SETUP_EXTRACTION, BATCH_QUESTION_GENERATION, ANSWER_EVALUATION, BATCH_ANSWER_EVALUATION)
+}
@@ -0,0 +1,303 @@
+import asyncio
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import httpx
+from openai import APIConnectionError
+
+from ..config import Settings
+from .fake_llm import FakeLLMError
+from .metrics import LLM_BREAKER_OPEN, LLM_HEDGES, LLM_RETRIES, LLM_ROUTED
+from .tracing import span
+
+T = TypeVar("T")
+
+# Rate limits, request timeouts and server-side failures are worth another attempt
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Latency samples kept per (provider, kind) for the hedging percentile and routing
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+# Routing looks at the latest samples only, so it reacts to a brownout within a few calls
+ROUTING_SAMPLES = 20
+# Outcomes needed before a provider's error rate can exclude it from routing
+MIN_ROUTING_SAMPLES = 5
+
+
+class LLMTimeoutError(Exception):
+    """A provider call exceeded its per-attempt deadline."""
+
+class CircuitOpenError(Exception):
+    """The provider's circuit breaker is open; the call was not attempted."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (LLMTimeoutError, asyncio.TimeoutError, ConnectionError, APIConnectionError, httpx.TransportError, FakeLLMError)):
+        return True
+    # openai.APIStatusError has `status_code`, google.api_core exceptions have `code`
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return isinstance(status, int) and status in TRANSIENT_STATUS_CODES
+
+
+class CircuitBreaker:
+    """
+    Per-provider breaker. After `failure_threshold` consecutive transient failures the
+    circuit opens and calls fail fast with CircuitOpenError; after `reset_timeout`
+    seconds a single trial call is let through, which closes it again on success.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock() # shared by the event loop and worker threads
+
+    def available(self) -> bool:
+        """False while open and cooling down. Unlike allow(), does not claim the trial call."""
+        with self._lock:
+            return self.state != "open" or time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+                return True
+            return self.state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print(f"LLM: Circuit for {self.name} closed")
+                LLM_BREAKER_OPEN.set(0, provider=self.name)
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                print(f"LLM: Circuit for {self.name} opened after {self.failures} failures")
+                LLM_BREAKER_OPEN.set(1, provider=self.name)
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class LLMResilience:
+    """
+    Deadlines, jittered exponential retries, per-provider circuit breakers, hedging and
+    provider="auto" routing for LLM calls and streams. One instance is shared by the process so
+    breakers and the latency/error windows see every request.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or Settings.from_env()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # (monotonic time, seconds) of successful attempts, per (provider, kind)
+        self._latencies: Dict[Tuple[str, str], Deque[Tuple[float, float]]] = {}
+        # (monotonic time, succeeded) of every attempt, per provider
+        self._outcomes: Dict[str, Deque[Tuple[float, bool]]] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(provider, self.settings.llm_breaker_threshold, self.settings.llm_breaker_reset)
+            return self._breakers[provider]
+
+    def _observe(self, provider: str, kind: str, seconds: Optional[float]):
+        """Record an attempt; `seconds` is None for a failure."""
+        now = time.monotonic()
+        with self._lock:
+            if seconds is not None:
+                self._latencies.setdefault((provider, kind), deque(maxlen=LATENCY_WINDOW)).append((now, seconds))
+            self._outcomes.setdefault(provider, deque(maxlen=LATENCY_WINDOW)).append((now, seconds is not None))
+
+    def hedge_delay(self, provider: str, kind: str) -> float:
+        """The configured percentile of recent successful latencies, or the fixed fallback."""
+        with self._lock:
+            samples = sorted(seconds for _, seconds in self._latencies.get((provider, kind), ()))
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return self.settings.llm_hedge_delay
+        index = min(len(samples) - 1, int(len(samples) * self.settings.llm_hedge_percentile / 100))
+        return samples[index]
+
+    def _recent(self, entries) -> list:
+        cutoff = time.monotonic() - self.settings.llm_routing_window
+        return [entry for entry in entries if entry[0] >= cutoff][-ROUTING_SAMPLES:]
+
+    def provider_health(self, provider: str, kind: str) -> dict:
+        """Median latency for `kind` and error rate over the latest samples in the routing window."""
+        with self._lock:
+            latencies = self._recent(self._latencies.get((provider, kind), ()))
+            outcomes = self._recent(self._outcomes.get(provider, ()))
+        failures = sum(1 for _, ok in outcomes if not ok)
+        return {
+            "median_latency_s": statistics.median(seconds for _, seconds in latencies) if latencies else None,
+            "error_rate": failures / len(outcomes) if outcomes else 0.0,
+            "samples": len(outcomes),
+        }
+
+    def choose_provider(self, kind: str, candidates: Sequence[str]) -> str:
+        """
+        The candidate with the lowest recent median latency for `kind`, skipping open
+        circuits and providers whose recent error rate is too high. Providers with no
+        recent samples are tried first, and a small share of calls goes to a random
+        healthy provider, so every provider's statistics stay current.
+        """
+        healthy: List[str] = []
+        health = {}
+        for provider in candidates:
+            health[provider] = self.provider_health(provider, kind)
+            too_many_errors = health[provider]["samples"] >= MIN_ROUTING_SAMPLES and health[provider]["error_rate"] > self.settings.llm_routing_max_error_rate
+            if self.breaker(provider).available() and not too_many_errors:
+                healthy.append(provider)
+        # Everything unhealthy: still make the call rather than failing outright
+        healthy = healthy or list(candidates)
+
+        if len(healthy) > 1 and random.random() < self.settings.llm_routing_explore_rate:
+            chosen = random.choice(healthy)
+        else:
+            chosen = min(healthy, key=lambda p: health[p]["median_latency_s"] or 0.0)
+        LLM_ROUTED.inc(kind=kind, provider=chosen)
+        return chosen
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from many callers hitting the same outage
+        cap = min(self.settings.llm_retry_max_delay, self.settings.llm_retry_base_delay * 2 ** attempt)
+        return random.uniform(0, cap)
+
+    def _before_attempt(self, provider: str, breaker: CircuitBreaker):
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit for {provider} is open")
+
+    def _after_failure(self, provider: str, kind: str, breaker: CircuitBreaker, e: Exception, attempt: int) -> bool:
+        """Record a failed attempt; True if it should be retried."""
+        if not is_transient(e):
+            # The provider answered (bad request, unparseable output): not a health problem
+            breaker.record_success()
+            return False
+        breaker.record_failure()
+        self._observe(provider, kind, None)
+        if attempt + 1 >= self.settings.llm_retry_attempts:
+            return False
+        print(f"LLM: {provider} {kind} attempt {attempt + 1} failed ({e}), retrying")
+        LLM_RETRIES.inc(provider=provider, kind=kind)
+        return True
+
+    async def acall(self, provider: str, kind: str, attempt_fn: Callable[[], Awaitable[T]]) -> T:
+        breaker = self.breaker(provider)
+        timeout = self.settings.llm_call_timeout
+        for attempt in range(max(1, self.settings.llm_retry_attempts)):
+            self._before_attempt(provider, breaker)
+            start = time.perf_counter()
+            try:
+                try:
+                    result = await asyncio.wait_for(attempt_fn(), timeout)
+                except asyncio.TimeoutError:
+                    raise LLMTimeoutError(f"{provider} {kind} call exceeded {timeout}s") from None
+            except Exception as e:
+                if not self._after_failure(provider, kind, breaker, e, attempt):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            breaker.record_success()
+            self._observe(provider, kind, time.perf_counter() - start)
+            return result
+
+    async def astream(self, provider: str, kind: str, stream_fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        acall() for a streamed response. An attempt is retried only until its first chunk
+        has been passed on, and the deadline applies to the wait for each chunk.
+        """
+        breaker = self.breaker(provider)
+        timeout = self.settings.llm_call_timeout
+        for attempt in range(max(1, self.settings.llm_retry_attempts)):
+            self._before_attempt(provider, breaker)
+            start = time.perf_counter()
+            forwarded = False
+            stream = stream_fn()
+            try:
+                while True:
+                    try:
+                        # Not wait_for(): each chunk must be awaited in this task, where the
+                        # stream's tracing span was opened
+                        async with asyncio.timeout(timeout):
+                            chunk = await anext(stream)
+                    except StopAsyncIteration:
+                        break
+                    except TimeoutError:
+                        raise LLMTimeoutError(f"{provider} {kind} stream stalled for {timeout}s") from None
+                    forwarded = True
+                    yield chunk
+            except Exception as e:
+                # Output already on its way to the client cannot be retried, only recorded
+                if not self._after_failure(provider, kind, breaker, e, self.settings.llm_retry_attempts if forwarded else attempt):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            finally:
+                await stream.aclose()
+            breaker.record_success()
+            self._observe(provider, kind, time.perf_counter() - start)
+            return
+
+    async def hedge(self, kind: str, primary: str, secondary: str, run: Callable[[str], Awaitable[T]]) -> T:
+        """
+        Run `run(primary)`; if it has not produced a result within the hedge delay (or
+        fails sooner), also run `run(secondary)` and return whichever succeeds first.
+        """
+        delay = self.hedge_delay(primary, kind)
+        with span("llm.hedge", **{"llm.kind": kind, "llm.hedge_delay_s": round(delay, 3)}) as current:
+            tasks = {asyncio.create_task(run(primary)): primary}
+            try:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                errors = []
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+
+                print(f"LLM: Hedging {kind} call to {secondary} after {'failure' if done else f'{delay:.2f}s'}")
+                tasks[asyncio.create_task(run(secondary))] = secondary
+                pending = set(tasks) - done
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            current.set_attribute("llm.hedge_winner", tasks[task])
+                            LLM_HEDGES.inc(kind=kind, winner="secondary" if tasks[task] == secondary else "primary")
+                            return task.result()
+                        errors.append(task.exception())
+                LLM_HEDGES.inc(kind=kind, winner="none")
+                raise errors[0]
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+            kinds = list(self._latencies)
+        return {
+            "circuit_breakers": {name: breaker.stats() for name, breaker in breakers.items()},
+            "hedge_delays_s": {f"{provider}/{kind}": round(self.hedge_delay(provider, kind), 3) for provider, kind in kinds},
+            "routing": {f"{provider}/{kind}": self.provider_health(provider, kind) for provider, kind in kinds},
+        }
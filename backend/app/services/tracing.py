@@ -0,0 +1,216 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# current file: backend/app/services/tracing.py -> up 3 levels to root
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+TRACES_PATH = os.path.join(BASE_DIR, "data", "traces.jsonl")
+
+SERVICE_NAME = "exam-simulator-backend"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error", "sampled")
+
+    def __init__(self, name: str, parent: Optional["Span"], sampled: bool, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.sampled = sampled
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1, # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class JsonlSpanExporter:
+    """
+    Writes finished spans as OTLP/JSON `resourceSpans` lines (the format read by the
+    OpenTelemetry Collector's otlpjsonfile receiver). Spans are queued and written in
+    batches by a background thread, so instrumented code never waits on the file.
+    """
+
+    def __init__(self, path: str = TRACES_PATH, max_bytes: int = 50 * 1024 * 1024, batch_size: int = 256, flush_interval: float = 1.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=10000)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1 # Never block the request path on tracing
+
+    def _run(self):
+        while True:
+            batch: List[Span] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                item = ...
+            if batch:
+                self._write(batch)
+            if item is None:
+                return
+
+    def _write(self, batch: List[Span]):
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "backend.app"}, "spans": [span.to_otlp() for span in batch]}],
+        }]})
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"TRACING: Could not write spans: {e}")
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class Tracer:
+    def __init__(self, exporter: Optional[JsonlSpanExporter] = None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current_span.get()
+        if self.exporter is None:
+            yield _NOOP_SPAN
+            return
+        sampled = parent.sampled if parent is not None else random.random() < self.sample_rate
+        span = Span(name, parent, sampled, attributes)
+        if parent is None and _request_id.get() is not None:
+            span.attributes["request.id"] = _request_id.get()
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if span.sampled:
+                self.exporter.export(span)
+
+
+class _NoopSpan:
+    sampled = False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# Disabled until configure() is called at startup
+_tracer = Tracer()
+
+
+def configure(exporter: Optional[JsonlSpanExporter], sample_rate: float = 1.0):
+    global _tracer
+    _tracer = Tracer(exporter, sample_rate)
+
+
+def shutdown():
+    if _tracer.exporter is not None:
+        _tracer.exporter.shutdown()
+    configure(None)
+
+
+def span(name: str, **attributes):
+    """Context manager for a child of the current span (a new trace if there is none)."""
+    return _tracer.span(name, **attributes)
+
+
+@contextmanager
+def request_context(request_id: Optional[str]):
+    token = _request_id.set(request_id)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+
+def traced(name: str):
+    """Decorator wrapping a sync or async function in a span."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,60 @@
+"""
+Per-request LLM setup cost: a fresh AsyncLLMService per request (old behaviour)
+versus an AsyncLLMService wrapped around the shared LLMClientRegistry.
+
+Usage:
+    python benchmarks/bench_client_setup.py [iterations]
+
+No network calls are made; dummy keys are used so both providers are built.
+"""
+import asyncio
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.llm_service import AsyncLLMService
+
+
+def _measure(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28} mean={statistics.mean(samples):8.3f} ms  p50={statistics.median(samples):8.3f} ms  p95={p95:8.3f} ms")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    def per_request():
+        # Before: every route built its own service (new OpenAI client + genai.configure)
+        AsyncLLMService(LLMClientRegistry())
+
+    shared = LLMClientRegistry()
+
+    def pooled():
+        # After: routes reuse the registry created at startup
+        AsyncLLMService(shared)
+
+    print(f"Per-request LLM setup cost over {iterations} iterations")
+    _report("before (new client/request)", _measure(per_request, iterations))
+    _report("after (shared registry)", _measure(pooled, iterations))
+    asyncio.run(shared.aclose())
+
+
+if __name__ == "__main__":
+    main()
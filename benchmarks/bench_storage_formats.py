@@ -0,0 +1,104 @@
+"""
+Session snapshot size and save/load time per STORAGE_FORMAT, plus the read path used
+before serializers existed (json.load + ExamSession(**data) on an indented file).
+
+Usage:
+    python benchmarks/bench_storage_formats.py [iterations] [questions]
+
+Formats whose optional package (msgpack, zstandard) is not installed are skipped.
+Everything runs in a temporary directory.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app.models import ExamSession, Phase, Question, QuestionType
+from backend.app.logic.storage import SERIALIZERS, Storage
+
+EXPLANATION = """**✅ Analysis**
+Partitioning by event date lets the engine prune whole directories, so a daily query scans
+one partition instead of the full table. Small files still hurt: compact them after ingest.
+
+**❌ Common Mistakes / Distractor Analysis**
+- Partitioning by a high-cardinality column (user_id) creates millions of tiny files.
+- Bucketing does not prune files on its own; it only helps joins and aggregations.
+
+**📖 Key Revision Notes**
+- Partition on low-cardinality columns used in filters.
+- Target 128 MB-1 GB files.
+- Use Z-ordering / clustering for secondary filter columns.
+"""
+
+
+def _session(questions: int) -> ExamSession:
+    """A finished exam roughly as the LLM leaves it: long markdown explanations and answers."""
+    session = ExamSession(candidate_name="Benchmark Candidate", status=Phase.COMPLETED, difficulty="Intermediate", topics=["SQL", "Spark", "Kafka"], question_types=["MCQ", "CODING"])
+    for i in range(questions):
+        mcq = i % 2 == 0
+        session.questions.append(Question(
+            question_text=f"Question {i}: a nightly Spark job over 2 TB of clickstream data misses its SLA. What would you change first?",
+            difficulty="Intermediate",
+            type=QuestionType.MCQ if mcq else QuestionType.CODING,
+            options=["Repartition by user_id", "Partition by event_date", "Increase executor memory", "Disable AQE"] if mcq else None,
+            correct_answer="Partition by event_date" if mcq else "SELECT event_date, count(*) FROM events GROUP BY 1",
+            explanation=EXPLANATION,
+            concept="Partition pruning",
+            constraints=None if mcq else "Must run under 10 minutes on 20 executors",
+            user_answer="Partition by event_date" if mcq else "df.groupBy('event_date').count()",
+            is_correct=i % 3 != 0,
+            feedback=EXPLANATION,
+        ))
+    session.total_questions_count = questions
+    session.current_question_index = questions
+    session.chat_history = [{"role": "user", "content": f"Answer {i}"} for i in range(questions)]
+    return session
+
+
+def _measure(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, size: int, save: list[float] | None, load: list[float]):
+    save_p50 = f"{statistics.median(save):7.3f}" if save else "      -"
+    print(f"{label:<22} {size:>9,d} B  save p50={save_p50} ms  load p50={statistics.median(load):7.3f} ms")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    session = _session(questions)
+
+    print(f"Session snapshot formats, {questions} questions, {iterations} iterations")
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name in SERIALIZERS:
+            storage = Storage(data_dir=data_dir, format=name)
+            save = _measure(lambda: storage.save_session(session), iterations)
+            load = _measure(lambda: storage.get_session(session.id), iterations)
+            _report(name, os.path.getsize(storage._get_path(session.id)), save, load)
+            storage.close()
+
+        # Before: indented JSON, parsed into a dict and then validated field by field
+        storage = Storage(data_dir=data_dir, format="json")
+        storage.save_session(session)
+        path = storage._get_path(session.id)
+
+        def old_load():
+            with open(path, "r", encoding="utf-8") as f:
+                ExamSession(**json.load(f))
+
+        _report("old read path (json)", os.path.getsize(path), None, _measure(old_load, iterations))
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Load test: N concurrent candidates each doing start -> (answer -> next) x k.
+
+Reports p50/p95/p99 latency per endpoint, error counts, throughput and the peak
+worker-thread saturation sampled from GET /admin/runtime.
+
+Usage:
+    # against a running backend (start it with FAKE_LLM_ENABLED=true for repeatable numbers)
+    python benchmarks/load_test.py --url http://localhost:8000 --candidates 50 --questions 5
+
+    # or let the script start uvicorn with the fake LLM provider itself, on a throwaway
+    # data directory with the question bank and pre-warming off
+    python benchmarks/load_test.py --spawn --workers 1 --latency-ms 800 --error-rate 0.02
+
+Use --json PATH to save the report for comparing runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list) # endpoint -> [ms]
+        self.errors = defaultdict(int)
+        self.runtime_samples = []
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            res = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            raise
+        finally:
+            self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+        # 409 on /next just means "not generated yet" and is retried by the candidate
+        if res.status_code >= 400 and res.status_code != 409:
+            self.errors[endpoint] += 1
+        return res
+
+
+async def candidate(client: httpx.AsyncClient, rec: Recorder, index: int, args):
+    res = await rec.call(client, "POST /exams/start", "POST", "/exams/start", json={
+        "candidate_name": f"load-{index}",
+        "difficulty": "Intermediate",
+        "topics": ["SQL", "Spark"],
+        "total_questions_count": args.questions,
+        "question_types": ["MCQ", "SCENARIO"],
+    })
+    if res.status_code != 200:
+        return
+    session = res.json()
+    sid = session["id"]
+
+    for _ in range(args.questions):
+        res = await rec.call(client, "GET /exams/{id}/current", "GET", f"/exams/{sid}/current")
+        if res.status_code != 200 or res.json().get("question") is None:
+            return
+        await rec.call(client, "POST /exams/{id}/answer", "POST", f"/exams/{sid}/answer", json={"answer": "A"})
+        for _ in range(args.next_retries):
+            res = await rec.call(client, "POST /exams/{id}/next", "POST", f"/exams/{sid}/next")
+            if res.status_code != 409:
+                break
+            await asyncio.sleep(float(res.headers.get("Retry-After", 1)))
+        if res.status_code != 200 or res.json()["status"] == "COMPLETED":
+            return
+
+
+async def sample_runtime(client: httpx.AsyncClient, rec: Recorder, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            res = await client.get("/admin/runtime")
+            if res.status_code == 200:
+                rec.runtime_samples.append(res.json())
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+def percentile(samples: list, pct: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, max(0, int(round(len(samples) * pct / 100)) - 1))]
+
+
+def build_report(rec: Recorder, elapsed: float, args) -> dict:
+    endpoints = {}
+    for endpoint, samples in sorted(rec.latencies.items()):
+        endpoints[endpoint] = {
+            "count": len(samples),
+            "errors": rec.errors[endpoint],
+            "p50_ms": round(statistics.median(samples), 1),
+            "p95_ms": round(percentile(samples, 95), 1),
+            "p99_ms": round(percentile(samples, 99), 1),
+            "max_ms": round(max(samples), 1),
+        }
+    total = sum(len(s) for s in rec.latencies.values())
+    pools = [s["threadpool"] for s in rec.runtime_samples if s.get("threadpool")]
+    return {
+        "candidates": args.candidates,
+        "questions": args.questions,
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else None,
+        "endpoints": endpoints,
+        "saturation": {
+            "peak_in_flight": max((s["in_flight"] for s in rec.runtime_samples), default=None),
+            "threadpool_max_workers": pools[-1]["max_workers"] if pools else None,
+            "threadpool_peak_threads": max((p["threads"] for p in pools), default=None),
+            "threadpool_peak_queued": max((p["queued"] for p in pools), default=None),
+        },
+    }
+
+
+def print_report(report: dict):
+    print(f"\n{report['candidates']} candidates x {report['questions']} questions in {report['elapsed_s']} s "
+          f"({report['requests']} requests, {report['throughput_rps']} req/s)\n")
+    print(f"{'endpoint':<28} {'count':>6} {'errors':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for endpoint, row in report["endpoints"].items():
+        print(f"{endpoint:<28} {row['count']:>6} {row['errors']:>6} {row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms {row['max_ms']:>7.1f}ms")
+    sat = report["saturation"]
+    print(f"\npeak in flight: {sat['peak_in_flight']}  threadpool threads (peak/max): "
+          f"{sat['threadpool_peak_threads']}/{sat['threadpool_max_workers']}  queued (peak): {sat['threadpool_peak_queued']}")
+
+
+def spawn_server(args, data_dir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        # Keep simulated sessions and questions out of the real data directory and bank
+        "DATA_DIR": data_dir,
+        "QUESTION_BANK_ENABLED": "false",
+        "PREWARM_ENABLED": "false",
+        "FAKE_LLM_ENABLED": "true",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_LATENCY_SIGMA": str(args.latency_sigma),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "FAKE_LLM_RESPONSE_CHARS": str(args.response_chars),
+    })
+    port = args.url.rsplit(":", 1)[-1].strip("/")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", port, "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Backend did not come up")
+
+
+async def run(args) -> dict:
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=args.candidates + 2)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        await wait_until_up(client)
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_runtime(client, rec, stop))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(candidate(client, rec, i, args) for i in range(args.candidates)), return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed:
+        print(f"{len(failed)} candidates aborted, e.g. {failed[0]!r}")
+    return build_report(rec, elapsed, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--next-retries", type=int, default=10, help="retries of /next while questions are still generating")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--spawn", action="store_true", help="start uvicorn with the fake LLM provider")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--response-chars", type=int, default=400)
+    args = parser.parse_args()
+
+    data_dir = tempfile.TemporaryDirectory(prefix="load-test-") if args.spawn else None
+    server = spawn_server(args, data_dir.name) if args.spawn else None
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            data_dir.cleanup()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,27 @@
 import streamlit as st
 import requests
-import base64
+import json
+import time
+import uuid
 from code_editor import code_editor
 
 API_URL = "http://localhost:8000"
+HISTORY_PAGE_SIZE = 20
+ANSWER_JOB_POLL_INTERVAL = 1 # seconds
+ANSWER_JOB_TIMEOUT = 180 # seconds
+
+class TracedSession(requests.Session):
+    """Tags every backend call with a fresh X-Request-ID so it can be found in the backend traces."""
+
+    def request(self, method, url, **kwargs):
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.setdefault("X-Request-ID", uuid.uuid4().hex)
+        return super().request(method, url, headers=headers, **kwargs)
+
+@st.cache_resource
+def api() -> requests.Session:
+    # One pooled session per frontend process (keep-alive to the backend)
+    return TracedSession()
 
 st.set_page_config(page_title="Data Engineer Exam Simulator", layout="wide", page_icon="🎓")
 
@@ -39,6 +57,12 @@ if "exam_status" not in st.session_state:
     st.session_state.exam_status = "SETUP"
 if "last_result" not in st.session_state:
     st.session_state.last_result = None
+if "streaming_answer" not in st.session_state:
+    st.session_state.streaming_answer = None # Text answer whose evaluation is streamed on the next run
+if "awaiting_question" not in st.session_state:
+    st.session_state.awaiting_question = False
+if "view_cache" not in st.session_state:
+    st.session_state.view_cache = None # {"session_id", "etag", "data"} of the last /current response
 
 # --- Actions ---
 def start_exam():
@@ -54,7 +78,7 @@ def start_exam():
     
     topics_list = [t.strip() for t in topics_str.split(",")] if topics_str else ["General"]
     
-    prov_map = {"OpenAI (GPT-4o)": "openai", "Google (Gemini Pro)": "gemini"}
+    prov_map = {"OpenAI (GPT-4o)": "openai", "Google (Gemini Pro)": "gemini", "Automatic (fastest available)": "auto"}
     provider = prov_map.get(st.session_state.get("provider_select"), "openai")
 
     payload = {
@@ -63,12 +87,13 @@ def start_exam():
         "topics": topics_list,
         "total_questions_count": q_count,
         "question_types": q_types,
-        "provider": provider
+        "provider": provider,
+        "grading_mode": "deferred" if st.session_state.get("proctored") else "immediate"
     }
     
     try:
         with st.spinner("Generating Batch Questions... This may take a moment."):
-            res = requests.post(f"{API_URL}/exams/start", json=payload)
+            res = api().post(f"{API_URL}/exams/start", json=payload)
             res.raise_for_status()
             data = res.json()
             st.session_state.session_id = data["id"]
@@ -81,12 +106,29 @@ def resume_exam(sess_id):
     st.session_state.last_result = None
     # Fetch status
     try:
-        res = requests.get(f"{API_URL}/exams/{sess_id}")
+        res = api().get(f"{API_URL}/exams/{sess_id}", params={"fields": "status"})
         data = res.json()
         st.session_state.exam_status = data["status"]
     except Exception as e:
         st.error(f"Error resuming: {e}")
 
+def reset_history_pages():
+    # Cursors point into one filter's result set; a new filter starts from its first page
+    st.session_state.history_cursors = [None]
+
+def wait_for_answer_job(job_id):
+    deadline = time.time() + ANSWER_JOB_TIMEOUT
+    while time.time() < deadline:
+        res = api().get(f"{API_URL}/exams/{st.session_state.session_id}/jobs/{job_id}")
+        res.raise_for_status()
+        job = res.json()
+        if job["status"] == "COMPLETED":
+            return job["result"]
+        if job["status"] == "FAILED":
+            raise RuntimeError(job.get("error") or "Answer processing failed")
+        time.sleep(ANSWER_JOB_POLL_INTERVAL)
+    raise TimeoutError("Answer is still being processed; refresh in a moment")
+
 def submit_answer():
     # Get current index to build dynamic keys
     # We need to fetch the session status locally to know the index
@@ -133,34 +175,46 @@ def submit_answer():
                 answer = code_state
 
     final_answer = answer if answer else radio
-    audio_b64 = None
-    
-    if audio_val:
-        try:
-            bytes_data = audio_val.read()
-            audio_b64 = base64.b64encode(bytes_data).decode()
-        except Exception as e:
-            st.warning(f"Failed to process audio: {e}")
 
-    if not final_answer and not audio_b64: 
+    if not final_answer and not audio_val: 
         st.warning("Please provide an answer")
         return
-    
-    payload = {}
-    if final_answer: payload["answer"] = final_answer
-    if audio_b64: payload["audio_data"] = audio_b64
 
     try:
         with st.spinner("Evaluating Answer..."):
-            res = requests.post(f"{API_URL}/exams/{st.session_state.session_id}/answer", json=payload)
-            res.raise_for_status()
-            st.session_state.last_result = res.json()
+            if audio_val:
+                # Raw bytes as multipart instead of base64 in JSON
+                audio_val.seek(0)
+                files = {"audio": (getattr(audio_val, "name", None) or "audio.wav", audio_val, getattr(audio_val, "type", None) or "audio/wav")}
+                data = {"answer": final_answer} if final_answer else {}
+                # Transcription + evaluation run as a background job; poll instead of holding the request open
+                res = api().post(f"{API_URL}/exams/{st.session_state.session_id}/answer/audio", params={"background": "true"}, data=data, files=files)
+                res.raise_for_status()
+                st.session_state.last_result = wait_for_answer_job(res.json()["job_id"])
+            else:
+                # Evaluated while the page renders, so the feedback can appear as it is written
+                st.session_state.streaming_answer = final_answer
     except Exception as e:
         st.error(f"Error submitting answer: {e}")
 
+def stream_events(method, url, **kwargs):
+    """Yield (event, data) for each server-sent event of a backend stream."""
+    with api().request(method, url, stream=True, **kwargs) as res:
+        res.raise_for_status()
+        event = None
+        for line in res.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                yield event, json.loads(line[len("data: "):])
+
 def next_question():
     try:
-        res = requests.post(f"{API_URL}/exams/{st.session_state.session_id}/next")
+        res = api().post(f"{API_URL}/exams/{st.session_state.session_id}/next")
+        if res.status_code == 409:
+            # Remaining questions are still being generated; wait for them on the next run
+            st.session_state.awaiting_question = True
+            return
         res.raise_for_status()
         st.session_state.last_result = None
         # status update needed?
@@ -173,6 +227,83 @@ def reset_app():
     st.session_state.session_id = None
     st.session_state.exam_status = "SETUP"
     st.session_state.last_result = None
+    st.session_state.streaming_answer = None
+    st.session_state.awaiting_question = False
+    st.session_state.view_cache = None
+
+def show_question_context(q, idx):
+    st.subheader(f"Question {idx + 1} Analysis")
+    st.markdown(f"**Question:** {q['question_text']}")
+
+    if q["type"] == "MCQ" and q.get("options"):
+        st.write("Options:")
+        for opt in q["options"]:
+            st.text(f"- {opt}")
+
+    st.write("---")
+
+def show_grade(res):
+    if res.get("grading_pending"):
+        # Proctored exams are graded in one pass when the exam completes
+        st.info("📝 **Answer recorded.** It will be graded when the exam is complete.")
+    elif res["is_correct"]:
+        st.success("✅ **Correct Answer!**")
+    else:
+        st.error("❌ **Incorrect Answer**")
+
+def stream_answer(q, idx, answer):
+    """Evaluate `answer` over the streaming endpoint, rendering the feedback as it arrives."""
+    show_question_context(q, idx)
+    grade_slot = st.empty()
+    result = {}
+
+    def explanation():
+        for event, data in stream_events("POST", f"{API_URL}/exams/{st.session_state.session_id}/answer/stream", json={"answer": answer}):
+            if event == "explanation":
+                yield data["text"]
+            elif event == "grade":
+                # MCQs: the grade lands before the analysis is written
+                with grade_slot.container():
+                    show_grade(data)
+            elif event == "result":
+                result.update(data)
+            elif event == "error":
+                raise RuntimeError(data["detail"])
+
+    try:
+        with st.expander("📝 Detailed Feedback & Analysis", expanded=True):
+            st.write_stream(explanation())
+    except Exception as e:
+        st.error(f"Error submitting answer: {e}")
+        return
+    st.session_state.last_result = result
+    st.rerun()
+
+def wait_for_next_question(idx):
+    """Block on the question stream until the question after `idx` exists, then move on to it."""
+    with st.spinner("⏳ The next question is still being prepared..."):
+        try:
+            for event, data in stream_events("GET", f"{API_URL}/exams/{st.session_state.session_id}/questions/stream", params={"after": idx + 1}):
+                if event in ("question", "done", "error"):
+                    break
+        except Exception as e:
+            st.error(f"Error waiting for the next question: {e}")
+    st.session_state.awaiting_question = False
+    next_question()
+    st.rerun()
+
+def fetch_current_view(sess_id):
+    """GET /exams/{id}/current, revalidating the cached copy with its ETag."""
+    cache = st.session_state.view_cache
+    headers = {}
+    if cache and cache["session_id"] == sess_id:
+        headers["If-None-Match"] = cache["etag"]
+    res = api().get(f"{API_URL}/exams/{sess_id}/current", headers=headers)
+    if res.status_code == 304:
+        return res, cache["data"]
+    if res.status_code == 200 and res.headers.get("ETag"):
+        st.session_state.view_cache = {"session_id": sess_id, "etag": res.headers["ETag"], "data": res.json()}
+    return res, res.json() if res.status_code == 200 else None
 
 # --- Main UI ---
 
@@ -198,17 +329,29 @@ if not st.session_state.session_id:
                             ["MCQ", "CODING", "SQL", "DEBUGGING", "SHORT_ANSWER", "SCENARIO", "ARCHITECTURE", "DATA_MODELING", "OPTIMIZATION", "DATA_QUALITY", "CASE_STUDY", "PROJECT"], 
                             default=["MCQ", "CODING", "SQL"], 
                             key="q_types")
-                st.selectbox("AI Model Provider", ["OpenAI (GPT-4o)", "Google (Gemini Pro)"], key="provider_select")
+                st.selectbox("AI Model Provider", ["OpenAI (GPT-4o)", "Google (Gemini Pro)", "Automatic (fastest available)"], key="provider_select")
+                st.checkbox("Proctored mode (grade all answers at the end)", key="proctored")
                 
             st.form_submit_button("Start Assessment", on_click=start_exam, type="primary")
 
     with tab2:
         st.subheader("Previous Sessions")
         if st.button("Refresh List"): pass 
+
+        # Keyset pagination: remember the cursor of every page we've visited
+        if "history_cursors" not in st.session_state:
+            st.session_state.history_cursors = [None]
+        status_filter = st.selectbox("Status", ["All", "EXAM_LOOP", "COMPLETED"], key="history_status", on_change=reset_history_pages)
         
         try:
-            res = requests.get(f"{API_URL}/exams")
+            params = {"limit": HISTORY_PAGE_SIZE}
+            if st.session_state.history_cursors[-1]:
+                params["cursor"] = st.session_state.history_cursors[-1]
+            if status_filter != "All":
+                params["status"] = status_filter
+            res = api().get(f"{API_URL}/exams", params=params)
             sessions = res.json()
+            next_cursor = res.headers.get("X-Next-Cursor")
             if sessions:
                 for s in sessions:
                     with st.expander(f"{s['candidate_name']} - {s['created_at'][:16]} ({s['status']})"):
@@ -220,19 +363,29 @@ if not st.session_state.session_id:
                              st.info("Completed")
             else:
                 st.info("No exam history found.")
+
+            nav_prev, nav_next = st.columns(2)
+            with nav_prev:
+                if len(st.session_state.history_cursors) > 1 and st.button("⬅ Newer"):
+                    st.session_state.history_cursors.pop()
+                    st.rerun()
+            with nav_next:
+                if next_cursor and st.button("Older ➡"):
+                    st.session_state.history_cursors.append(next_cursor)
+                    st.rerun()
         except Exception as e:
             st.error(f"Failed to fetch history: {e}")
 
 else:
     # Fetch State
     try:
-        res = requests.get(f"{API_URL}/exams/{st.session_state.session_id}")
-        if res.status_code != 200:
+        # Only the current question is rendered; unchanged state comes back as a bodiless 304
+        res, session = fetch_current_view(st.session_state.session_id)
+        if session is None:
             st.error(f"Failed to load session (Error {res.status_code}): {res.text}")
             st.button("Return to Dashboard", on_click=reset_app)
             st.stop()
-            
-        session = res.json()
+
         current_status = session.get("status")
         # Sync status if changed externally
         if current_status != st.session_state.exam_status:
@@ -255,37 +408,43 @@ else:
     # Phase Logic
     
     if session["status"] == "EXAM_LOOP":
-        questions = session.get("questions", [])
+        q = session.get("question")
         idx = session.get("current_question_index", 0)
         st.session_state.current_q_index = idx # Store for callbacks
         
-        if idx < len(questions):
-            q = questions[idx]
+        if q is not None:
             
+            # --- STREAMED EVALUATION ---
+            if st.session_state.streaming_answer is not None:
+                answer = st.session_state.streaming_answer
+                st.session_state.streaming_answer = None
+                stream_answer(q, idx, answer)
+
+            # --- WAITING FOR THE NEXT QUESTION ---
+            elif st.session_state.awaiting_question:
+                wait_for_next_question(idx)
+
             # --- RESULT VIEW ---
-            if st.session_state.last_result:
+            elif st.session_state.last_result:
                 res = st.session_state.last_result
                 
                 # 1. Show Question Context First (User Request)
-                st.subheader(f"Question {idx + 1} Analysis")
-                st.markdown(f"**Question:** {q['question_text']}")
-                
-                if q["type"] == "MCQ" and q.get("options"):
-                    st.write("Options:")
-                    for opt in q["options"]:
-                        st.text(f"- {opt}")
-                
-                st.write("---")
+                show_question_context(q, idx)
 
                 # 2. Status
-                if res["is_correct"]:
-                    st.success("✅ **Correct Answer!**")
-                else:
-                    st.error("❌ **Incorrect Answer**")
-                
-                # 3. Explanation
-                with st.expander("📝 Detailed Feedback & Analysis", expanded=True):
-                    st.markdown(res["explanation"])
+                show_grade(res)
+                if not res.get("grading_pending"):
+                    # 3. Explanation
+                    # MCQs are graded instantly; the detailed analysis is filled in on the session afterwards
+                    explanation = res["explanation"]
+                    if res.get("explanation_pending"):
+                        if q.get("explanation_pending"):
+                            st.caption("⏳ Detailed analysis is still being prepared...")
+                            st.button("🔄 Refresh Feedback")
+                        else:
+                            explanation = q.get("explanation") or explanation
+                    with st.expander("📝 Detailed Feedback & Analysis", expanded=True):
+                        st.markdown(explanation)
                 
                 st.button("Next Question ➡", on_click=next_question, type="primary")
             
@@ -340,7 +499,11 @@ else:
     elif session["status"] == "COMPLETED":
         st.balloons()
         st.success("Assessment Completed Successfully!")
-        st.markdown(f"### Final Score: {session.get('current_score')} / {session.get('total_questions_count')}")
+        if session.get("grading_pending"):
+            st.info("⏳ Your answers are being graded. This usually takes under a minute.")
+            st.button("🔄 Refresh Score")
+        else:
+            st.markdown(f"### Final Score: {session.get('current_score')} / {session.get('total_questions_count')}")
         st.write("Detailed breakdown and feedback report would be generated here.")
         
         st.button("Return to Dashboard", on_click=reset_app)
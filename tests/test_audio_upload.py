@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.app.api.routes import MULTIPART_OVERHEAD_BYTES, get_answer_jobs, get_orchestrator, router
+from backend.app.config import Settings
+from backend.app.logic.orchestrator import AsyncExamOrchestrator
+from backend.app.logic.storage import AsyncStorage, Storage
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.llm_service import AsyncLLMService
+
+MAX_BYTES = 1000
+BOUNDARY = "audio-test-boundary"
+
+
+@pytest.fixture
+def client(tmp_path):
+    settings = Settings(audio_upload_max_bytes=MAX_BYTES)
+    llm = AsyncLLMService(LLMClientRegistry(settings, openai_api_key="sk-placeholder"))
+    orchestrator = AsyncExamOrchestrator(AsyncStorage(Storage(data_dir=str(tmp_path))), llm, settings)
+    app = FastAPI()
+    app.include_router(router)
+    app.state.settings = settings
+    app.dependency_overrides[get_orchestrator] = lambda: orchestrator
+    app.dependency_overrides[get_answer_jobs] = lambda: None
+    return TestClient(app)
+
+
+def multipart(audio: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"a.wav\"\r\n"
+        f"Content-Type: audio/wav\r\n\r\n"
+    ).encode() + audio + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def post(client, content, **headers):
+    return client.post(
+        "/exams/00000000-0000-0000-0000-000000000000/answer/audio", content=content,
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **headers},
+    )
+
+
+def send_raw(app, chunks, headers):
+    """Drive the app directly so we can see how much of the body it pulled."""
+    pulled = []
+    statuses = []
+
+    async def receive():
+        if len(pulled) < len(chunks):
+            pulled.append(chunks[len(pulled)])
+            return {"type": "http.request", "body": pulled[-1], "more_body": len(pulled) < len(chunks)}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/exams/00000000-0000-0000-0000-000000000000/answer/audio", "raw_path": b"", "root_path": "",
+        "query_string": b"", "server": ("test", 80), "client": ("test", 1234),
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())] + headers,
+    }
+    asyncio.run(app(scope, receive, send))
+    return statuses[0], len(pulled)
+
+
+def test_declared_length_over_the_cap_is_refused_before_reading(client):
+    chunks = [multipart(b"\0" * 10)]
+    status, pulled = send_raw(client.app, chunks, [(b"content-length", str(MAX_BYTES + MULTIPART_OVERHEAD_BYTES + 1).encode())])
+    assert status == 413
+    assert pulled == 0
+
+
+def test_chunked_body_over_the_cap_is_cut_off(client):
+    chunk = b"\0" * (64 * 1024)
+    head = multipart(b"")[:-len(f"\r\n--{BOUNDARY}--\r\n")]
+    chunks = [head] + [chunk] * (2 * MULTIPART_OVERHEAD_BYTES // len(chunk))
+    status, pulled = send_raw(client.app, chunks, [])
+    assert status == 413
+    assert pulled < len(chunks)
+
+
+def test_recording_over_the_cap_within_the_overhead_is_refused(client):
+    assert post(client, multipart(b"\0" * (MAX_BYTES + 1))).status_code == 413
+
+
+def test_small_recording_reaches_the_handler(client):
+    response = post(client, multipart(b"\0" * 10))
+    # Past the size checks: the (unknown) session is what fails
+    assert response.status_code == 400
+    assert "not found" in response.json()["detail"]
@@ -0,0 +1,70 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.app.api.routes import get_answer_jobs, get_orchestrator, get_storage, router
+from backend.app.config import Settings
+from backend.app.logic.orchestrator import AsyncExamOrchestrator
+from backend.app.logic.storage import AsyncStorage, Storage
+from backend.app.models import ExamSession, Phase, Question, QuestionType
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.llm_service import AsyncLLMService
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return AsyncStorage(Storage(data_dir=str(tmp_path)))
+
+
+@pytest.fixture
+def client(storage):
+    settings = Settings()
+    llm = AsyncLLMService(LLMClientRegistry(settings, openai_api_key="sk-placeholder"))
+    orchestrator = AsyncExamOrchestrator(storage, llm, settings)
+    app = FastAPI()
+    app.include_router(router)
+    app.state.settings = settings
+    app.dependency_overrides[get_orchestrator] = lambda: orchestrator
+    app.dependency_overrides[get_storage] = lambda: storage
+    app.dependency_overrides[get_answer_jobs] = lambda: None
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def exam_id(storage):
+    questions = [Question(question_text=f"Q{i}?", difficulty="Easy", type=QuestionType.MCQ, options=["A", "B"], correct_answer="A") for i in range(2)]
+    session = ExamSession(candidate_name="a", status=Phase.EXAM_LOOP, questions=questions, total_questions_count=2)
+    storage.storage.save_session(session)
+    return session.id
+
+
+def test_current_view_has_an_etag(client, exam_id):
+    response = client.get(f"/exams/{exam_id}/current")
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert response.json()["question"]["question_text"] == "Q0?"
+
+
+def test_matching_etag_gets_304_without_a_body(client, exam_id):
+    etag = client.get(f"/exams/{exam_id}/current").headers["ETag"]
+    response = client.get(f"/exams/{exam_id}/current", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_etag_changes_once_an_answer_bumps_the_version(client, exam_id):
+    etag = client.get(f"/exams/{exam_id}/current").headers["ETag"]
+    assert client.post(f"/exams/{exam_id}/answer", json={"answer": "A"}).status_code == 200
+
+    response = client.get(f"/exams/{exam_id}/current", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["current_score"] == 1
+
+
+def test_etags_differ_per_projection(client, exam_id):
+    current = client.get(f"/exams/{exam_id}/current").headers["ETag"]
+    full = client.get(f"/exams/{exam_id}").headers["ETag"]
+    assert current != full
+    assert client.get(f"/exams/{exam_id}", headers={"If-None-Match": current}).status_code == 200
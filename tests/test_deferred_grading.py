@@ -0,0 +1,213 @@
+import asyncio
+import pytest
+from backend.app.config import Settings
+from backend.app.logic.orchestrator import AsyncExamOrchestrator
+from backend.app.logic.storage import AsyncStorage, Storage
+from backend.app.models import ExamSession, Phase, Question, QuestionType
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.fake_llm import FakeLLMError, FakeLLMProvider
+from backend.app.services.llm_service import AsyncLLMService
+
+
+@pytest.fixture
+def settings():
+    return Settings(deferred_grading_batch_size=5)
+
+
+@pytest.fixture
+def fake():
+    return FakeLLMProvider(latency_ms=1, latency_sigma=0, seed=7)
+
+
+def make_orchestrator(tmp_path, settings, fake):
+    llm = AsyncLLMService(LLMClientRegistry(settings, openai_api_key="sk-placeholder"), fake=fake)
+    return AsyncExamOrchestrator(AsyncStorage(Storage(data_dir=str(tmp_path))), llm, settings)
+
+
+@pytest.fixture
+def orchestrator(tmp_path, settings, fake):
+    return make_orchestrator(tmp_path, settings, fake)
+
+
+def mcq(text):
+    return Question(question_text=text, difficulty="Easy", type=QuestionType.MCQ, options=["A", "B"], correct_answer="A")
+
+
+def written(text):
+    return Question(question_text=text, difficulty="Easy", type=QuestionType.SHORT_ANSWER, correct_answer="Reference answer")
+
+
+def saved_exam(tmp_path, questions, **fields):
+    session = ExamSession(candidate_name="a", status=Phase.EXAM_LOOP, questions=questions, total_questions_count=len(questions), grading_mode="deferred", **fields)
+    Storage(data_dir=str(tmp_path)).save_session(session)
+    return session
+
+
+def stored(tmp_path, session):
+    return Storage(data_dir=str(tmp_path)).get_session(session.id)
+
+
+async def finish_grading(orchestrator):
+    await asyncio.gather(*list(orchestrator._background))
+
+
+async def take_exam(orchestrator, session, answers):
+    for answer in answers:
+        await orchestrator.grade_answer(session.id, answer)
+        completed = await orchestrator.next_question_state(session.id)
+    return completed
+
+
+def test_completed_exam_is_graded_in_the_background(tmp_path, orchestrator):
+    session = saved_exam(tmp_path, [mcq("First?"), mcq("Second?"), written("Explain?"), written("Skipped?")])
+
+    async def run():
+        completed = await take_exam(orchestrator, session, ["A", "B", "Because", ""])
+        await finish_grading(orchestrator)
+        return completed
+
+    completed = asyncio.run(run())
+    assert completed.status == Phase.COMPLETED
+    assert completed.grading_pending is True
+    result = stored(tmp_path, session)
+    assert result.grading_pending is False
+    first, second, explained, skipped = result.questions
+    assert (first.is_correct, second.is_correct) == (True, False)
+    assert first.explanation_pending is False # enriched by the batch evaluation
+    assert explained.is_correct is not None
+    assert skipped.is_correct is False
+    assert result.current_score == 1 + int(explained.is_correct)
+
+
+def test_answers_are_not_graded_before_the_exam_completes(tmp_path, orchestrator):
+    session = saved_exam(tmp_path, [mcq("First?"), mcq("Second?")])
+
+    async def run():
+        await orchestrator.grade_answer(session.id, "B")
+        await orchestrator.grade_answer(session.id, "A") # answers can be changed until the end
+        await finish_grading(orchestrator)
+
+    asyncio.run(run())
+    result = stored(tmp_path, session)
+    assert result.questions[0].user_answer == "A"
+    assert result.questions[0].is_correct is None
+    assert result.current_score == 0
+    assert result.grading_pending is False
+
+
+def test_failed_batch_falls_back_to_one_request_per_answer(tmp_path, orchestrator, fake):
+    session = saved_exam(tmp_path, [mcq("First?"), written("Explain?"), written("Design?")])
+    single = []
+
+    async def failing_batch(answers, provider="openai"):
+        raise FakeLLMError("503")
+
+    evaluate_answer = orchestrator.llm.evaluate_answer
+    async def counted(**kwargs):
+        single.append(kwargs["question_text"])
+        return await evaluate_answer(**kwargs)
+
+    orchestrator.llm.evaluate_answers = failing_batch
+    orchestrator.llm.evaluate_answer = counted
+
+    async def run():
+        await take_exam(orchestrator, session, ["A", "Because", "A queue"])
+        await finish_grading(orchestrator)
+
+    asyncio.run(run())
+    assert sorted(single) == ["Design?", "Explain?", "First?"]
+    result = stored(tmp_path, session)
+    assert result.grading_pending is False
+    assert all(q.is_correct is not None for q in result.questions)
+    assert result.current_score == sum(q.is_correct for q in result.questions)
+
+
+def test_answers_missing_from_the_batch_are_graded_one_by_one(tmp_path, orchestrator):
+    session = saved_exam(tmp_path, [written("Explain?"), written("Design?")])
+    single = []
+    evaluate_answers, evaluate_answer = orchestrator.llm.evaluate_answers, orchestrator.llm.evaluate_answer
+
+    async def partial_batch(answers, provider="openai"):
+        results = await evaluate_answers(answers, provider)
+        return {"1": results["1"]} # the model skipped the second answer
+
+    async def counted(**kwargs):
+        single.append(kwargs["question_text"])
+        return await evaluate_answer(**kwargs)
+
+    orchestrator.llm.evaluate_answers = partial_batch
+    orchestrator.llm.evaluate_answer = counted
+
+    async def run():
+        await take_exam(orchestrator, session, ["Because", "A queue"])
+        await finish_grading(orchestrator)
+
+    asyncio.run(run())
+    assert single == ["Design?"]
+    assert all(q.is_correct is not None for q in stored(tmp_path, session).questions)
+
+
+def test_answers_that_cannot_be_graded_are_left_for_review(tmp_path, settings):
+    orchestrator = make_orchestrator(tmp_path, settings, FakeLLMProvider(latency_ms=1, latency_sigma=0, error_rate=1.0))
+    settings.llm_retry_attempts = 1
+    session = saved_exam(tmp_path, [mcq("First?"), written("Explain?")])
+
+    async def run():
+        await take_exam(orchestrator, session, ["A", "Because"])
+        await finish_grading(orchestrator)
+
+    asyncio.run(run())
+    result = stored(tmp_path, session)
+    assert result.grading_pending is False
+    first, explained = result.questions
+    assert first.is_correct is True # the answer key does not need the LLM
+    assert explained.is_correct is None
+    assert "manual review" in explained.feedback
+    assert result.current_score == 1
+
+
+def test_grading_is_stored_in_a_single_write(tmp_path, orchestrator):
+    session = saved_exam(tmp_path, [mcq("First?"), written("Explain?"), written("Design?")])
+    writes = []
+    mutate = orchestrator._mutate
+
+    async def recorded(session_id, change):
+        result = await mutate(session_id, change)
+        writes.append(result.grading_pending)
+        return result
+
+    async def run():
+        completed = await take_exam(orchestrator, session, ["A", "Because", "A queue"])
+        orchestrator._mutate = recorded
+        await finish_grading(orchestrator)
+        return completed
+
+    completed = asyncio.run(run())
+    assert writes == [False]
+    result = stored(tmp_path, session)
+    assert result.version == completed.version + 1
+    assert all(q.is_correct is not None for q in result.questions)
+
+
+def test_grading_resumes_on_read_after_a_restart(tmp_path, settings, fake):
+    questions = [mcq("First?"), written("Explain?")]
+    questions[0].user_answer, questions[1].user_answer = "A", "Because"
+    # Completed with grading still pending, as a crashed worker would leave it
+    session = saved_exam(tmp_path, questions, grading_pending=True)
+    session.status = Phase.COMPLETED
+    Storage(data_dir=str(tmp_path)).save_session(session)
+    orchestrator = make_orchestrator(tmp_path, settings, fake)
+
+    async def run():
+        pending = await orchestrator.get_session(session.id)
+        await orchestrator.get_session(session.id) # a second read does not start another run
+        assert len(orchestrator._grading) == 1
+        await finish_grading(orchestrator)
+        return pending
+
+    assert asyncio.run(run()).grading_pending is True
+    result = stored(tmp_path, session)
+    assert result.grading_pending is False
+    assert result.questions[0].is_correct is True
+    assert result.questions[1].is_correct is not None
+    assert result.current_score == 1 + int(result.questions[1].is_correct)
@@ -0,0 +1,42 @@
+import pytest
+from backend.app.config import Settings
+from backend.app.services.cache import PersistentCache
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.llm_service import AsyncLLMService
+
+
+@pytest.fixture
+def llm(tmp_path):
+    clients = LLMClientRegistry(Settings(), openai_api_key="sk-test")
+    return AsyncLLMService(clients, eval_cache=PersistentCache("evaluations", path=str(tmp_path / "cache.db")))
+
+
+def key(llm, answer, question_type):
+    return llm._evaluation_cache_key("Q", "ref", answer, None, None, "openai", question_type)
+
+
+def test_code_answers_differing_in_indentation_get_different_keys(llm):
+    nested = "for row in rows:\n    if row.ok:\n        emit(row)\n    flush()"
+    flat = "for row in rows:\n    if row.ok:\n        emit(row)\nflush()"
+    assert key(llm, nested, "CODING") != key(llm, flat, "CODING")
+
+
+def test_code_answers_differing_in_case_get_different_keys(llm):
+    assert key(llm, "df.filter(col('Status') == 'OK')", "CODING") != key(llm, "df.filter(col('status') == 'ok')", "CODING")
+
+
+def test_code_answers_ignore_outer_whitespace(llm):
+    assert key(llm, "\n  SELECT 1\n", "SQL") == key(llm, "SELECT 1", "SQL")
+
+
+def test_prose_answers_ignore_case_and_spacing(llm):
+    assert key(llm, "Use  a Broadcast\njoin", "SHORT_ANSWER") == key(llm, "use a broadcast join", "SHORT_ANSWER")
+
+
+def test_unknown_question_type_is_treated_as_code(llm):
+    assert key(llm, "a  b", None) != key(llm, "a b", None)
+
+
+def test_key_does_not_depend_on_the_answering_provider(llm):
+    keys = {llm._evaluation_cache_key("Q", "ref", "answer", None, None, provider, "SHORT_ANSWER") for provider in ("openai", "gemini", "auto")}
+    assert len(keys) == 1
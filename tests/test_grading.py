@@ -0,0 +1,56 @@
+import pytest
+from backend.app.logic.grading import grade_mcq, resolve_options
+
+OPTIONS = ["Partition by event_date", "Repartition by user_id", "Increase executor memory", "Disable AQE"]
+COMMA_OPTIONS = ["Spark, with Delta Lake", "Kafka", "Flink, Kafka and Iceberg", "Airflow"]
+
+
+@pytest.mark.parametrize("answer", ["A", "a", "(a)", "A)", "a.", "A:", " a "])
+def test_letter_answers(answer):
+    assert grade_mcq(OPTIONS, "Partition by event_date", answer) is True
+    assert grade_mcq(OPTIONS, "Repartition by user_id", answer) is False
+
+
+@pytest.mark.parametrize("answer", ["Partition by event_date", "partition  BY event_date.", "A) Partition by event_date", "a. partition by event_date"])
+def test_option_text_answers(answer):
+    assert grade_mcq(OPTIONS, "A", answer) is True
+    assert grade_mcq(OPTIONS, "B", answer) is False
+
+
+def test_answer_key_given_as_labelled_option():
+    assert grade_mcq(["A) Yes", "B) No"], "B) No", "b") is True
+    assert grade_mcq(["A) Yes", "B) No"], "B) No", "No") is True
+
+
+@pytest.mark.parametrize("answer", [
+    "Partition by event_date, Disable AQE",
+    "Disable AQE, Partition by event_date",
+    "D, A",
+    "a,d",
+    "Disable AQE, A",
+])
+def test_multi_answers_in_any_order(answer):
+    assert grade_mcq(OPTIONS, "A, D", answer) is True
+
+
+def test_multi_answers_must_match_exactly():
+    assert grade_mcq(OPTIONS, "A, D", "A") is False
+    assert grade_mcq(OPTIONS, "A, D", "A, B, D") is False
+
+
+def test_option_text_containing_commas():
+    assert resolve_options("Spark, with Delta Lake", COMMA_OPTIONS) == {0}
+    assert resolve_options("Flink, Kafka and Iceberg, Spark, with Delta Lake", COMMA_OPTIONS) == {0, 2}
+    assert grade_mcq(COMMA_OPTIONS, "Flink, Kafka and Iceberg", "C") is True
+    assert grade_mcq(COMMA_OPTIONS, "Flink, Kafka and Iceberg", "Kafka") is False
+    assert grade_mcq(COMMA_OPTIONS, "A, B", "Kafka, Spark, with Delta Lake") is True
+
+
+@pytest.mark.parametrize("answer", ["", None, "E", "Use Z-ordering", "A, something else", ","])
+def test_unmappable_answers_fall_back_to_the_llm(answer):
+    assert grade_mcq(OPTIONS, "A", answer) is None
+
+
+@pytest.mark.parametrize("options, correct_answer", [(None, "A"), ([], "A"), (OPTIONS, None), (OPTIONS, "Not an option")])
+def test_unmappable_answer_key_falls_back_to_the_llm(options, correct_answer):
+    assert grade_mcq(options, correct_answer, "A") is None
@@ -0,0 +1,102 @@
+import json
+import pytest
+from backend.app.services.json_stream import JsonStreamParser
+
+QUESTIONS = json.dumps({
+    "questions": [
+        {
+            "question": "What does `SELECT a, b FROM t WHERE c = \"x\"` return?",
+            "options": ["Rows where c = \"x\"", "All rows, [unfiltered]", "An error: {missing}", "C:\\temp\\out"],
+            "correct_answer": "Rows where c = \"x\"",
+            "concept": "Filtering",
+            "difficulty": "Easy",
+            "type": "MCQ",
+            "explanation": "Line one\nLine two\ttabbed — café 😀",
+        },
+        {
+            "question": "Nested",
+            "options": [["a", ["b"]], {"k": [1, 2, {"z": "]"}]}],
+            "concept": "Nesting",
+            "difficulty": "Hard",
+            "type": "CODING",
+            "constraints": None,
+        },
+    ],
+    "count": 2,
+})
+
+SCALARS = '{"questions": [1, -2.5e3, "a,b]", true, null, [], {}], "questions_after": [9]}'
+
+EMPTY = '{"questions": []}'
+
+ESCAPED = r'{"questions": [{"q": "\u00e9\ud83d\ude00\\\"\/\b\f\n\r\t"}], "other": "\ud83d\ude00"}'
+
+EXPLANATION = json.dumps({
+    "is_correct": False,
+    "details": {"explanation": "nested, must not stream"},
+    "explanation": "**✅ Analysis**\nUse `\"quoted\"` paths like C:\\data and emoji 😀🎉 — then\tdone.",
+    "confidence": 0.5,
+}, ensure_ascii=False)
+
+EXPLANATION_ASCII = json.dumps(json.loads(EXPLANATION)) # emoji as \ud83d\ude00 surrogate pairs
+
+
+def fenced(doc):
+    return f"```json\n{doc}\n```\nHope this helps!"
+
+
+def chunkings(doc):
+    """Every two-way split, then fixed-size chunks from 1 character up."""
+    for cut in range(len(doc) + 1):
+        yield [doc[:cut], doc[cut:]]
+    for size in (1, 2, 3, 5, 7):
+        yield [doc[i:i + size] for i in range(0, len(doc), size)]
+
+
+def run(chunks, **fields):
+    parser = JsonStreamParser(**fields)
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return parser, events
+
+
+@pytest.mark.parametrize("doc", [QUESTIONS, SCALARS, EMPTY, ESCAPED, fenced(QUESTIONS)])
+def test_items_at_every_chunk_boundary(doc):
+    expected = json.loads(doc[doc.index("{"):doc.rindex("}") + 1])
+    for chunks in chunkings(doc):
+        parser, events = run(chunks, items_field="questions")
+        assert events == [("item", item) for item in expected["questions"]], chunks
+        assert parser.result() == expected
+
+
+@pytest.mark.parametrize("doc", [EXPLANATION, EXPLANATION_ASCII, fenced(EXPLANATION_ASCII), ESCAPED])
+def test_text_at_every_chunk_boundary(doc):
+    expected = json.loads(doc[doc.index("{"):doc.rindex("}") + 1])
+    field = "explanation" if "explanation" in expected else "other"
+    for chunks in chunkings(doc):
+        parser, events = run(chunks, text_field=field)
+        assert all(kind == "text" and value for kind, value in events), chunks
+        assert "".join(value for _, value in events) == expected[field], chunks
+        assert parser.result() == expected
+
+
+def test_items_are_emitted_as_soon_as_they_close():
+    parser = JsonStreamParser(items_field="questions")
+    assert parser.feed('{"questions": [{"q": 1}') == [("item", {"q": 1})]
+    assert parser.feed(', {"q": 2') == []
+    assert parser.feed('}]}') == [("item", {"q": 2})]
+
+
+def test_text_is_emitted_while_the_string_is_open():
+    parser = JsonStreamParser(text_field="explanation")
+    assert parser.feed('{"explanation": "Hel') == [("text", "Hel")]
+    assert parser.feed('lo\\') == [("text", "lo")]
+    assert parser.feed('n') == [("text", "\n")]
+
+
+def test_incomplete_document_has_no_result():
+    parser = JsonStreamParser(items_field="questions")
+    parser.feed('{"questions": [{"q": 1}')
+    with pytest.raises(ValueError):
+        parser.result()
@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from backend.app.config import Settings
+from backend.app.logic.orchestrator import AsyncExamOrchestrator
+from backend.app.logic.storage import AsyncStorage, Storage, VersionConflictError, diff_session
+from backend.app.models import ExamSession, Phase, Question, QuestionType
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.llm_service import AsyncLLMService
+
+
+@pytest.fixture
+def settings():
+    return Settings()
+
+
+@pytest.fixture
+def orchestrator(tmp_path, settings):
+    llm = AsyncLLMService(LLMClientRegistry(settings, openai_api_key="sk-placeholder"))
+    return AsyncExamOrchestrator(AsyncStorage(Storage(data_dir=str(tmp_path))), llm, settings)
+
+
+def mcq(text):
+    return Question(question_text=text, difficulty="Easy", type=QuestionType.MCQ, options=["A", "B"], correct_answer="A")
+
+
+def saved_exam(tmp_path):
+    session = ExamSession(candidate_name="a", status=Phase.EXAM_LOOP, questions=[mcq("First?"), mcq("Second?")], total_questions_count=2, version=4)
+    Storage(data_dir=str(tmp_path)).save_session(session)
+    return session
+
+
+def test_stale_write_is_rejected(tmp_path):
+    session = saved_exam(tmp_path)
+    storage = Storage(data_dir=str(tmp_path))
+    first, second = storage.get_session(session.id), storage.get_session(session.id)
+    first.version += 1
+    storage.save_session(first, expected_version=4)
+    second.version += 1
+    with pytest.raises(VersionConflictError):
+        storage.save_session(second, expected_version=4)
+
+
+def test_conflicting_writer_reapplies_only_its_change(tmp_path, orchestrator):
+    session = saved_exam(tmp_path)
+    other_worker = Storage(data_dir=str(tmp_path))
+    calls = []
+
+    def other_worker_commits():
+        # Another worker loads the same version and commits first
+        theirs = other_worker.get_session(session.id)
+        before = theirs.model_dump(mode="json")
+        theirs.candidate_name = "renamed"
+        theirs.version += 1
+        other_worker.record(theirs, diff_session(before, theirs.model_dump(mode="json")), expected_version=4)
+
+    def change(s: ExamSession):
+        calls.append(s.version)
+        if len(calls) == 1:
+            other_worker_commits()
+        s.current_score += 1
+
+    result = asyncio.run(orchestrator._mutate(session.id, change))
+
+    assert calls == [4, 5] # re-run once, against the other worker's state
+    stored = Storage(data_dir=str(tmp_path)).get_session(session.id)
+    assert stored.candidate_name == "renamed"
+    assert stored.current_score == 1
+    assert stored.version == 6
+    assert result.version == 6
+
+
+def test_conflicts_give_up_after_the_configured_retries(tmp_path, orchestrator, settings):
+    session = saved_exam(tmp_path)
+    other_worker = Storage(data_dir=str(tmp_path))
+    settings.storage_conflict_retries = 2
+    calls = []
+
+    def change(s: ExamSession):
+        calls.append(s.version)
+        theirs = other_worker.get_session(session.id)
+        theirs.version += 1
+        other_worker.save_session(theirs, expected_version=theirs.version - 1)
+
+    with pytest.raises(VersionConflictError):
+        asyncio.run(orchestrator._mutate(session.id, change))
+    assert len(calls) == 3
+
+
+def test_resubmitting_a_graded_question_keeps_the_score(tmp_path, orchestrator):
+    session = saved_exam(tmp_path)
+    first_question = session.questions[0].id
+
+    async def run():
+        graded = await orchestrator.grade_answer(session.id, "A")
+        again = await orchestrator.grade_answer(session.id, "A", question_id=first_question)
+        changed = await orchestrator.grade_answer(session.id, "B", question_id=first_question)
+        await orchestrator.aclose()
+        return graded, again, changed
+
+    graded, again, changed = asyncio.run(run())
+    assert graded.is_correct is True
+    assert again.user_answer == changed.user_answer == "A"
+    stored = Storage(data_dir=str(tmp_path)).get_session(session.id)
+    assert stored.current_score == 1
+    assert stored.questions[0].user_answer == "A"
+
+
+def test_answer_graded_meanwhile_by_another_worker_is_a_no_op(tmp_path, orchestrator):
+    session = saved_exam(tmp_path)
+    question_id = session.questions[0].id
+
+    async def run():
+        first = await orchestrator._record_grade(session.id, question_id, "A", True, None)
+        second = await orchestrator._record_grade(session.id, question_id, "A", True, None)
+        return first, second
+
+    (_, first_graded), (_, second_graded) = asyncio.run(run())
+    assert first_graded is True
+    assert second_graded is False
+    stored = Storage(data_dir=str(tmp_path)).get_session(session.id)
+    assert stored.current_score == 1
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from backend.app.config import Settings
+from backend.app.logic.prewarm import QuestionPoolPrewarmer
+from backend.app.logic.question_bank import AsyncQuestionBank, QuestionBank
+from backend.app.models import QuestionGenerated
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.llm_service import AsyncLLMService
+
+
+@pytest.fixture
+def settings():
+    return Settings(prewarm_top_configs=2, prewarm_target=3)
+
+
+@pytest.fixture
+def bank(tmp_path, settings):
+    return AsyncQuestionBank(QuestionBank(settings, str(tmp_path / "question_bank.db")))
+
+
+@pytest.fixture
+def prewarmer(settings, bank):
+    llm = AsyncLLMService(LLMClientRegistry(settings, openai_api_key="sk-placeholder"))
+    return QuestionPoolPrewarmer(bank, llm, settings)
+
+
+def question(text):
+    return QuestionGenerated(question=text, options=["A", "B"], correct_answer="A", concept="Joins", difficulty="Easy", type="MCQ")
+
+
+def test_most_requested_configs_are_targeted(prewarmer):
+    for _ in range(3):
+        prewarmer.record_request("Easy", ["SQL"], ["MCQ"])
+    prewarmer.record_request("Hard", ["Spark"], ["CODING"], "gemini")
+    prewarmer.record_request("Easy", ["Kafka", "SQL"], ["MCQ", "SQL"])
+    prewarmer.record_request("Easy", ["Kafka", "SQL"], ["MCQ", "SQL"])
+
+    assert prewarmer.popular_configs() == [("Easy", ("SQL",), ("MCQ",)), ("Easy", ("Kafka", "SQL"), ("MCQ", "SQL"))]
+    assert set(prewarmer.pool_targets()) == {
+        ("Easy", "SQL", "MCQ"), ("Easy", "Kafka", "MCQ"), ("Easy", "Kafka", "SQL"), ("Easy", "SQL", "SQL"),
+    }
+
+
+def test_defaults_fill_in_missing_topics_and_types(prewarmer):
+    prewarmer.record_request("Easy", [], [])
+    assert prewarmer.pool_targets() == {("Easy", "General", "MCQ"): "openai"}
+
+
+def test_popularity_decays_until_forgotten(prewarmer):
+    prewarmer.record_request("Easy", ["SQL"], ["MCQ"])
+    passes = 0
+    while prewarmer.popularity:
+        asyncio.run(prewarmer.refill_once())
+        passes += 1
+    # 0.9 ** 29 is the first power below 0.05
+    assert passes == 29
+    assert prewarmer.providers == {}
+
+
+def test_busy_api_skips_the_pass(prewarmer):
+    prewarmer.is_idle = lambda: False
+    prewarmer.record_request("Easy", ["SQL"], ["MCQ"])
+    asyncio.run(prewarmer.refill_once())
+    assert prewarmer.popularity[("Easy", ("SQL",), ("MCQ",))] == 1.0
+
+
+def test_pool_depth_counts_only_unserved_questions(bank):
+    async def run():
+        await bank.add("Easy", "SQL", "MCQ", [question("Q1"), question("Q2")])
+        await bank.add("Easy", "SQL", "MCQ", [question("Q3")], used=True)
+        before = await bank.depth("Easy", "SQL", "MCQ")
+        await bank.take("Easy", "SQL", "MCQ", 1)
+        return before, await bank.depth("Easy", "SQL", "MCQ")
+
+    assert asyncio.run(run()) == (2, 1)
+    assert bank.bank.stats_for("Easy", "SQL", "MCQ") == {"hits": 1, "misses": 0}
+
+
+def test_report_lists_pools(prewarmer, bank):
+    asyncio.run(bank.add("Easy", "SQL", "MCQ", [question("Q1")]))
+    prewarmer.record_request("Easy", ["SQL"], ["MCQ"])
+    report = asyncio.run(prewarmer.report())
+
+    assert report["bank_size"] == 1
+    assert report["pools"] == [{
+        "difficulty": "Easy", "topic": "SQL", "type": "MCQ", "depth": 1, "target": 3,
+        "hits": 0, "misses": 0, "hit_rate": None,
+    }]
@@ -0,0 +1,224 @@
+import asyncio
+import time
+import pytest
+from backend.app.config import Settings
+from backend.app.services.fake_llm import FakeLLMError
+from backend.app.services.resilience import CircuitBreaker, CircuitOpenError, LLMResilience, LLMTimeoutError
+
+
+@pytest.fixture
+def resilience():
+    settings = Settings(
+        llm_retry_attempts=3, llm_retry_base_delay=0.0, llm_call_timeout=0.05,
+        llm_breaker_threshold=10, llm_hedge_delay=0.02,
+    )
+    return LLMResilience(settings)
+
+
+class Attempts:
+    """An attempt function that plays back `outcomes`: exceptions are raised, values returned."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+# --- circuit breaker ---
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("openai", failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert not breaker.available()
+
+
+def test_half_open_trial_closes_on_success():
+    breaker = CircuitBreaker("openai", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.available()
+    assert breaker.allow() # the single trial call
+    assert breaker.state == "half_open"
+    assert not breaker.allow() # everyone else still fails fast
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_half_open_trial_reopens_on_failure():
+    breaker = CircuitBreaker("openai", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_open_circuit_fails_fast(resilience):
+    breaker = resilience.breaker("openai")
+    breaker.failure_threshold = 1
+    breaker.record_failure()
+    attempt = Attempts("ok")
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.acall("openai", "evaluation", attempt))
+    assert attempt.calls == 0
+
+
+# --- acall ---
+
+def test_transient_errors_are_retried(resilience):
+    attempt = Attempts(FakeLLMError("503"), FakeLLMError("503"), "ok")
+    assert asyncio.run(resilience.acall("openai", "evaluation", attempt)) == "ok"
+    assert attempt.calls == 3
+    assert resilience.breaker("openai").failures == 0
+
+
+def test_retries_stop_after_the_configured_attempts(resilience):
+    attempt = Attempts(FakeLLMError("503"))
+    with pytest.raises(FakeLLMError):
+        asyncio.run(resilience.acall("openai", "evaluation", attempt))
+    assert attempt.calls == 3
+    assert resilience.breaker("openai").failures == 3
+
+
+def test_non_transient_errors_are_not_retried(resilience):
+    attempt = Attempts(ValueError("unparseable output"), "ok")
+    with pytest.raises(ValueError):
+        asyncio.run(resilience.acall("openai", "evaluation", attempt))
+    assert attempt.calls == 1
+    assert resilience.breaker("openai").failures == 0
+
+
+def test_deadline_cancels_a_slow_attempt(resilience):
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    resilience.settings.llm_retry_attempts = 1
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(resilience.acall("openai", "evaluation", slow))
+    assert cancelled == [True]
+
+
+# --- astream ---
+
+def test_stream_is_retried_before_the_first_chunk(resilience):
+    calls = []
+
+    async def stream():
+        calls.append(True)
+        if len(calls) == 1:
+            raise FakeLLMError("connection reset")
+        yield "a"
+        yield "b"
+
+    async def collect():
+        return [chunk async for chunk in resilience.astream("openai", "generation", stream)]
+
+    assert asyncio.run(collect()) == ["a", "b"]
+    assert len(calls) == 2
+
+
+def test_stream_is_not_retried_after_the_first_chunk(resilience):
+    calls = []
+    received = []
+
+    async def stream():
+        calls.append(True)
+        yield "a"
+        raise FakeLLMError("connection reset")
+
+    async def collect():
+        async for chunk in resilience.astream("openai", "generation", stream):
+            received.append(chunk)
+
+    with pytest.raises(FakeLLMError):
+        asyncio.run(collect())
+    assert received == ["a"]
+    assert len(calls) == 1
+    assert resilience.breaker("openai").failures == 1
+
+
+def test_stalled_stream_times_out(resilience):
+    async def stream():
+        yield "a"
+        await asyncio.sleep(10)
+        yield "b"
+
+    async def collect():
+        return [chunk async for chunk in resilience.astream("openai", "generation", stream)]
+
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(collect())
+
+
+# --- hedge ---
+
+def test_hedge_returns_the_first_result_and_cancels_the_loser(resilience):
+    cancelled = []
+
+    async def run(provider):
+        if provider == "openai":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(provider)
+                raise
+        return provider
+
+    async def hedged():
+        result = await resilience.hedge("evaluation", "openai", "gemini", run)
+        await asyncio.sleep(0) # let the cancellation land
+        return result
+
+    assert asyncio.run(hedged()) == "gemini"
+    assert cancelled == ["openai"]
+
+
+def test_hedge_skips_the_secondary_when_the_primary_is_fast(resilience):
+    started = []
+
+    async def run(provider):
+        started.append(provider)
+        return provider
+
+    assert asyncio.run(resilience.hedge("evaluation", "openai", "gemini", run)) == "openai"
+    assert started == ["openai"]
+
+
+def test_hedge_falls_back_when_the_primary_fails(resilience):
+    async def run(provider):
+        if provider == "openai":
+            raise FakeLLMError("503")
+        await asyncio.sleep(0.01)
+        return provider
+
+    assert asyncio.run(resilience.hedge("evaluation", "openai", "gemini", run)) == "gemini"
+
+
+def test_hedge_raises_when_both_fail(resilience):
+    async def run(provider):
+        raise FakeLLMError(provider)
+
+    with pytest.raises(FakeLLMError):
+        asyncio.run(resilience.hedge("evaluation", "openai", "gemini", run))
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from backend.app.config import Settings
+from backend.app.logic.orchestrator import AsyncExamOrchestrator
+from backend.app.logic.session_cache import EVICTION, CachedStorage
+from backend.app.logic.storage import AsyncStorage, Storage, diff_session
+from backend.app.models import ExamSession, Phase, Question, QuestionType
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.llm_service import AsyncLLMService
+
+
+def worker(data_dir, **kwargs):
+    """One API worker's storage stack: its own cache over the shared data directory."""
+    return CachedStorage(Storage(data_dir=str(data_dir)), **kwargs)
+
+
+def mcq(text):
+    return Question(question_text=text, difficulty="Easy", type=QuestionType.MCQ, options=["A", "B"], correct_answer="A")
+
+
+def exam():
+    return ExamSession(candidate_name="a", status=Phase.EXAM_LOOP, questions=[mcq("First?"), mcq("Second?")], total_questions_count=2)
+
+
+def test_stale_entry_is_reloaded_after_another_worker_commits(tmp_path):
+    first, second = worker(tmp_path), worker(tmp_path)
+    session = exam()
+    first.save_session(session)
+    assert first.get_session(session.id).current_question_index == 0
+
+    changed = second.get_session(session.id)
+    before = changed.model_dump(mode="json")
+    changed.current_question_index = 1
+    changed.version += 1
+    second.record(changed, diff_session(before, changed.model_dump(mode="json")), expected_version=changed.version - 1)
+
+    assert first.get_cached(session.id) is None # sync hits are never served without a disk check
+    loaded = first.get_session(session.id)
+    assert loaded.current_question_index == 1
+    assert loaded.version == changed.version
+
+
+def test_grade_answer_on_a_worker_with_a_stale_cache(tmp_path):
+    async def run():
+        settings = Settings()
+        llm = AsyncLLMService(LLMClientRegistry(settings, openai_api_key="sk-placeholder"))
+        first = AsyncExamOrchestrator(AsyncStorage(worker(tmp_path)), llm, settings)
+        second = AsyncExamOrchestrator(AsyncStorage(worker(tmp_path)), llm, settings)
+        session = exam()
+        await first.storage.save_session(session)
+        await first.get_session(session.id) # cached at question 0
+
+        await second.grade_answer(session.id, "A")
+        await second.next_question_state(session.id)
+        # The first worker must grade the second question, not drop the answer on the first
+        question = await first.grade_answer(session.id, "B")
+        await asyncio.gather(first.aclose(), second.aclose())
+        return session.id, question
+
+    session_id, question = asyncio.run(run())
+    assert question.question_text == "Second?"
+    stored = Storage(data_dir=str(tmp_path)).get_session(session_id)
+    assert [q.user_answer for q in stored.questions] == ["A", "B"]
+    assert stored.current_score == 1
+
+
+def test_write_behind_flushes_keep_changes_in_order(tmp_path):
+    cache = worker(tmp_path, durability=EVICTION)
+    session = exam()
+    cache.save_session(session)
+    for index in range(1, 4):
+        before = session.model_dump(mode="json")
+        session.current_score = float(index)
+        session.version += 1
+        cache.record(session, diff_session(before, session.model_dump(mode="json")))
+        if index == 2:
+            cache.flush()
+    cache.close()
+
+    stored = Storage(data_dir=str(tmp_path)).get_session(session.id)
+    assert stored.current_score == 3.0
+    assert stored.version == 3
+    assert cache._write_locks == {}
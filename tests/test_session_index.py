@@ -0,0 +1,73 @@
+import pytest
+from backend.app.logic.session_index import SessionIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SessionIndex(str(tmp_path / "index.db"))
+
+
+def summary(number, created_at, status="EXAM_LOOP", candidate_name="Ada"):
+    return {
+        "id": f"00000000-0000-0000-0000-{number:012d}", "candidate_name": candidate_name, "status": status,
+        "created_at": created_at, "score": 0.0, "total": 5,
+    }
+
+
+def all_pages(index, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = index.query(limit, cursor, **filters)
+        pages.append([row["id"] for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_pages_split_sessions_created_at_the_same_time(index):
+    # Seven sessions share a timestamp, so the cursor has to break ties on the id
+    same = "2026-01-02T10:00:00"
+    rows = [summary(n, same) for n in range(1, 8)] + [summary(8, "2026-01-03T10:00:00"), summary(9, "2026-01-01T10:00:00")]
+    index.upsert_many(rows)
+
+    pages = all_pages(index, 3)
+    ids = [session_id for page in pages for session_id in page]
+    expected = [summary(8, "")["id"]] + [summary(n, "")["id"] for n in range(7, 0, -1)] + [summary(9, "")["id"]]
+    assert ids == expected
+    assert [len(page) for page in pages] == [3, 3, 3]
+
+
+def test_last_page_has_no_cursor(index):
+    index.upsert_many([summary(n, f"2026-01-0{n}T10:00:00") for n in range(1, 4)])
+    rows, cursor = index.query(limit=3)
+    assert len(rows) == 3
+    assert cursor is None
+
+
+def test_status_filter_paginates_within_its_own_results(index):
+    same = "2026-01-02T10:00:00"
+    index.upsert_many([summary(n, same, "COMPLETED" if n % 2 else "EXAM_LOOP") for n in range(1, 10)])
+
+    pages = all_pages(index, 2, status="COMPLETED")
+    ids = [session_id for page in pages for session_id in page]
+    assert ids == [summary(n, "")["id"] for n in (9, 7, 5, 3, 1)]
+
+
+def test_candidate_filter_ignores_case(index):
+    index.upsert_many([summary(1, "2026-01-01T10:00:00", candidate_name="Ada Lovelace"), summary(2, "2026-01-02T10:00:00", candidate_name="Grace")])
+    rows, _ = index.query(candidate_name="ada lovelace")
+    assert [row["candidate_name"] for row in rows] == ["Ada Lovelace"]
+
+
+def test_filters_combine(index):
+    index.upsert_many([
+        summary(1, "2026-01-01T10:00:00", "COMPLETED", "Ada"),
+        summary(2, "2026-01-02T10:00:00", "EXAM_LOOP", "Ada"),
+        summary(3, "2026-01-03T10:00:00", "COMPLETED", "Grace"),
+    ])
+    rows, _ = index.query(status="COMPLETED", candidate_name="Ada")
+    assert [row["id"] for row in rows] == [summary(1, "")["id"]]
+
+
+def test_invalid_cursor_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.query(limit=2, cursor="not a cursor")
@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from backend.app.config import Settings
+from backend.app.logic.orchestrator import AsyncExamOrchestrator, GenerationShard
+from backend.app.logic.prewarm import QuestionPoolPrewarmer
+from backend.app.logic.question_bank import AsyncQuestionBank, QuestionBank
+from backend.app.logic.storage import AsyncStorage, Storage
+from backend.app.services.clients import LLMClientRegistry
+from backend.app.services.fake_llm import FakeLLMProvider
+from backend.app.services.llm_service import AsyncLLMService
+
+
+@pytest.fixture
+def settings():
+    return Settings(prewarm_target=2)
+
+
+@pytest.fixture
+def bank(tmp_path, settings):
+    return AsyncQuestionBank(QuestionBank(settings, str(tmp_path / "question_bank.db")))
+
+
+@pytest.fixture(params=["mock", "fake"])
+def llm(request, settings):
+    clients = LLMClientRegistry(settings, openai_api_key="sk-placeholder")
+    fake = FakeLLMProvider(latency_ms=1, latency_sigma=0) if request.param == "fake" else None
+    return AsyncLLMService(clients, fake=fake)
+
+
+def test_generated_questions_are_served_but_not_banked(tmp_path, settings, bank, llm):
+    async def run():
+        orchestrator = AsyncExamOrchestrator(AsyncStorage(Storage(data_dir=str(tmp_path / "sessions"))), llm, settings, bank)
+        generated = asyncio.Queue()
+        await orchestrator._generate_shard(0, GenerationShard("SQL", "MCQ", 2), "Easy", "openai", generated)
+        served = []
+        while not generated.empty():
+            _, questions = generated.get_nowait()
+            served.extend(questions or [])
+        return served, await bank.size()
+
+    served, banked = asyncio.run(run())
+    assert served
+    assert banked == 0
+
+
+def test_prewarming_skips_simulated_providers(settings, bank, llm):
+    prewarmer = QuestionPoolPrewarmer(bank, llm, settings)
+    prewarmer.record_request("Easy", ["SQL"], ["MCQ"], "openai")
+    asyncio.run(prewarmer.refill_once())
+    assert prewarmer.generated == 0
+    assert asyncio.run(bank.size()) == 0
@@ -0,0 +1,81 @@
+import os
+import time
+from datetime import datetime, timedelta
+import pytest
+from backend.app.config import Settings
+from backend.app.logic.storage import Storage
+from backend.app.models import ExamSession, Phase
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(data_dir=str(tmp_path))
+    yield storage
+    storage.close()
+
+
+def saved(storage, status, age_days=0, version=3):
+    """A session saved `age_days` ago and not touched since."""
+    created = datetime.utcnow() - timedelta(days=age_days)
+    session = ExamSession(candidate_name="a", status=status, created_at=created, version=version)
+    storage.save_session(session)
+    past = time.time() - age_days * DAY
+    for path in storage._session_paths(session.id):
+        if os.path.exists(path):
+            os.utime(path, (past, past))
+    return session
+
+
+def test_completed_session_is_archived_and_still_readable(storage):
+    session = saved(storage, Phase.COMPLETED, age_days=1)
+    stats = storage.compact_archive(min_age=3600)
+
+    assert stats["archived"] == 1
+    assert not os.path.exists(storage._get_path(session.id))
+    loaded = storage.get_session(session.id)
+    assert loaded.id == session.id
+    assert loaded.version == 3
+    assert storage.get_version(session.id) == 3
+
+
+def test_recent_completed_session_stays_live(storage):
+    session = saved(storage, Phase.COMPLETED)
+    assert storage.compact_archive(min_age=3600)["archived"] == 0
+    assert os.path.exists(storage._get_path(session.id))
+
+
+def test_writing_an_archived_session_makes_it_live_again(storage):
+    session = saved(storage, Phase.COMPLETED, age_days=1)
+    storage.compact_archive(min_age=3600)
+
+    loaded = storage.get_session(session.id)
+    loaded.candidate_name = "b"
+    loaded.version += 1
+    storage.save_session(loaded, expected_version=3)
+
+    assert os.path.exists(storage._get_path(session.id))
+    assert storage.index.locate(str(session.id)) is None
+    assert storage.get_session(session.id).candidate_name == "b"
+
+
+def test_unfinished_sessions_are_kept_by_default(storage):
+    session = saved(storage, Phase.EXAM_LOOP, age_days=90)
+    assert Settings().session_ttl == 0
+    stats = storage.compact_archive(min_age=3600, ttl=Settings().session_ttl)
+
+    assert stats["expired"] == 0
+    assert storage.get_session(session.id) is not None
+
+
+def test_unfinished_sessions_expire_with_a_ttl(storage):
+    stale = saved(storage, Phase.EXAM_LOOP, age_days=90)
+    fresh = saved(storage, Phase.EXAM_LOOP, age_days=1)
+    expired = []
+    stats = storage.compact_archive(min_age=3600, ttl=30 * DAY, on_expired=expired.append)
+
+    assert stats["expired"] == 1
+    assert expired == [stale.id]
+    assert storage.get_session(stale.id) is None
+    assert storage.get_session(fresh.id) is not None
@@ -0,0 +1,90 @@
+import os
+import shutil
+import pytest
+from backend.app.logic.storage import EVENTLOG, Storage, diff_session
+from backend.app.models import ExamSession, Question, QuestionType
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(mode=EVENTLOG, compact_every=5, data_dir=str(tmp_path))
+    yield storage
+    storage.close()
+
+
+def commit(storage, session, change):
+    """Apply `change` and persist it the way the orchestrator does."""
+    before = session.model_dump(mode="json")
+    change(session)
+    session.version += 1
+    storage.record(session, diff_session(before, session.model_dump(mode="json")), expected_version=session.version - 1)
+
+
+def set_field(name, value):
+    return lambda session: setattr(session, name, value)
+
+
+def add_question(session):
+    session.questions.append(Question(question_text="What is a partition?", difficulty="Easy", type=QuestionType.SHORT_ANSWER))
+
+
+def test_events_after_a_torn_line_are_kept(storage):
+    session = ExamSession(candidate_name="a")
+    storage.save_session(session)
+    commit(storage, session, set_field("current_score", 1.0))
+    # A crash mid-append leaves half a line behind
+    with open(storage._get_log_path(session.id), "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "fie')
+    commit(storage, session, set_field("current_score", 2.0))
+    commit(storage, session, set_field("candidate_name", "zz"))
+
+    loaded = storage.get_session(session.id)
+    assert loaded.current_score == 2.0
+    assert loaded.candidate_name == "zz"
+
+
+def test_torn_final_line_is_skipped_on_read(storage):
+    session = ExamSession(candidate_name="a")
+    storage.save_session(session)
+    commit(storage, session, set_field("current_score", 1.0))
+    with open(storage._get_log_path(session.id), "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "fie')
+
+    assert storage.get_session(session.id).current_score == 1.0
+
+
+def test_corrupt_line_before_the_end_is_not_skipped(storage):
+    session = ExamSession(candidate_name="a")
+    storage.save_session(session)
+    commit(storage, session, set_field("current_score", 1.0))
+    log_path = storage._get_log_path(session.id)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "fields": {"current_score": 3.0}, "version": 2}\n')
+
+    with pytest.raises(ValueError):
+        storage._load_session(session.id)
+
+
+def test_log_left_behind_by_compaction_is_not_replayed_twice(storage):
+    session = ExamSession(candidate_name="a")
+    storage.save_session(session)
+    commit(storage, session, add_question)
+    log_path = storage._get_log_path(session.id)
+    leftover = f"{log_path}.leftover"
+    shutil.copy(log_path, leftover)
+
+    # Enough changes to compact, then restore the log as a crash before its removal would
+    for score in range(1, 4):
+        commit(storage, session, set_field("current_score", float(score)))
+    assert not os.path.exists(log_path)
+    shutil.copy(leftover, log_path)
+
+    loaded = storage.get_session(session.id)
+    assert len(loaded.questions) == 1
+    assert loaded.current_score == 3.0
+
+    # Appends after the leftover events still apply
+    commit(storage, session, add_question)
+    assert len(storage.get_session(session.id).questions) == 2
@@ -0,0 +1,51 @@
+import os
+import pytest
+from backend.app.logic.storage import EVENTLOG, SERIALIZERS, Storage, diff_session, get_serializer
+from backend.app.models import ExamSession, Question, QuestionType
+
+
+def exam():
+    session = ExamSession(candidate_name="Zoë", topics=["SQL"], version=2)
+    session.questions.append(Question(question_text="Explain `GROUP BY` — with an example.", difficulty="Easy", type=QuestionType.SQL, user_answer="SELECT a,\n    count(*)\nFROM t GROUP BY a"))
+    return session
+
+
+@pytest.mark.parametrize("name", list(SERIALIZERS))
+def test_round_trip(tmp_path, name):
+    storage = Storage(data_dir=str(tmp_path), format=name)
+    session = exam()
+    storage.save_session(session)
+
+    assert os.path.exists(os.path.join(str(tmp_path), f"{session.id}{SERIALIZERS[name].extension}"))
+    assert storage.get_session(session.id) == session
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        get_serializer("yaml")
+
+
+def test_old_format_is_migrated_on_first_read(tmp_path):
+    session = exam()
+    Storage(data_dir=str(tmp_path), format="gzip").save_session(session)
+
+    storage = Storage(data_dir=str(tmp_path), format="compact")
+    assert storage.get_session(session.id) == session
+    assert os.path.exists(storage._get_path(session.id))
+    assert not os.path.exists(storage._get_path(session.id, SERIALIZERS["gzip"]))
+    assert storage.get_session(session.id) == session
+
+
+def test_events_on_an_old_format_snapshot_are_kept(tmp_path):
+    session = exam()
+    Storage(mode=EVENTLOG, data_dir=str(tmp_path), format="gzip").save_session(session)
+
+    storage = Storage(mode=EVENTLOG, data_dir=str(tmp_path), format="compact")
+    before = session.model_dump(mode="json")
+    session.current_score = 1.0
+    session.version += 1
+    storage.record(session, diff_session(before, session.model_dump(mode="json")), expected_version=2)
+
+    loaded = Storage(data_dir=str(tmp_path), format="gzip").get_session(session.id)
+    assert loaded.current_score == 1.0
+    assert loaded.version == 3